@@ -0,0 +1,115 @@
+# career_ai/fastjson.py
+"""orjson-backed JSON encoding/decoding for DRF and plain Django views.
+
+``dumps``/``loads`` use orjson when it is installed and fall back to the
+stdlib otherwise. orjson natively handles datetime, date, time, UUID,
+dataclasses and numpy arrays; ``_default`` covers the remaining types
+DjangoJSONEncoder knows (Decimal, timedelta, lazy translation strings).
+The stdlib fallback encodes the orjson-native types the way orjson does
+(``_stdlib_default``: full isoformat datetimes with microseconds and
+"+00:00", unlike DjangoJSONEncoder's milliseconds and "Z"), so both give
+the same JSON for these types. They still differ for NaN and infinity,
+which orjson writes as null, and for non-string dict keys other than
+str/int/float/bool/None.
+
+Used by:
+  - ORJSONRenderer / ORJSONParser, registered in REST_FRAMEWORK
+  - FastJsonResponse, a drop-in for django.http.JsonResponse
+  - loads_body(), for views that parse request.body themselves
+"""
+
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+
+from django.http import HttpResponse
+from django.utils.duration import duration_iso_string
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return duration_iso_string(obj)
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_default(obj):
+    # What orjson does natively for these types
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    if type(obj).__module__ == "numpy":
+        return obj.tolist()
+    return _default(obj)
+
+
+if HAS_ORJSON:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, default=_stdlib_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(data):
+        return json.loads(data)
+
+
+def loads_body(request, default="{}"):
+    """Parse ``request.body`` (empty body -> ``default``); raises ValueError on bad JSON."""
+    return loads(request.body or default)
+
+
+class FastJsonResponse(HttpResponse):
+    """Drop-in replacement for JsonResponse that serializes with ``dumps``."""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError("In order to allow non-dict objects to be serialized set the safe parameter to False.")
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data), **kwargs)
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = "application/json"
+    format = "json"
+    charset = None  # JSON is always UTF-8
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return dumps(data)
+
+
+class ORJSONParser(BaseParser):
+    media_type = "application/json"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,96 @@
+# career_ai/logging_pipeline.py
+"""Non-blocking logging for request paths.
+
+Loggers hand records to ``AsyncQueueHandler``, which only puts them on an
+in-memory queue; a ``QueueListener`` thread does the formatting and the
+stream/file I/O. If the queue is full the record is dropped (and counted)
+rather than blocking the request. ``SamplingFilter`` thins out chatty
+DEBUG/INFO loggers per logger prefix; WARNING and above are always kept.
+
+Wired up from ``LOGGING`` in settings; see LOG_LEVEL, LOG_FILE,
+LOG_QUEUE_SIZE and LOG_SAMPLE_RATES.
+"""
+
+import atexit
+import logging
+import queue
+import random
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+DEFAULT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(threadName)s] %(message)s"
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of low-severity records per logger.
+
+    ``rates`` maps a logger name prefix to the fraction of DEBUG/INFO records
+    to keep, e.g. {"chat.services.llm_providers": 0.1}. The longest matching
+    prefix wins; loggers with no match are not sampled.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, name: str = ""):
+        super().__init__(name)
+        self.rates = dict(rates or {})
+        self._resolved = {}
+
+    def _rate(self, logger_name: str) -> float:
+        rate = self._resolved.get(logger_name)
+        if rate is None:
+            best = ""
+            rate = 1.0
+            for prefix, value in self.rates.items():
+                if (logger_name == prefix or logger_name.startswith(prefix + ".")) and len(prefix) >= len(best):
+                    best, rate = prefix, float(value)
+            self._resolved[logger_name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+class AsyncQueueHandler(QueueHandler):
+    """QueueHandler that owns its QueueListener and never blocks the caller.
+
+    Records are written to stderr, and also to ``filename`` (rotated at
+    ``max_bytes``) when one is given.
+    """
+
+    def __init__(self, filename: Optional[str] = None, max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5, queue_size: int = 10000, fmt: str = DEFAULT_FORMAT):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        formatter = logging.Formatter(fmt)
+        targets = [logging.StreamHandler(sys.stderr)]
+        if filename:
+            targets.append(RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count,
+                                               encoding="utf-8", delay=True))
+        for target in targets:
+            target.setFormatter(formatter)
+        self.dropped = 0
+        self._drop_lock = threading.Lock()
+        self.listener = QueueListener(self.queue, *targets, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.close)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+
+    def close(self) -> None:
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            try:
+                listener.stop()  # flushes what is already queued
+            except queue.Full:
+                pass  # no room for the stop sentinel; the listener thread is a daemon
+            for target in listener.handlers:
+                target.close()
+        super().close()
@@ -0,0 +1,40 @@
+# career_ai/pagination.py
+"""Opaque cursors for keyset ("seek") pagination.
+
+A cursor is the sort key of the last row of a page plus its id, JSON encoded
+and base64url'd. The next page filters on ``(key, id) < cursor`` (or ``>``)
+in SQL, so it is served from an index in constant time however deep the
+client pages, unlike OFFSET. Used by the roadmap item listing (core/views.py)
+and the conversation/message listings (chat/views.py).
+"""
+
+import base64
+import json
+
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([v.isoformat() if hasattr(v, 'isoformat') else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, key_type=None):
+    """Return (key, id) from ``cursor``; raises ValueError if it is malformed.
+
+    ``key_type`` is ``"datetime"`` to parse the key as a timestamp, or a type
+    the key must be an instance of (e.g. ``int``).
+    """
+    try:
+        key, last_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if key_type == 'datetime':
+        key = parse_datetime(key) if isinstance(key, str) else None
+        if key is None:
+            raise ValueError('Invalid cursor')
+    elif key_type is not None and not isinstance(key, key_type):
+        raise ValueError('Invalid cursor')
+    if not isinstance(last_id, int):
+        raise ValueError('Invalid cursor')
+    return key, last_id
@@ -0,0 +1,292 @@
+# career_ai/tiered_cache.py
+"""Two-tier cache for hot read paths: a per-process LRU (L1) in front of Redis (L2).
+
+    careers = TieredCache("careers.resp", ttl=3600)
+    value = careers.get_or_set(key, lambda: expensive(key))
+
+    @cached("llm.models", ttl=3600)
+    def list_models(api_key): ...
+
+L1 hits are a dict lookup under a lock, with no network hop. L1 entries
+live for at most ``l1_ttl`` seconds (TIERED_CACHE_L1_TTL), which bounds
+how stale another process's L1 can be after an invalidation. L2 is the
+Django cache (django_redis), shared by every worker. If Redis is down,
+the cache degrades to L1 only: after an L2 error, L2 reads and writes are
+skipped for TIERED_CACHE_L2_RETRY_SECONDS so requests do not each wait out
+the connection timeout. Deletes and generation bumps are still attempted.
+
+Keys are versioned: ``tc:<namespace>:v<version>:g<generation>:<key>``.
+``version`` is a code-level schema version; bump it when the cached
+value's shape changes. The generation is a per-namespace counter in L2.
+``invalidate_all()`` increments it, which makes every existing entry of
+the namespace unreachable without scanning keys.
+
+Stampede protection:
+  - Probabilistic early refresh (XFetch). Each entry remembers how long it
+    took to compute. Shortly before expiry, a reader recomputes early with
+    a probability that grows as expiry approaches; the others keep serving
+    the current value.
+  - Single-flight. On a miss, concurrent callers in a process wait on one
+    computation instead of all running it.
+
+``stats()`` reports per-namespace hits per tier, misses, early refreshes,
+L2 errors and L2 calls skipped while Redis was considered down.
+"""
+
+import functools
+import hashlib
+import logging
+import math
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+_GENERATION = "__generation__"
+# Keys longer than this, or with spaces/control characters, are hashed
+# (memcached-compatible, keeps Redis keys short)
+_MAX_KEY_LENGTH = 200
+_UNSAFE_KEY = re.compile(r"[^\x21-\x7e]")
+# Striped single-flight locks: bounded memory, rare false sharing between keys
+_LOCK_STRIPES = 64
+
+_registry: Dict[str, "TieredCache"] = {}
+_registry_lock = threading.Lock()
+# Per cache alias: time.monotonic() until which L2 reads and writes are skipped after an error
+_l2_down_until: Dict[str, float] = {}
+# Calls only needed for speed; invalidations still go to L2 while it is considered down
+_SKIPPABLE_WHEN_DOWN = {"get", "set"}
+
+
+class LRUCache:
+    """Thread-safe LRU dict whose entries also expire after their own TTL."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return _MISSING
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    """One cache namespace. Instances are registered by name; see ``get_cache``."""
+
+    def __init__(self, namespace: str, ttl: Optional[float] = 300, l1_ttl: Optional[float] = None,
+                 l1_max_entries: Optional[int] = None, version: int = 1, beta: Optional[float] = None,
+                 alias: str = "default"):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.l1_ttl = l1_ttl if l1_ttl is not None else getattr(settings, "TIERED_CACHE_L1_TTL", 30)
+        self.version = version
+        self.beta = beta if beta is not None else getattr(settings, "TIERED_CACHE_BETA", 1.0)
+        self.alias = alias
+        self.l1 = LRUCache(l1_max_entries or getattr(settings, "TIERED_CACHE_L1_MAX_ENTRIES", 1024))
+        self._locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+        self._stats_lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ("l1_hits", "l2_hits", "misses", "early_refreshes", "l2_errors", "l2_skipped"), 0)
+        with _registry_lock:
+            _registry[namespace] = self
+
+    # -- bookkeeping ---------------------------------------------------------
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["l1_hits"] + stats["l2_hits"]) / lookups if lookups else 0.0
+        stats["l1_entries"] = len(self.l1)
+        return stats
+
+    def _l2(self):
+        return caches[self.alias]
+
+    def _l2_call(self, method: str, *args, default=None):
+        if method in _SKIPPABLE_WHEN_DOWN and time.monotonic() < _l2_down_until.get(self.alias, 0.0):
+            self._count("l2_skipped")
+            return default
+        try:
+            return getattr(self._l2(), method)(*args)
+        except Exception as e:
+            self._count("l2_errors")
+            _l2_down_until[self.alias] = time.monotonic() + getattr(settings, "TIERED_CACHE_L2_RETRY_SECONDS", 5)
+            logger.debug("L2 %s failed for %s: %s", method, self.namespace, e)
+            return default
+
+    # -- keys ----------------------------------------------------------------
+
+    def _generation_key(self) -> str:
+        return f"tc:{self.namespace}:gen"
+
+    def generation(self) -> int:
+        """Namespace generation, read from L2 at most once per ``l1_ttl``."""
+        gen = self.l1.get(_GENERATION)
+        if gen is _MISSING:
+            gen = self._l2_call("get", self._generation_key(), 0, default=0) or 0
+            self.l1.set(_GENERATION, gen, self.l1_ttl)
+        return gen
+
+    def make_key(self, key) -> str:
+        key = str(key)
+        if len(key) > _MAX_KEY_LENGTH or _UNSAFE_KEY.search(key):
+            key = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return f"tc:{self.namespace}:v{self.version}:g{self.generation()}:{key}"
+
+    # -- reads and writes ----------------------------------------------------
+
+    def _lookup(self, full_key):
+        """Return the stored (value, expires_at, delta) entry, counting the tier it came from."""
+        entry = self.l1.get(full_key)
+        if entry is not _MISSING:
+            self._count("l1_hits")
+            return entry
+        entry = self._l2_call("get", full_key, _MISSING, default=_MISSING)
+        if entry is not _MISSING:
+            self._count("l2_hits")
+            self.l1.set(full_key, entry, self._l1_ttl_for(entry))
+            return entry
+        self._count("misses")
+        return _MISSING
+
+    def _l1_ttl_for(self, entry) -> float:
+        return max(0.0, min(self.l1_ttl, entry[1] - time.time()))
+
+    def _store(self, full_key, value, ttl: Optional[float], delta: float) -> None:
+        # ttl None: no expiry (L2 keeps it until deleted, L1 still refreshes every l1_ttl)
+        entry = (value, time.time() + ttl if ttl else math.inf, delta)
+        self.l1.set(full_key, entry, min(self.l1_ttl, ttl or math.inf))
+        self._l2_call("set", full_key, entry, ttl)
+
+    def _should_refresh(self, entry) -> bool:
+        # XFetch: recompute early with probability rising towards expiry,
+        # scaled by how long the value takes to compute
+        _, expires_at, delta = entry
+        if not delta:
+            return False
+        return time.time() - delta * self.beta * math.log(random.random() or 1e-12) >= expires_at
+
+    def get(self, key, default=None):
+        entry = self._lookup(self.make_key(key))
+        return default if entry is _MISSING else entry[0]
+
+    def set(self, key, value, ttl: Optional[float] = None) -> None:
+        self._store(self.make_key(key), value, ttl if ttl is not None else self.ttl, 0.0)
+
+    def delete(self, key) -> None:
+        full_key = self.make_key(key)
+        self.l1.delete(full_key)
+        self._l2_call("delete", full_key)
+
+    def get_or_set(self, key, producer: Callable[[], Any], ttl: Optional[float] = None):
+        """Cached value for ``key``, computing it with ``producer()`` on a miss or early refresh."""
+        ttl = ttl if ttl is not None else self.ttl
+        full_key = self.make_key(key)
+        entry = self._lookup(full_key)
+        lock = self._locks[hash(full_key) % _LOCK_STRIPES]
+        if entry is not _MISSING:
+            if not self._should_refresh(entry) or not lock.acquire(blocking=False):
+                return entry[0]
+            # Won the early refresh; everyone else keeps reading the current value meanwhile
+            self._count("early_refreshes")
+            try:
+                return self._compute(full_key, producer, ttl)
+            finally:
+                lock.release()
+        with lock:
+            # Another thread may have filled it while we waited
+            entry = self.l1.get(full_key)
+            if entry is not _MISSING:
+                return entry[0]
+            return self._compute(full_key, producer, ttl)
+
+    def _compute(self, full_key, producer, ttl):
+        started = time.monotonic()
+        value = producer()
+        self._store(full_key, value, ttl, time.monotonic() - started)
+        return value
+
+    # -- invalidation --------------------------------------------------------
+
+    def clear_local(self) -> None:
+        """Drop this process's L1 (including the cached generation)."""
+        self.l1.clear()
+
+    def invalidate_all(self) -> None:
+        """Make every entry of the namespace unreachable, in all processes within ``l1_ttl``."""
+        key = self._generation_key()
+        if self._l2_call("add", key, 1, None, default=None) is False:
+            self._l2_call("incr", key)
+        self.clear_local()
+
+
+def get_cache(namespace: str, **options) -> TieredCache:
+    """The registered cache for ``namespace``, created with ``options`` on first use."""
+    with _registry_lock:
+        existing = _registry.get(namespace)
+    return existing or TieredCache(namespace, **options)
+
+
+def cached(namespace: str, ttl: float = 300, key: Optional[Callable[..., Any]] = None, **options):
+    """Decorator caching a function's result in the ``namespace`` tiered cache.
+
+    ``key(*args, **kwargs)`` builds the cache key; by default it is the repr
+    of the arguments. The wrapper exposes ``.cache`` (the TieredCache).
+    """
+    def decorator(func):
+        tiered = get_cache(namespace, ttl=ttl, **options)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else repr((args, sorted(kwargs.items())))
+            return tiered.get_or_set(cache_key, lambda: func(*args, **kwargs), ttl)
+        wrapper.cache = tiered
+        return wrapper
+    return decorator
+
+
+def cache_stats() -> Dict[str, Dict]:
+    """``stats()`` of every namespace in this process."""
+    with _registry_lock:
+        caches_by_name = dict(_registry)
+    return {name: c.stats() for name, c in sorted(caches_by_name.items())}
@@ -0,0 +1,113 @@
+# careerbot/assessment.py
+"""One assessment, shared by /api/chatbot/assessment and the batch runner (careerbot/batch.py).
+
+``suggestedCareers`` always come from the local recommender
+(chat/services/career_recommender.py) with their real scores. The LLM only
+writes the summary and the next steps; in fast mode it is skipped and both
+come from the dataset.
+"""
+import logging
+
+from chat.career_bot import chat_with_bot
+from chat.services.career_recommender import recommend
+from chat.services.roadmap_generator import dataset_roadmap
+from chat.utils.admission import LLMOverloaded
+from chat.utils.deadline import Deadline
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("name", "educationLevel", "interests", "goals")
+
+
+def _local_next_steps(careers, goals):
+    if not careers:
+        return [
+            "Research careers that match your interests",
+            "Build skills relevant to your chosen field",
+            "Connect with professionals in your area of interest",
+            "Create a learning plan and timeline",
+            "Start building projects or gaining experience",
+        ]
+    return [step["title"] for step in dataset_roadmap(careers[0]["title"], goals)["steps"]]
+
+
+def _local_summary(payload, careers):
+    interests = payload["interests"][:100] if payload["interests"] else "various fields"
+    if payload["educationLevel"]:
+        text = f"You're currently at {payload['educationLevel']} level with interests in {interests}."
+    else:
+        text = f"Your interests include {interests}."
+    if careers:
+        text += f" Your profile matches {', '.join(c['title'] for c in careers[:3])} most closely."
+    return text
+
+
+def greeting(name: str) -> str:
+    return f"Great to meet you, {name}!"
+
+
+def run_assessment(payload, fast: bool = False, deadline: Deadline = None) -> dict:
+    """The dashboard for ``payload`` ({name, educationLevel, interests, goals}).
+
+    ``source`` is "local" or "model"; ``degraded`` is set when the LLM was
+    overloaded and the local summary was used instead. Raises
+    ``LLMOverloaded`` when LLM_OVERLOAD_MODE is "reject".
+    """
+    careers = recommend(payload["educationLevel"], payload["interests"], payload["goals"])
+    dashboard = {
+        "summary": {
+            "greeting": greeting(payload["name"]),
+            "text": _local_summary(payload, careers),
+            "recommendation": f"Based on your {payload['educationLevel']} level and interests in {payload['interests'][:50]}..., here's your personalized career guidance."
+        },
+        "suggestedCareers": careers,
+        "nextSteps": _local_next_steps(careers, payload["goals"]),
+        "source": "local",
+    }
+    if fast:
+        return dashboard
+
+    matched = ", ".join(f"{c['title']} ({round(c['confidence'] * 100)}% match)" for c in careers) or "none found"
+    assessment_prompt = f"""Based on the following assessment, provide:
+1. A brief summary of the person (2-3 sentences)
+2. A clear action plan/roadmap with 5-7 specific next steps towards the best-matching career
+
+Assessment Details:
+- Name: {payload['name']}
+- Education Level: {payload['educationLevel']}
+- Interests: {payload['interests']}
+- Career Goals: {payload['goals']}
+- Best-matching careers: {matched}
+
+Please format your response as:
+SUMMARY: [2-3 sentence summary about the person]
+ROADMAP: [Step 1, Step 2, Step 3, Step 4, Step 5]"""
+
+    try:
+        ai_response = chat_with_bot(assessment_prompt, deadline=deadline or Deadline.for_endpoint("assessment"))
+    except LLMOverloaded:
+        raise
+    except Exception as e:
+        logger.warning("Assessment summary fell back to the local one: %s", str(e)[:200])
+        return dashboard
+    # Only "degraded" means no model reply; "fallback" is set on every cascade reply
+    if ai_response.get("degraded"):
+        return dict(dashboard, degraded=True)
+
+    ai_text = ai_response.get("reply", "")
+    if "SUMMARY:" in ai_text:
+        summary = ai_text.split("SUMMARY:")[1].split("ROADMAP:")[0].strip()
+    else:
+        # Fallback: use first paragraph as summary
+        summary = ai_text.split("\n\n")[0] if "\n\n" in ai_text else ai_text[:200]
+    roadmap = []
+    if "ROADMAP:" in ai_text:
+        roadmap_part = ai_text.split("ROADMAP:")[1].strip()
+        roadmap = [step.strip().lstrip("- ").lstrip("• ") for step in roadmap_part.split("\n") if step.strip()][:7]
+
+    if summary:
+        dashboard["summary"]["text"] = summary
+    if roadmap:
+        dashboard["nextSteps"] = roadmap
+    dashboard["source"] = "model"
+    return dashboard
@@ -0,0 +1,324 @@
+# careerbot/batch.py
+"""Bulk assessments: a school uploads many students at once as CSV or JSONL.
+
+``create_batch`` stores the upload. Rows with the same education level,
+interests and goals share one AssessmentProfile, which is assessed once;
+the student's name only changes the greeting, so the LLM prompt uses a
+neutral name. ``run_batch`` works through the unfinished profiles of a
+batch with a bounded thread pool:
+
+* the pool has ASSESSMENT_BATCH_WORKERS threads, below LLM_MAX_CONCURRENCY
+  so interactive users keep LLM slots while a batch runs;
+* LLM calls are paced to ASSESSMENT_BATCH_LLM_PER_MINUTE across the pool;
+* a profile the LLM was too busy for (``LLMOverloaded`` or a degraded
+  reply) is retried with exponential backoff, and keeps the local result
+  after ASSESSMENT_BATCH_MAX_ATTEMPTS.
+
+Only the calling thread touches the database. It saves each profile as
+soon as it finishes and bumps the batch heartbeat, so a batch whose
+runner crashed is picked up where it stopped by the next runner
+(``manage.py process_assessment_batches``). ``iter_results`` streams
+the per-student results in upload order as JSONL or CSV.
+"""
+import csv
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from chat.utils.admission import LLMOverloaded
+from chat.utils.deadline import Deadline
+
+from .assessment import FIELDS, greeting, run_assessment
+from .models import AssessmentBatch, AssessmentProfile, AssessmentRow
+
+logger = logging.getLogger(__name__)
+
+# Name used in the LLM prompt of a shared profile
+PROFILE_NAME = "the student"
+CSV_COLUMNS = ["line", "name", "status", "educationLevel", "top_career", "confidence", "careers", "summary",
+               "next_steps", "error"]
+
+_HEADER_ALIASES = {field.lower(): field for field in FIELDS}
+_HEADER_ALIASES.update({"education_level": "educationLevel", "education level": "educationLevel",
+                        "education": "educationLevel"})
+
+
+class BatchInputError(ValueError):
+    """The upload cannot be read as CSV/JSONL assessments."""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _normalize(text) -> str:
+    return " ".join(str(text or "").split())
+
+
+def parse_rows(data, fmt: str = None):
+    """([{line, name, educationLevel, interests, goals}], [{"line", "error"}]) from CSV or JSONL text.
+
+    ``fmt`` is "csv" or "jsonl"; without it, text starting with "{" is JSONL.
+    Rows without a name are rejected rather than failing the upload.
+    """
+    if isinstance(data, bytes):
+        try:
+            data = data.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise BatchInputError("The upload is not UTF-8 text.") from None
+    if fmt is None:
+        fmt = "jsonl" if data.lstrip().startswith("{") else "csv"
+
+    records = []
+    if fmt == "jsonl":
+        for line, text in enumerate(data.splitlines(), start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as e:
+                records.append((line, None, f"invalid JSON: {e}"))
+                continue
+            if not isinstance(record, dict):
+                records.append((line, None, "not a JSON object"))
+                continue
+            records.append((line, record, None))
+    elif fmt == "csv":
+        reader = csv.DictReader(io.StringIO(data))
+        if not reader.fieldnames:
+            raise BatchInputError("The CSV upload is empty.")
+        columns = {name: _HEADER_ALIASES.get(name.strip().lower()) for name in reader.fieldnames if name}
+        if "name" not in columns.values():
+            raise BatchInputError("The CSV upload needs a name column.")
+        for record in reader:
+            records.append((reader.line_num, {columns[k]: v for k, v in record.items() if columns.get(k)}, None))
+    else:
+        raise BatchInputError(f"Unknown format {fmt!r}; use csv or jsonl.")
+
+    rows, rejected = [], []
+    for line, record, error in records:
+        if record is not None:
+            row = {field: _normalize(record.get(field)) for field in FIELDS}
+            if row["name"]:
+                rows.append(dict(row, line=line))
+                continue
+            error = "name is required"
+        rejected.append({"line": line, "error": error})
+    max_rows = _setting("ASSESSMENT_BATCH_MAX_ROWS", 5000)
+    if len(rows) > max_rows:
+        raise BatchInputError(f"The upload has {len(rows)} rows; at most {max_rows} are accepted per batch.")
+    return rows, rejected
+
+
+def profile_key(row) -> str:
+    """Rows with the same key get the same assessment (case and spacing do not matter)."""
+    fields = [row.get(field, "").lower() for field in ("educationLevel", "interests", "goals")]
+    return hashlib.sha1(json.dumps(fields).encode("utf-8")).hexdigest()
+
+
+@transaction.atomic
+def create_batch(rows, rejected=(), user=None, fast: bool = False) -> AssessmentBatch:
+    if not rows:
+        raise BatchInputError("The upload has no valid rows.")
+    profiles = {}
+    for row in rows:
+        profiles.setdefault(profile_key(row), {field: row[field] for field in FIELDS if field != "name"})
+    batch = AssessmentBatch.objects.create(user=user, fast=fast, row_count=len(rows), profile_count=len(profiles),
+                                           rejected=list(rejected))
+    AssessmentProfile.objects.bulk_create(
+        [AssessmentProfile(batch=batch, key=key, payload=payload) for key, payload in profiles.items()],
+        batch_size=500,
+    )
+    profile_ids = dict(batch.profiles.values_list("key", "pk"))
+    AssessmentRow.objects.bulk_create(
+        [AssessmentRow(batch=batch, line=row["line"], name=row["name"][:200], profile_id=profile_ids[profile_key(row)])
+         for row in rows],
+        batch_size=500,
+    )
+    return batch
+
+
+def progress(batch: AssessmentBatch) -> dict:
+    batch.refresh_from_db()
+    counts = batch.profiles.aggregate(done=Count("pk", filter=Q(status="done")),
+                                      failed=Count("pk", filter=Q(status="failed")))
+    return {
+        "id": batch.pk,
+        "status": batch.status,
+        "fast": batch.fast,
+        "rows": batch.row_count,
+        "profiles": batch.profile_count,
+        "done": counts["done"],
+        "failed": counts["failed"],
+        "pending": batch.profile_count - counts["done"] - counts["failed"],
+        "rejected": batch.rejected,
+        "created_at": batch.created_at.isoformat(),
+        "finished_at": batch.finished_at.isoformat() if batch.finished_at else None,
+    }
+
+
+# -- running -------------------------------------------------------------
+
+def _stale_before():
+    return timezone.now() - timedelta(seconds=_setting("ASSESSMENT_BATCH_STALE_SECONDS", 300))
+
+
+def claim(batch_id=None, force: bool = False):
+    """Mark a batch as running under this runner and return it; None if there is nothing to claim.
+
+    Without ``batch_id`` the oldest pending batch, or running batch whose
+    runner stopped heart-beating, is claimed. A given ``batch_id`` may also
+    be a failed batch; with ``force`` also a finished one (to retry its
+    failed profiles). The conditional update makes sure two runners never
+    claim the same batch.
+    """
+    claimable = Q(status="pending") | Q(status="running", heartbeat_at__lt=_stale_before())
+    if batch_id is not None:
+        claimable |= Q(status__in=["failed", "done"] if force else ["failed"])
+        candidates = AssessmentBatch.objects.filter(claimable, pk=batch_id)
+    else:
+        candidates = AssessmentBatch.objects.filter(claimable).order_by("created_at")
+    for pk in candidates.values_list("pk", flat=True)[:10]:
+        if AssessmentBatch.objects.filter(claimable, pk=pk).update(status="running", heartbeat_at=timezone.now()):
+            return AssessmentBatch.objects.get(pk=pk)
+    return None
+
+
+class _Pacer:
+    """Spaces LLM calls of all pool threads at least ``60 / per_minute`` seconds apart."""
+
+    def __init__(self, per_minute: float):
+        self._interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def _assess(payload, fast: bool, pacer: _Pacer) -> dict:
+    attempts = max(1, _setting("ASSESSMENT_BATCH_MAX_ATTEMPTS", 3))
+    backoff = _setting("LLM_RETRY_AFTER", 5)
+    for attempt in range(1, attempts + 1):
+        if not fast:
+            pacer.wait()
+        try:
+            result = run_assessment(dict(payload, name=PROFILE_NAME), fast=fast,
+                                    deadline=Deadline.for_endpoint("assessment"))
+        except LLMOverloaded as e:
+            if attempt == attempts:
+                # LLM_OVERLOAD_MODE is "reject": still hand back the local careers
+                return dict(run_assessment(dict(payload, name=PROFILE_NAME), fast=True), degraded=True)
+            time.sleep(max(e.retry_after, backoff) * 2 ** (attempt - 1))
+            continue
+        if not result.get("degraded") or attempt == attempts:
+            return result
+        time.sleep(backoff * 2 ** (attempt - 1))
+
+
+def run_batch(batch: AssessmentBatch, workers: int = None, on_progress=None) -> dict:
+    """Assess every unfinished profile of a claimed ``batch``; return its ``progress``.
+
+    ``on_progress(progress)`` is called after each saved profile. The batch
+    ends up "done", or "failed" if any profile failed; ``claim(batch_id)``
+    retries the failed profiles of a failed batch.
+    """
+    workers = max(1, workers or _setting("ASSESSMENT_BATCH_WORKERS", 4))
+    pacer = _Pacer(_setting("ASSESSMENT_BATCH_LLM_PER_MINUTE", 60))
+    heartbeat_every = _setting("ASSESSMENT_BATCH_STALE_SECONDS", 300) / 4
+    todo = list(batch.profiles.exclude(status="done").values_list("pk", "payload", "attempts"))
+    logger.info("Assessment batch %s: %d of %d profiles to do", batch.pk, len(todo), batch.profile_count)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assessment-batch") as pool:
+        futures = {pool.submit(_assess, payload, batch.fast, pacer): (pk, attempts) for pk, payload, attempts in todo}
+        remaining = set(futures)
+        while remaining:
+            finished, remaining = wait(remaining, timeout=heartbeat_every, return_when=FIRST_COMPLETED)
+            for future in finished:
+                pk, attempts = futures[future]
+                try:
+                    fields = {"status": "done", "result": future.result(), "error": ""}
+                except Exception as e:
+                    logger.warning("Assessment batch %s, profile %s failed: %s", batch.pk, pk, e)
+                    fields = {"status": "failed", "error": str(e)[:500]}
+                AssessmentProfile.objects.filter(pk=pk).update(attempts=attempts + 1, finished_at=timezone.now(),
+                                                               **fields)
+            AssessmentBatch.objects.filter(pk=batch.pk).update(heartbeat_at=timezone.now())
+            if finished and on_progress is not None:
+                on_progress(progress(batch))
+
+    failed = batch.profiles.filter(status="failed").exists()
+    AssessmentBatch.objects.filter(pk=batch.pk).update(status="failed" if failed else "done",
+                                                       finished_at=timezone.now())
+    return progress(batch)
+
+
+def run_claimed(batch: AssessmentBatch, workers: int = None, on_progress=None):
+    """``run_batch`` that marks the batch failed (resumable by ``claim(batch_id)``) if the runner errors."""
+    try:
+        return run_batch(batch, workers=workers, on_progress=on_progress)
+    except Exception:
+        AssessmentBatch.objects.filter(pk=batch.pk).update(status="failed")
+        raise
+
+
+# -- results -------------------------------------------------------------
+
+def _row_result(row: AssessmentRow) -> dict:
+    profile = row.profile
+    record = {"line": row.line, "name": row.name, "status": profile.status}
+    if profile.status == "done":
+        result = dict(profile.result)
+        result["summary"] = dict(result.get("summary") or {}, greeting=greeting(row.name))
+        record["result"] = result
+    elif profile.error:
+        record["error"] = profile.error
+    return record
+
+
+def _csv_line(values) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+def iter_results(batch: AssessmentBatch, fmt: str = "jsonl"):
+    """Per-student results in upload order, one JSONL line or CSV row at a time.
+
+    Students whose profile is not finished yet are included with their
+    status, so a client can stream the results while the batch runs.
+    """
+    rows = batch.rows.select_related("profile").order_by("line").iterator(chunk_size=500)
+    if fmt == "csv":
+        yield _csv_line(CSV_COLUMNS)
+    for row in rows:
+        record = _row_result(row)
+        if fmt != "csv":
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+            continue
+        result = record.get("result") or {}
+        careers = result.get("suggestedCareers") or []
+        yield _csv_line([
+            row.line, row.name, record["status"], row.profile.payload.get("educationLevel", ""),
+            careers[0]["title"] if careers else "", careers[0]["confidence"] if careers else "",
+            "; ".join(f"{c['title']} ({c['confidence']:.2f})" for c in careers),
+            (result.get("summary") or {}).get("text", ""), " | ".join(result.get("nextSteps") or []),
+            record.get("error", ""),
+        ])
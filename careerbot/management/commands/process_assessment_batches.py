@@ -0,0 +1,90 @@
+# careerbot/management/commands/process_assessment_batches.py
+"""Run bulk assessment batches (careerbot/batch.py).
+
+Uploads to /api/chatbot/assessment/batch are only queued; run this as a
+service (e.g. a systemd unit or a supervisor program next to the web process):
+    cd /srv/career-ai && python manage.py process_assessment_batches --loop
+or from cron, each run working through the queue and exiting (runs that
+overlap are safe, every batch is claimed by one runner):
+    * * * * * cd /srv/career-ai && python manage.py process_assessment_batches
+Or assess a school's file directly and write the results:
+    python manage.py process_assessment_batches --input students.csv --output results.csv
+If the run dies, resume the batch it printed; finished students are not redone:
+    python manage.py process_assessment_batches --batch 12 --output results.csv
+"""
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from careerbot import batch
+
+
+class Command(BaseCommand):
+    help = "Assess queued (or the given) bulk assessment batches with a bounded worker pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--input", default=None, help="CSV or JSONL file of {name, educationLevel, interests, goals}")
+        parser.add_argument("--fast", action="store_true", help="With --input: skip the LLM summaries")
+        parser.add_argument("--batch", type=int, default=None, help="Resume (or re-run the failed profiles of) this batch")
+        parser.add_argument("--output", default=None, help="Write the results here; .csv for CSV, JSONL otherwise")
+        parser.add_argument("--workers", type=int, default=None, help="Default: ASSESSMENT_BATCH_WORKERS")
+        parser.add_argument("--loop", action="store_true", help="Keep waiting for new batches")
+        parser.add_argument("--poll", type=float, default=5.0, help="Seconds between checks with --loop")
+
+    def _report(self, progress):
+        now = time.monotonic()
+        if now - self._last_report >= 5 or not progress["pending"]:
+            self._last_report = now
+            self.stdout.write(f"Batch {progress['id']}: {progress['done']}/{progress['profiles']} profiles done, "
+                              f"{progress['failed']} failed.")
+
+    def _run(self, claimed, workers):
+        self._last_report = 0.0
+        started = time.monotonic()
+        progress = batch.run_claimed(claimed, workers=workers, on_progress=self._report)
+        style = self.style.SUCCESS if not progress["failed"] else self.style.WARNING
+        self.stdout.write(style(
+            f"Batch {progress['id']}: {progress['rows']} students, {progress['profiles']} distinct profiles, "
+            f"{progress['done']} done, {progress['failed']} failed in {time.monotonic() - started:.1f}s."
+        ))
+
+    def handle(self, *args, **options):
+        if options["input"]:
+            path = Path(options["input"])
+            fmt = "jsonl" if path.suffix.lower() in (".jsonl", ".ndjson") else "csv"
+            try:
+                rows, rejected = batch.parse_rows(path.read_bytes(), fmt)
+                created = batch.create_batch(rows, rejected, fast=options["fast"])
+            except batch.BatchInputError as e:
+                self.stdout.write(self.style.ERROR(str(e)))
+                return
+            for reject in rejected:
+                self.stdout.write(self.style.WARNING(f"Line {reject['line']} skipped: {reject['error']}"))
+            self.stdout.write(f"Created batch {created.pk} (resume with --batch {created.pk}).")
+            options["batch"] = created.pk
+
+        if options["batch"] is not None:
+            claimed = batch.claim(options["batch"], force=True)
+            if claimed is None:
+                self.stdout.write(self.style.ERROR(
+                    f"Batch {options['batch']} does not exist or another runner is still working on it."))
+                return
+            self._run(claimed, options["workers"])
+            if options["output"]:
+                fmt = "csv" if options["output"].lower().endswith(".csv") else "jsonl"
+                with open(options["output"], "w", encoding="utf-8", newline="") as f:
+                    for chunk in batch.iter_results(claimed, fmt):
+                        f.write(chunk)
+                self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+            return
+
+        while True:
+            claimed = batch.claim()
+            if claimed is not None:
+                self._run(claimed, options["workers"])
+                continue
+            if not options["loop"]:
+                self.stdout.write("No batches waiting.")
+                return
+            time.sleep(options["poll"])
@@ -0,0 +1,72 @@
+# Generated by Django 4.2 on 2026-10-19 03:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssessmentBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')], db_index=True, default='pending', max_length=10)),
+                ('fast', models.BooleanField(default=False)),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('profile_count', models.PositiveIntegerField(default=0)),
+                ('rejected', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AssessmentProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=40)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('done', 'done'), ('failed', 'failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='profiles', to='careerbot.assessmentbatch')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AssessmentRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line', models.PositiveIntegerField()),
+                ('name', models.CharField(max_length=200)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='careerbot.assessmentbatch')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='careerbot.assessmentprofile')),
+            ],
+            options={
+                'ordering': ['batch', 'line'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='assessmentrow',
+            index=models.Index(fields=['batch', 'line'], name='careerbot_row_batch_line_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessmentprofile',
+            index=models.Index(fields=['batch', 'status'], name='careerbot_profile_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='assessmentprofile',
+            constraint=models.UniqueConstraint(fields=('batch', 'key'), name='careerbot_profile_batch_key_uniq'),
+        ),
+    ]
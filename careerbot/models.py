@@ -1,3 +1,69 @@
+from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class AssessmentBatch(models.Model):
+    """A school's upload of many assessments, processed by careerbot/batch.py.
+
+    Identical profiles (same education level, interests and goals) are
+    assessed once: every uploaded row points at an AssessmentProfile, and
+    only profiles are worked on. Finished profiles are saved one by one,
+    so a runner that dies leaves the batch resumable where it stopped.
+    """
+    STATUS_CHOICES = [
+        ("pending", "pending"),
+        ("running", "running"),
+        ("done", "done"),
+        ("failed", "failed"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending", db_index=True)
+    fast = models.BooleanField(default=False)
+    row_count = models.PositiveIntegerField(default=0)
+    profile_count = models.PositiveIntegerField(default=0)
+    # [{"line", "error"}] for input rows that were not accepted
+    rejected = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    # Bumped by the runner while it works; a stale heartbeat on a running batch means its runner died
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+
+class AssessmentProfile(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "pending"),
+        ("done", "done"),
+        ("failed", "failed"),
+    ]
+
+    batch = models.ForeignKey(AssessmentBatch, on_delete=models.CASCADE, related_name="profiles")
+    key = models.CharField(max_length=40)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["batch", "key"], name="careerbot_profile_batch_key_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["batch", "status"], name="careerbot_profile_status_idx"),
+        ]
+
+
+class AssessmentRow(models.Model):
+    batch = models.ForeignKey(AssessmentBatch, on_delete=models.CASCADE, related_name="rows")
+    line = models.PositiveIntegerField()
+    name = models.CharField(max_length=200)
+    profile = models.ForeignKey(AssessmentProfile, on_delete=models.CASCADE, related_name="rows")
+
+    class Meta:
+        ordering = ["batch", "line"]
+        indexes = [
+            models.Index(fields=["batch", "line"], name="careerbot_row_batch_line_idx"),
+        ]
@@ -1,3 +1,115 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from careerbot import assessment, batch
+from careerbot.models import AssessmentBatch
+
+CSV = (
+    "Name,Education Level,interests,goals,Roll No\n"
+    "Asha,12th,Coding,Get a job\n"
+    "Ravi,12th,  coding ,get a JOB\n"
+    ",12th,biology,doctor\n"
+    "Meena,10th,biology,doctor\n"
+)
+
+
+class ParseRowsTests(SimpleTestCase):
+    def test_csv_header_aliases_and_rejects(self):
+        rows, rejected = batch.parse_rows(CSV.encode("utf-8-sig"), "csv")
+        self.assertEqual([(row["line"], row["name"], row["educationLevel"]) for row in rows],
+                         [(2, "Asha", "12th"), (3, "Ravi", "12th"), (5, "Meena", "10th")])
+        self.assertEqual(rows[1]["interests"], "coding")
+        self.assertEqual(rejected, [{"line": 4, "error": "name is required"}])
+        # Same profile however it is cased and spaced
+        self.assertEqual(batch.profile_key(rows[0]), batch.profile_key(rows[1]))
+        self.assertNotEqual(batch.profile_key(rows[0]), batch.profile_key(rows[2]))
+
+    def test_jsonl_is_detected_and_bad_lines_rejected(self):
+        data = '{"name": "Asha", "educationLevel": "UG"}\n\n[1, 2]\n{"name": \n'
+        rows, rejected = batch.parse_rows(data)
+        self.assertEqual([(row["line"], row["name"], row["goals"]) for row in rows], [(1, "Asha", "")])
+        self.assertEqual([r["line"] for r in rejected], [3, 4])
+        self.assertEqual(rejected[0]["error"], "not a JSON object")
+
+    def test_unusable_uploads_raise(self):
+        for data, fmt in ((b"\xff\xfe", None), ("", "csv"), ("interests,goals\ncoding,job\n", "csv"),
+                          ("name\nAsha\n", "xml")):
+            with self.assertRaises(batch.BatchInputError):
+                batch.parse_rows(data, fmt)
+        with override_settings(ASSESSMENT_BATCH_MAX_ROWS=2), self.assertRaises(batch.BatchInputError):
+            batch.parse_rows(CSV, "csv")
+
+
+class ClaimTests(TestCase):
+    def setUp(self):
+        rows, rejected = batch.parse_rows(CSV, "csv")
+        self.batch = batch.create_batch(rows, rejected, fast=True)
+
+    def _set(self, **fields):
+        AssessmentBatch.objects.filter(pk=self.batch.pk).update(**fields)
+
+    def test_created_batch_shares_profiles(self):
+        self.assertEqual((self.batch.row_count, self.batch.profile_count), (3, 2))
+
+    def test_a_batch_is_claimed_once(self):
+        claimed = batch.claim()
+        self.assertEqual((claimed.pk, claimed.status), (self.batch.pk, "running"))
+        self.assertIsNone(batch.claim())
+        self.assertIsNone(batch.claim(self.batch.pk))
+        self.assertIsNone(batch.claim(self.batch.pk, force=True))
+
+    def test_stale_running_batch_is_taken_over(self):
+        self._set(status="running", heartbeat_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(batch.claim().pk, self.batch.pk)
+
+    def test_finished_batches_need_an_explicit_claim(self):
+        self._set(status="failed")
+        self.assertIsNone(batch.claim())
+        self.assertEqual(batch.claim(self.batch.pk).pk, self.batch.pk)
+        self._set(status="done")
+        self.assertIsNone(batch.claim(self.batch.pk))
+        self.assertEqual(batch.claim(self.batch.pk, force=True).pk, self.batch.pk)
+
+
+class RunBatchTests(TestCase):
+    def test_failed_profiles_fail_the_batch_until_retried(self):
+        rows, rejected = batch.parse_rows(CSV, "csv")
+        created = batch.create_batch(rows, rejected, fast=True)
+
+        def assess(payload, fast=False, deadline=None):
+            if payload["interests"] == "biology":
+                raise RuntimeError("no careers")
+            return {"careers": [{"title": "Software Developer"}]}
+
+        with mock.patch.object(batch, "run_assessment", side_effect=assess):
+            progress = batch.run_claimed(batch.claim(created.pk))
+        self.assertEqual((progress["status"], progress["done"], progress["failed"]), ("failed", 1, 1))
+
+        with mock.patch.object(batch, "run_assessment", return_value={"careers": []}):
+            progress = batch.run_claimed(batch.claim(created.pk))
+        self.assertEqual((progress["status"], progress["done"], progress["failed"]), ("done", 2, 0))
+
+
+class RunAssessmentTests(SimpleTestCase):
+    PAYLOAD = {"name": "Asha", "educationLevel": "12th", "interests": "coding", "goals": "get a job"}
+
+    def _run(self, reply):
+        with mock.patch.object(assessment, "chat_with_bot", return_value=reply):
+            return assessment.run_assessment(dict(self.PAYLOAD))
+
+    def test_model_reply_is_used(self):
+        # The LLM cascade marks every reply it produces with "fallback"
+        dashboard = self._run({"reply": "SUMMARY: Keen coder.\nROADMAP:\n- Learn Python\n- Build a project",
+                               "fallback": True})
+        self.assertEqual(dashboard["source"], "model")
+        self.assertNotIn("degraded", dashboard)
+        self.assertEqual(dashboard["summary"]["text"], "Keen coder.")
+        self.assertEqual(dashboard["nextSteps"], ["Learn Python", "Build a project"])
+
+    def test_degraded_reply_keeps_the_local_summary(self):
+        dashboard = self._run({"reply": "SUMMARY: ignored", "fallback": True, "degraded": True})
+        self.assertEqual((dashboard["source"], dashboard["degraded"]), ("local", True))
+        self.assertNotEqual(dashboard["summary"]["text"], "ignored")
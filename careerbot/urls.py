@@ -5,4 +5,9 @@ urlpatterns = [
     path('chat/ask', views.ask_chatbot, name='ask_chatbot'),
     path('career/roadmap/', views.career_roadmap, name='career_roadmap'),
     path('chatbot/assessment', views.assessment, name='chatbot_assessment'),
+    path('chatbot/assessment/batch', views.assessment_batch, name='chatbot_assessment_batch'),
+    path('chatbot/assessment/batch/<int:batch_id>', views.assessment_batch_status,
+         name='chatbot_assessment_batch_status'),
+    path('chatbot/assessment/batch/<int:batch_id>/results', views.assessment_batch_results,
+         name='chatbot_assessment_batch_results'),
 ]
@@ -1,11 +1,25 @@
-from rest_framework.decorators import api_view
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, parser_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from chat.career_bot import chat_with_bot
+from chat.utils.admission import LLMOverloaded, overload_response
+from chat.utils.deadline import Deadline
+from core.caching import cached_read_endpoint, content_etag
+from . import batch
+from .assessment import FIELDS, run_assessment
+from .models import AssessmentBatch
 """Careerbot minimal endpoints.
 
 Note: We avoid DB writes here to keep local setup simple.
 """
 
+logger = logging.getLogger(__name__)
+
 # Dummy knowledge base (you can replace with AI or database later)
 career_roadmaps = {
     "computer science": [
@@ -57,7 +71,11 @@ def ask_chatbot(request):
     return Response({"question": user_question, "answer": bot_reply})
 
 
+CAREER_ROADMAPS_VERSION = content_etag(career_roadmaps)
+
+
 # Career Roadmap API
+@cached_read_endpoint(lambda request: content_etag(CAREER_ROADMAPS_VERSION, request.GET.get("career", "").lower()))
 @api_view(['GET'])
 def career_roadmap(request):
     career = request.GET.get("career", "").lower()
@@ -74,125 +92,101 @@ def career_roadmap(request):
 
 
 # Assessment API used by frontend ChatbotDialog
+def _fast_mode(request) -> bool:
+    if getattr(settings, "ASSESSMENT_FAST_MODE", False):
+        return True
+    return request.data.get("mode") == "fast" or request.GET.get("fast", "").lower() in ("1", "true")
+
+
 @api_view(['POST'])
 def assessment(request):
-    """Accepts a lightweight assessment form and returns AI-generated summary and career guidance.
+    """Accepts a lightweight assessment form and returns a summary and career guidance.
 
     Expected JSON:
-    { name, educationLevel, interests, goals }
+    { name, educationLevel, interests, goals, mode }
+
+    See careerbot/assessment.py; ``mode: "fast"`` (or ``?fast=1``) skips the LLM.
     """
-    payload = {
-        "name": request.data.get("name", ""),
-        "educationLevel": request.data.get("educationLevel", ""),
-        "interests": request.data.get("interests", ""),
-        "goals": request.data.get("goals", ""),
-    }
+    payload = {field: request.data.get(field, "") for field in FIELDS}
 
     # Minimal validation
     if not payload["name"]:
         return Response({"error": "Name is required"}, status=400)
 
-    # Build a comprehensive prompt for AI to generate summary and guidance
-    assessment_prompt = f"""Based on the following assessment, provide:
-1. A brief summary of the person (2-3 sentences)
-2. Top 3-4 career recommendations that match their profile
-3. A clear action plan/roadmap with 5-7 specific next steps
-
-Assessment Details:
-- Name: {payload['name']}
-- Education Level: {payload['educationLevel']}
-- Interests: {payload['interests']}
-- Career Goals: {payload['goals']}
+    try:
+        return Response(run_assessment(payload, fast=_fast_mode(request),
+                                       deadline=Deadline.for_endpoint("assessment")))
+    except LLMOverloaded as e:
+        return overload_response(e)
 
-Please format your response as:
-SUMMARY: [2-3 sentence summary about the person]
-CAREERS: [Career 1 (confidence: X%), Career 2 (confidence: Y%), Career 3 (confidence: Z%)]
-ROADMAP: [Step 1, Step 2, Step 3, Step 4, Step 5]"""
 
+def _run_inline(batch_id):
     try:
-        # Use AI to generate summary and guidance
-        ai_response = chat_with_bot(assessment_prompt)
-        ai_text = ai_response.get("reply", "")
-        
-        # Parse the AI response
-        summary = ""
-        careers = []
-        roadmap = []
-        
-        # Extract summary
-        if "SUMMARY:" in ai_text:
-            summary_part = ai_text.split("SUMMARY:")[1].split("CAREERS:")[0].strip()
-            summary = summary_part
-        else:
-            # Fallback: use first paragraph as summary
-            summary = ai_text.split("\n\n")[0] if "\n\n" in ai_text else ai_text[:200]
-        
-        # Extract careers
-        if "CAREERS:" in ai_text:
-            careers_part = ai_text.split("CAREERS:")[1].split("ROADMAP:")[0].strip()
-            # Parse career recommendations
-            career_lines = [line.strip() for line in careers_part.split("\n") if line.strip() and "(" in line]
-            for line in career_lines[:4]:  # Max 4 careers
-                if "(" in line and ")" in line:
-                    career_name = line.split("(")[0].strip()
-                    confidence_str = line.split("(")[1].split(")")[0].replace("confidence:", "").replace("%", "").strip()
-                    try:
-                        confidence = float(confidence_str) / 100.0 if confidence_str else 0.75
-                    except:
-                        confidence = 0.75
-                    careers.append({"title": career_name, "confidence": confidence})
-        
-        # Extract roadmap
-        if "ROADMAP:" in ai_text:
-            roadmap_part = ai_text.split("ROADMAP:")[1].strip()
-            roadmap = [step.strip().lstrip("- ").lstrip("• ") for step in roadmap_part.split("\n") if step.strip()][:7]
-        
-        # Fallback if parsing fails
-        if not careers:
-            careers = [
-                {"title": "Software Engineer", "confidence": 0.80},
-                {"title": "Data Scientist", "confidence": 0.70},
-            ]
-        if not roadmap:
-            roadmap = [
-                "Strengthen your core skills in your area of interest",
-                "Build practical projects to showcase your abilities",
-                "Seek mentorship or guidance from professionals in your field",
-                "Explore internship or entry-level opportunities",
-                "Continue learning and stay updated with industry trends"
-            ]
-        if not summary:
-            summary = f"Based on your assessment, {payload['name']} shows strong potential in their chosen field. With dedication and the right guidance, you can achieve your career goals."
-        
-        dashboard = {
-            "summary": {
-                "greeting": f"Great to meet you, {payload['name']}!",
-                "text": summary,
-                "recommendation": f"Based on your {payload['educationLevel']} level and interests in {payload['interests'][:50]}..., here's your personalized career guidance."
-            },
-            "suggestedCareers": careers,
-            "nextSteps": roadmap,
-        }
-        
-        return Response(dashboard)
-        
+        claimed = batch.claim(batch_id)
+        if claimed is not None:
+            batch.run_claimed(claimed)
     except Exception as e:
-        # Fallback response if AI fails
-        return Response({
-            "summary": {
-                "greeting": f"Great to meet you, {payload['name']}!",
-                "text": f"You're currently at {payload['educationLevel']} level with interests in {payload['interests'][:100] if payload['interests'] else 'various fields'}. Your goal is to {payload['goals'][:100] if payload['goals'] else 'succeed in your career'}.",
-                "recommendation": "Based on your assessment, we recommend exploring careers that align with your interests and goals."
-            },
-            "suggestedCareers": [
-                {"title": "Career Path 1", "confidence": 0.80},
-                {"title": "Career Path 2", "confidence": 0.70},
-            ],
-            "nextSteps": [
-                "Research careers that match your interests",
-                "Build skills relevant to your chosen field",
-                "Connect with professionals in your area of interest",
-                "Create a learning plan and timeline",
-                "Start building projects or gaining experience"
-            ],
-        })
\ No newline at end of file
+        logger.error("Assessment batch %s stopped: %s", batch_id, e)
+    finally:
+        connection.close()
+
+
+# Bulk assessments for schools, see careerbot/batch.py
+@api_view(['POST'])
+@parser_classes([MultiPartParser])
+def assessment_batch(request):
+    """Upload students as CSV or JSONL (multipart ``file``, or the raw body); answers 202 with the batch.
+
+    `manage.py process_assessment_batches` picks the batch up; with
+    ASSESSMENT_BATCH_INLINE set (development) it runs in a background thread
+    of this process instead.
+    """
+    if request.content_type.startswith("multipart/"):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "Attach the students as a file field"}, status=400)
+        data, name = upload.read(), upload.name.lower()
+        fast = _fast_mode(request)
+    else:
+        # Raw CSV/JSONL body; DRF has no parser for it, so it is read as is
+        data, name = request.body, ""
+        fast = getattr(settings, "ASSESSMENT_FAST_MODE", False) or request.GET.get("fast", "").lower() in ("1", "true")
+    fmt = request.GET.get("input") or ("jsonl" if name.endswith((".jsonl", ".ndjson")) else "csv" if name.endswith(".csv") else None)
+    try:
+        rows, rejected = batch.parse_rows(data, fmt)
+        created = batch.create_batch(rows, rejected, user=request.user, fast=fast)
+    except batch.BatchInputError as e:
+        return Response({"error": str(e)}, status=400)
+
+    if getattr(settings, "ASSESSMENT_BATCH_INLINE", False):
+        transaction.on_commit(lambda: threading.Thread(
+            target=_run_inline, args=(created.pk,), name=f"assessment-batch-{created.pk}", daemon=True).start())
+    return Response(batch.progress(created), status=202)
+
+
+def _own_batch(request, batch_id):
+    found = AssessmentBatch.objects.filter(pk=batch_id).first()
+    if found is None or (found.user_id != request.user.pk and not request.user.is_staff):
+        return None
+    return found
+
+
+@api_view(['GET'])
+def assessment_batch_status(request, batch_id):
+    found = _own_batch(request, batch_id)
+    if found is None:
+        return Response({"error": "Batch not found"}, status=404)
+    return Response(batch.progress(found))
+
+
+@api_view(['GET'])
+def assessment_batch_results(request, batch_id):
+    """Results in upload order, streamed as JSONL (default) or CSV (``?output=csv``)."""
+    found = _own_batch(request, batch_id)
+    if found is None:
+        return Response({"error": "Batch not found"}, status=404)
+    fmt = "csv" if request.GET.get("output") == "csv" else "jsonl"
+    response = StreamingHttpResponse(batch.iter_results(found, fmt),
+                                     content_type="text/csv" if fmt == "csv" else "application/x-ndjson")
+    response["Content-Disposition"] = f'attachment; filename="assessment-batch-{found.pk}.{fmt}"'
+    return response
@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class ChatConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chat'
+
+    def ready(self):
+        from django.db.models.signals import post_save
+        from .models import MessageLog
+        from .signals import touch_session
+        post_save.connect(touch_session, sender=MessageLog, dispatch_uid="chat.touch_session")
+
+        from core import invalidation
+        from .utils.data_loader import reload_career_data
+        invalidation.subscribe(invalidation.CAREERS, reload_career_data)
+        # Only a reset: the retrained model is loaded by the next message that needs it
+        from .services.intent_classifier import reload_model
+        invalidation.subscribe(invalidation.INTENT_MODEL, reload_model)
+        from .services.related_careers import reset as reset_related_careers
+        invalidation.subscribe(invalidation.RELATED_CAREERS, reset_related_careers)
+        # Neighbours computed in-process (no file) follow the dataset
+        invalidation.subscribe(invalidation.CAREERS, reset_related_careers)
+        from .services.career_recommender import reset as reset_recommender
+        invalidation.subscribe(invalidation.CAREERS, reset_recommender)
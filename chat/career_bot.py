@@ -1,26 +1,52 @@
 # chat/career_bot.py
-from .utils.data_loader import load_dataset
+from .utils.data_loader import get_career_data
 from .utils.mentor_engine import mentor_engine
 from .utils.ai_fallback import ai_fallback
 from .utils.gemini_fallback import gemini_fallback
+from .utils.admission import llm_slot, LLMOverloaded
+from .utils.deadline import Deadline
 
-# load once
-CAREER_DATA = load_dataset("career_dataset.json")
 
-def chat_with_bot(user_message: str, history=None) -> dict:
+def __getattr__(name):
+    # CAREER_DATA used to be loaded at import time; keep the name, load it on first access
+    if name == "CAREER_DATA":
+        return get_career_data()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def chat_with_bot(user_message: str, history=None, deadline: Deadline = None) -> dict:
     """
     Returns a dictionary with reply and metadata.
     Uses ONLY Gemini API for career guidance.
     Collects information about college, interests, academic preferences, and provides calculated output with roadmap.
+    ``deadline`` bounds the whole turn (queueing included); defaults to the chat SLO.
     """
+    from django.conf import settings
+
+    if deadline is None:
+        deadline = Deadline.for_endpoint("chat")
+
     # Use Gemini only - no fallback to GPT
-    gem = gemini_fallback(user_message, CAREER_DATA, history=history)
+    try:
+        with llm_slot(wait=min(getattr(settings, "LLM_QUEUE_TIMEOUT", 2.0), deadline.remaining())):
+            gem = gemini_fallback(user_message, get_career_data(), history=history, deadline=deadline)
+    except LLMOverloaded:
+        # Too many LLM calls in flight: answer locally instead of queueing the worker
+        if getattr(settings, "LLM_OVERLOAD_MODE", "degrade") != "degrade":
+            raise
+        local = ai_fallback(user_message, get_career_data())
+        local["degraded"] = True
+        return local
     if gem is not None:
         return gem
+    if deadline.expired:
+        # The SLO ran out mid-cascade; a local answer beats an error message
+        local = ai_fallback(user_message, get_career_data())
+        local["degraded"] = True
+        return local
     
     # If Gemini fails, return a helpful error message
     # Check if API key exists
-    from django.conf import settings
     api_key = getattr(settings, 'GEMINI_API_KEY', None)
     
     if not api_key:
@@ -0,0 +1,55 @@
+# chat/management/commands/archive_conversations.py
+"""Move idle conversations from MessageLog into compressed cold storage.
+
+Meant to run on a schedule, e.g. nightly from cron:
+    15 3 * * * cd /srv/career-ai && python manage.py archive_conversations
+"""
+from django.core.management.base import BaseCommand
+
+from chat.services.archive import HAS_ZSTD, archive_session, idle_sessions
+
+
+class Command(BaseCommand):
+    help = "Archive conversations idle for more than --idle-days (default CHAT_ARCHIVE_IDLE_DAYS) into compressed blobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--idle-days", type=int, default=None)
+        parser.add_argument("--limit", type=int, default=None, help="Archive at most this many conversations")
+        parser.add_argument("--codec", choices=["zstd", "zlib"], default=None,
+                            help="Default: zstd if the zstandard package is installed, else zlib")
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+
+    def handle(self, *args, **options):
+        if options["codec"] == "zstd" and not HAS_ZSTD:
+            self.stdout.write(self.style.ERROR("zstd requested but the zstandard package is not installed."))
+            return
+        sessions = idle_sessions(options["idle_days"]).order_by("last_message_at")
+        if options["limit"]:
+            sessions = sessions[:options["limit"]]
+        session_ids = list(sessions.values_list("pk", flat=True))
+        if options["dry_run"]:
+            self.stdout.write(f"{len(session_ids)} conversations would be archived.")
+            return
+
+        archived = skipped = messages = raw_bytes = stored_bytes = 0
+        for pk in session_ids:
+            # One transaction per conversation: a failure leaves the others archived
+            try:
+                archive = archive_session(sessions.model(pk=pk), options["codec"], options["idle_days"])
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"Conversation {pk}: {e}"))
+                continue
+            if archive is None:
+                # Continued since it was selected
+                skipped += 1
+                continue
+            archived += 1
+            messages += archive.message_count
+            raw_bytes += archive.raw_bytes
+            stored_bytes += len(archive.blob)
+        ratio = raw_bytes / stored_bytes if stored_bytes else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} conversations ({messages} messages, "
+            f"{raw_bytes / 1024:.0f} KB -> {stored_bytes / 1024:.0f} KB, {ratio:.1f}x)"
+            + (f", skipped {skipped} no longer idle." if skipped else ".")
+        ))
@@ -0,0 +1,46 @@
+# chat/management/commands/build_career_snapshot.py
+"""Compile data/career_dataset.json into the mmap'ed binary snapshot workers share.
+
+Run after every change to the dataset file, e.g. as a deploy step:
+    cd /srv/career-ai && python manage.py build_career_snapshot
+Running workers swap the new snapshot in through the invalidation bus.
+"""
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chat.utils import career_snapshot
+from core import invalidation
+
+
+class Command(BaseCommand):
+    help = "Build the binary career snapshot (CAREER_SNAPSHOT_PATH) from data/career_dataset.json"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=None, help="Default: CAREER_SNAPSHOT_PATH")
+
+    def handle(self, *args, **options):
+        output = options["output"] or getattr(settings, "CAREER_SNAPSHOT_PATH", None)
+        if not output:
+            self.stdout.write(self.style.ERROR("CAREER_SNAPSHOT_PATH is not set; pass --output."))
+            return
+        source_path = Path(settings.BASE_DIR) / "data" / "career_dataset.json"
+        with open(source_path, "r", encoding="utf-8") as f:
+            careers = json.load(f)
+
+        stats = career_snapshot.build(careers, output, source_path=source_path)
+        # Check the file maps and reads back before anyone relies on it
+        mapped = career_snapshot.open_snapshot(output, source_path=source_path)
+        if [c.get("name") for c in mapped] != [c.get("name") for c in careers]:
+            self.stdout.write(self.style.ERROR(f"{output} does not read back correctly."))
+            return
+        if stats["skipped_fields"]:
+            self.stdout.write(self.style.WARNING("Fields not in the snapshot: " + ", ".join(stats["skipped_fields"])))
+        if not options["output"]:
+            invalidation.publish(invalidation.CAREERS)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {output}: {stats['careers']} careers, {stats['strings']} strings, {stats['bytes']} bytes "
+            f"(JSON source {source_path.stat().st_size} bytes)."
+        ))
@@ -0,0 +1,44 @@
+# chat/management/commands/build_related_careers.py
+"""Precompute each career's most similar careers for /api/career/related/.
+
+Run after the career dataset changes, e.g. right after the import:
+    cd /srv/career-ai && python manage.py build_related_careers
+Running workers load the new file through the invalidation bus.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chat.services import related_careers
+from chat.utils.data_loader import get_career_data
+from core import invalidation
+
+
+class Command(BaseCommand):
+    help = "Build the related-careers file (RELATED_CAREERS_PATH) from TF-IDF cosine similarity"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=related_careers.DEFAULT_TOP_K)
+        parser.add_argument("--block-size", type=int, default=1024,
+                            help="Careers per similarity block (memory is block-size x careers floats)")
+        parser.add_argument("--max-features", type=int, default=20000, help="Vocabulary cap")
+        parser.add_argument("--min-score", type=float, default=related_careers.MIN_SCORE)
+        parser.add_argument("--output", default=None, help="Default: RELATED_CAREERS_PATH")
+
+    def handle(self, *args, **options):
+        output = options["output"] or getattr(settings, "RELATED_CAREERS_PATH", None)
+        if not output:
+            self.stdout.write(self.style.ERROR("RELATED_CAREERS_PATH is not set; pass --output."))
+            return
+        careers = get_career_data()
+        started = time.monotonic()
+        data = related_careers.build(careers, k=options["top_k"], block_size=options["block_size"],
+                                     max_features=options["max_features"], min_score=options["min_score"])
+        related_careers.save(data, output)
+        if not options["output"]:
+            invalidation.publish(invalidation.RELATED_CAREERS)
+        pairs = sum(len(neighbours) for neighbours in data["related"].values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {output}: {len(careers)} careers, {pairs} neighbours in {time.monotonic() - started:.2f}s."
+        ))
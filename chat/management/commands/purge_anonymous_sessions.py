@@ -0,0 +1,55 @@
+# chat/management/commands/purge_anonymous_sessions.py
+"""Delete anonymous conversations whose identity has expired.
+
+Meant to run on a schedule, e.g. nightly from cron:
+    30 3 * * * cd /srv/career-ai && python manage.py purge_anonymous_sessions
+"""
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from chat.models import ConversationSession, MessageLog
+from chat.utils.anon_session import ANON_PREFIX
+from core import metrics
+
+
+class Command(BaseCommand):
+    help = ("Delete anonymous conversations idle for more than --days (default CHAT_ANON_SESSION_TTL_DAYS), "
+            "plus the legacy shared 'anon' conversation")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days is None:
+            days = getattr(settings, "CHAT_ANON_SESSION_TTL_DAYS", 7)
+        cutoff = timezone.now() - datetime.timedelta(days=days)
+        expired = ConversationSession.objects.filter(user__isnull=True).filter(
+            # The pre-namespacing shared row is always unsafe to keep: it mixes every guest's messages
+            Q(session_id=ANON_PREFIX.rstrip(":"))
+            | (Q(session_id__startswith=ANON_PREFIX) & Q(last_message_at__lt=cutoff))
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"{expired.count()} anonymous conversations would be deleted.")
+            return
+
+        sessions = messages = 0
+        batch_size = options["batch_size"]
+        with metrics.deferred():
+            while True:
+                batch = list(expired.values_list("pk", flat=True)[:batch_size])
+                if not batch:
+                    break
+                with transaction.atomic():
+                    # Messages first, as one DELETE, rather than through the ORM cascade
+                    messages += MessageLog.objects.filter(session_id__in=batch).delete()[0]
+                    ConversationSession.objects.filter(pk__in=batch).delete()
+                sessions += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {sessions} anonymous conversations ({messages} messages)."))
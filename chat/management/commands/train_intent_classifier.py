@@ -0,0 +1,54 @@
+# chat/management/commands/train_intent_classifier.py
+"""Train the local stage/stream/interest/intent classifier and report its accuracy.
+
+Run after adding labelled messages, e.g. as a deploy step:
+    cd /srv/career-ai && python manage.py train_intent_classifier --examples exports/labelled_chats.jsonl
+Running workers load the new model through the invalidation bus.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chat.services import intent_classifier
+from chat.utils.data_loader import get_career_data
+from core import invalidation
+
+
+class Command(BaseCommand):
+    help = "Train the intent classifier (INTENT_MODEL_PATH) and compare it with the keyword rules"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--examples", action="append", default=[],
+                            help="Extra labelled JSONL file (repeatable); scored in the evaluation too")
+        parser.add_argument("--no-dataset", action="store_true", help="Do not train on the career dataset queries")
+        parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds (0 skips the evaluation)")
+        parser.add_argument("--epochs", type=int, default=500)
+        parser.add_argument("--output", default=None, help="Default: INTENT_MODEL_PATH")
+
+    def handle(self, *args, **options):
+        output = options["output"] or getattr(settings, "INTENT_MODEL_PATH", None)
+        if not output:
+            self.stdout.write(self.style.ERROR("INTENT_MODEL_PATH is not set; pass --output."))
+            return
+        examples = intent_classifier.load_examples(
+            [intent_classifier.default_examples_path()] + options["examples"])
+        # Phrases and dataset queries help training but would flatter the accuracy numbers
+        extra = intent_classifier.load_examples([intent_classifier.default_lexicon_path()])
+        if not options["no_dataset"]:
+            extra += intent_classifier.dataset_examples(get_career_data())
+        self.stdout.write(f"{len(examples)} labelled messages, {len(extra)} phrase/dataset examples.")
+
+        if options["folds"] > 1:
+            report = intent_classifier.evaluate(examples, extra, folds=options["folds"], epochs=options["epochs"])
+            self.stdout.write(f"{options['folds']}-fold accuracy on the labelled messages:")
+            self.stdout.write(f"  {'head':<10}{'n':>5}{'rules':>9}{'model':>9}")
+            for head, row in report.items():
+                self.stdout.write(f"  {head:<10}{row['n']:>5}{row['rules']:>9.1%}{row['model']:>9.1%}")
+
+        model = intent_classifier.train(examples + extra, epochs=options["epochs"])
+        model.save(output)
+        latency = intent_classifier.latency_us(model, [e["text"] for e in examples])
+        if not options["output"]:
+            invalidation.publish(invalidation.INTENT_MODEL)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {output}: {len(model.buckets)} features, {latency:.0f}us per message."
+        ))
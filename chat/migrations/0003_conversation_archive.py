@@ -0,0 +1,52 @@
+# Generated by Django 4.2 on 2026-10-19 02:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_last_message_at(apps, schema_editor):
+    ConversationSession = apps.get_model("chat", "ConversationSession")
+    MessageLog = apps.get_model("chat", "MessageLog")
+    latest = MessageLog.objects.filter(session=models.OuterRef("pk")).order_by("-created_at").values("created_at")[:1]
+    ConversationSession.objects.update(last_message_at=models.Subquery(latest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_conversationsession_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversationsession',
+            name='is_archived',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='conversationsession',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='messagelog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='ArchivedConversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codec', models.CharField(choices=[('zstd', 'zstd'), ('zlib', 'zlib')], max_length=8)),
+                ('blob', models.BinaryField()),
+                ('message_count', models.PositiveIntegerField(default=0)),
+                ('raw_bytes', models.PositiveIntegerField(default=0)),
+                ('first_message_at', models.DateTimeField(blank=True, null=True)),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='chat.conversationsession')),
+            ],
+        ),
+        migrations.RunPython(backfill_last_message_at, migrations.RunPython.noop),
+    ]
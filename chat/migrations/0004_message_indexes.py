@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-19 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_conversation_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conversationsession',
+            index=models.Index(fields=['user', '-last_message_at', '-id'], name='chat_session_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messagelog',
+            index=models.Index(fields=['session', 'created_at', 'id'], name='chat_msg_session_created_idx'),
+        ),
+    ]
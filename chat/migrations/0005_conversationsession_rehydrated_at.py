@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 03:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_message_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversationsession',
+            name='rehydrated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 class ConversationSession(models.Model):
@@ -11,9 +12,50 @@ class ConversationSession(models.Model):
         "core.Career", null=True, blank=True, on_delete=models.SET_NULL
         , related_name='chat_sessions'
     )
+    # Maintained on MessageLog insert; drives archival of idle conversations
+    last_message_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    # Messages live in ArchivedConversation instead of MessageLog
+    is_archived = models.BooleanField(default=False)
+    # Last time an archived conversation was opened again; keeps it hot for another idle period
+    rehydrated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Conversation list (most recent first) and its keyset pagination
+            models.Index(fields=['user', '-last_message_at', '-id'], name='chat_session_user_recent_idx'),
+        ]
 
 class MessageLog(models.Model):
     session = models.ForeignKey(ConversationSession, on_delete=models.CASCADE)
     role = models.CharField(max_length=20)  # "user" or "bot"
     text = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # default rather than auto_now_add so rehydrated rows keep their original time
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # One conversation's messages in order: paging, first/last message lookups
+            models.Index(fields=['session', 'created_at', 'id'], name='chat_msg_session_created_idx'),
+        ]
+
+
+class ArchivedConversation(models.Model):
+    """Cold storage for an idle conversation's messages.
+
+    ``blob`` is the conversation's MessageLog rows as JSON lines
+    ({"role", "text", "created_at"}), compressed with ``codec``. See
+    chat/services/archive.py.
+    """
+    CODEC_CHOICES = [
+        ("zstd", "zstd"),
+        ("zlib", "zlib"),
+    ]
+
+    session = models.OneToOneField(ConversationSession, on_delete=models.CASCADE, related_name="archive")
+    codec = models.CharField(max_length=8, choices=CODEC_CHOICES)
+    blob = models.BinaryField()
+    message_count = models.PositiveIntegerField(default=0)
+    raw_bytes = models.PositiveIntegerField(default=0)
+    first_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
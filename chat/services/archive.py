@@ -0,0 +1,145 @@
+# chat/services/archive.py
+"""Hot/cold storage for conversation messages.
+
+Conversations idle for CHAT_ARCHIVE_IDLE_DAYS are moved out of MessageLog
+into one compressed ``ArchivedConversation`` blob each (zstd when the
+``zstandard`` package is installed, zlib otherwise), keeping the hot table
+small. Reading an archived conversation decompresses the blob; continuing
+one rehydrates it back into MessageLog first (``ensure_hot``). A
+rehydrated conversation counts as active from then on, so it is not
+archived again before it has been idle for another full period.
+"""
+
+import datetime
+import logging
+import zlib
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from career_ai import fastjson
+from chat.models import ArchivedConversation, ConversationSession, MessageLog
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+logger = logging.getLogger(__name__)
+
+
+def compress(data: bytes, codec: str = None):
+    """Return (codec, blob). ``codec`` defaults to zstd if available, else zlib."""
+    codec = codec or ("zstd" if HAS_ZSTD else "zlib")
+    level = getattr(settings, "CHAT_ARCHIVE_COMPRESSION_LEVEL", None)
+    if codec == "zstd":
+        if not HAS_ZSTD:
+            raise RuntimeError("zstd requested but the zstandard package is not installed")
+        return codec, zstandard.ZstdCompressor(level=level or 10).compress(data)
+    return "zlib", zlib.compress(data, level or 6)
+
+
+def decompress(codec: str, blob: bytes) -> bytes:
+    blob = bytes(blob)
+    if codec == "zstd":
+        if not HAS_ZSTD:
+            raise RuntimeError("Conversation archived with zstd but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+def _encode(messages: List[Dict]) -> bytes:
+    return b"\n".join(fastjson.dumps(m) for m in messages)
+
+
+def _decode(data: bytes) -> List[Dict]:
+    messages = [fastjson.loads(line) for line in data.split(b"\n") if line]
+    for m in messages:
+        m["created_at"] = parse_datetime(m["created_at"])
+    return messages
+
+
+def _idle_cutoff(idle_days: int = None) -> datetime.datetime:
+    if idle_days is None:
+        idle_days = getattr(settings, "CHAT_ARCHIVE_IDLE_DAYS", 30)
+    return timezone.now() - datetime.timedelta(days=idle_days)
+
+
+def archive_session(session: ConversationSession, codec: str = None, idle_days: int = None):
+    """Move ``session``'s messages into a compressed blob and delete them from MessageLog.
+
+    Returns None, archiving nothing, if the conversation is no longer idle
+    for ``idle_days`` (it may have been continued since it was selected).
+    """
+    cutoff = _idle_cutoff(idle_days)
+    with transaction.atomic():
+        session = ConversationSession.objects.select_for_update().get(pk=session.pk)
+        if session.is_archived:
+            return session.archive
+        if session.rehydrated_at and session.rehydrated_at >= cutoff:
+            return None
+        messages = list(MessageLog.objects.filter(session=session).order_by("created_at", "id")
+                        .values("role", "text", "created_at"))
+        if messages and messages[-1]["created_at"] >= cutoff:
+            return None
+        raw = _encode(messages)
+        codec, blob = compress(raw, codec)
+        archive = ArchivedConversation.objects.create(
+            session=session,
+            codec=codec,
+            blob=blob,
+            message_count=len(messages),
+            raw_bytes=len(raw),
+            first_message_at=messages[0]["created_at"] if messages else None,
+            last_message_at=messages[-1]["created_at"] if messages else None,
+        )
+        MessageLog.objects.filter(session=session).delete()
+        ConversationSession.objects.filter(pk=session.pk).update(is_archived=True)
+    return archive
+
+
+def read_archive(archive: ArchivedConversation) -> List[Dict]:
+    """Messages stored in ``archive`` ({"role", "text", "created_at"})."""
+    return _decode(decompress(archive.codec, archive.blob))
+
+
+def archived_messages(session: ConversationSession) -> List[Dict]:
+    """Messages of an archived session, without rehydrating it."""
+    return read_archive(session.archive)
+
+
+def rehydrate_session(session: ConversationSession) -> int:
+    """Move an archived session's messages back into MessageLog; returns the number restored."""
+    with transaction.atomic():
+        session = ConversationSession.objects.select_for_update().get(pk=session.pk)
+        if not session.is_archived:
+            return 0
+        messages = archived_messages(session)
+        MessageLog.objects.bulk_create(
+            [MessageLog(session=session, **m) for m in messages], batch_size=500
+        )
+        ArchivedConversation.objects.filter(session=session).delete()
+        ConversationSession.objects.filter(pk=session.pk).update(is_archived=False, rehydrated_at=timezone.now())
+    logger.info("Rehydrated %s messages for conversation %s", len(messages), session.session_id)
+    return len(messages)
+
+
+def ensure_hot(session: ConversationSession) -> ConversationSession:
+    """Rehydrate ``session`` if it is archived, so it can be read and appended to normally."""
+    if session.is_archived:
+        rehydrate_session(session)
+        session.is_archived = False
+    return session
+
+
+def idle_sessions(idle_days: int = None):
+    """Hot sessions with no message and no rehydration in the last ``idle_days`` (CHAT_ARCHIVE_IDLE_DAYS)."""
+    cutoff = _idle_cutoff(idle_days)
+    return ConversationSession.objects.filter(
+        Q(rehydrated_at__isnull=True) | Q(rehydrated_at__lt=cutoff), is_archived=False, last_message_at__lt=cutoff,
+    )
@@ -0,0 +1,214 @@
+# chat/services/career_recommender.py
+"""Rank dataset careers for an assessment (education level, interests, goals) without an LLM.
+
+Each career is a TF-IDF vector built from the same terms the related-careers
+build uses (chat/services/related_careers.py), plus the words of its name.
+The assessment text is turned into a query vector over that vocabulary:
+its words, and its 1-3 word phrases so that "machine learning" hits the
+skill phrase. Query words missing from the vocabulary are matched to
+their closest vocabulary word with rapidfuzz, so "biolgy" still counts
+as "biology".
+
+Two matrix-vector products then score every career at once:
+
+* the cosine similarity of the query and the career vector;
+* coverage: the idf-weighted share of the recognised query terms that
+  the career has at all. A short query against a long description has a
+  small cosine even when the career covers everything asked for;
+  coverage is what makes the combined score readable as a 0-1 match.
+
+Two adjustments are applied on top:
+
+* INTEREST_BONUS when the text names an interest (coding, medicine, ...)
+  that matches the career's tags, either through a tag phrase or as read
+  by the intent classifier;
+* a stage fit (STAGE_FIT) for the student's education level. A 12th
+  grader is offered UG programmes first and diplomas after them; careers
+  with a fit of 0 (a PG programme for a 10th grader) are left out.
+
+The index is built once per process on first use and dropped when the
+careers change (invalidation bus).
+"""
+
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+from .intent_classifier import TAG_INTERESTS, classify, tag_interest
+from .related_careers import _words, tfidf_matrix
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 4
+# Weight of the interests text relative to the goals text in the query
+INTEREST_WEIGHT = 2.0
+GOAL_WEIGHT = 1.0
+NAME_WEIGHT = 2.0
+# Share of the cosine similarity and of the coverage in the score
+COSINE_WEIGHT = 0.5
+COVERAGE_WEIGHT = 0.5
+INTEREST_BONUS = 0.15
+# Careers scoring below this are not worth suggesting
+MIN_SCORE = 0.03
+# Smallest rapidfuzz ratio at which an unknown query word stands for a vocabulary word
+FUZZY_CUTOFF = 85
+
+# {education stage: {career stage: fit}}; stages missing from a row are filtered out
+STAGE_FIT = {
+    "10th": {"10th": 1.0, "UG": 0.7},
+    "12th": {"UG": 1.0, "10th": 0.4},
+    "UG": {"PG": 1.0, "UG": 0.6},
+    "PG": {"PG": 1.0, "UG": 0.5},
+}
+
+_EDUCATION_PATTERNS = (
+    ("10th", re.compile(r"\b10(th)?\b|\bsslc\b|\bmatric", re.I)),
+    ("12th", re.compile(r"\b12(th)?\b|\bhsc\b|\bintermediate\b|\bpuc\b", re.I)),
+    ("PG", re.compile(r"\bpg\b|post ?grad|master|\bworking\b|professional|\bjob\b", re.I)),
+    ("UG", re.compile(r"\bug\b|under ?grad|bachelor|\bcollege\b|\bdegree\b", re.I)),
+)
+
+_index = None
+_lock = threading.Lock()
+
+
+def _np():
+    import numpy
+    return numpy
+
+
+def education_stage(level: str) -> Optional[str]:
+    """"10th", "12th", "UG" or "PG" for a free-text education level; None if it cannot be told."""
+    level = (level or "").strip()
+    if not level:
+        return None
+    for stage, pattern in _EDUCATION_PATTERNS:
+        if pattern.search(level):
+            return stage
+    return classify(level).get("stage")
+
+
+class RecommenderIndex:
+    """TF-IDF matrix of every career plus the lookups needed to vectorize a query."""
+
+    def __init__(self, careers):
+        np = _np()
+        careers = list(careers)
+        self.x, vocabulary, self.idf = tfidf_matrix(careers, min_df=1, name_weight=NAME_WEIGHT)
+        self.present = (self.x > 0).astype(np.float32)
+        self.columns = {term: i for i, term in enumerate(vocabulary)}
+        self.vocabulary_words = [t[2:] for t in vocabulary if t.startswith("w:")]
+        self.names = [c.get("name", "") for c in careers]
+        self.stages = [c.get("stage", "") for c in careers]
+        self.interests = [tag_interest(c.get("tags") or []) for c in careers]
+        self.stage_rows = {stage: np.array([s == stage for s in self.stages]) for stage in set(self.stages)}
+
+    def _fuzzy_words(self, words) -> Dict[str, tuple]:
+        """{unknown word: (vocabulary word, similarity 0-1)} for query words outside the vocabulary."""
+        unknown = sorted({w for w in words if "w:" + w not in self.columns and len(w) > 3})
+        if not unknown or not self.vocabulary_words:
+            return {}
+        try:
+            from rapidfuzz import fuzz, process
+        except ImportError:
+            return {}
+        scores = process.cdist(unknown, self.vocabulary_words, scorer=fuzz.ratio, score_cutoff=FUZZY_CUTOFF)
+        best = scores.argmax(axis=1)
+        return {word: (self.vocabulary_words[j], float(scores[i, j]) / 100.0)
+                for i, (word, j) in enumerate(zip(unknown, best.tolist())) if scores[i, j] > 0}
+
+    def query_terms(self, texts) -> Counter:
+        """Weighted query terms for [(text, weight), ...], unknown words folded onto fuzzy matches."""
+        terms = Counter()
+        all_words = []
+        for text, weight in texts:
+            words = _words(text)
+            all_words.extend(words)
+            for size in (1, 2, 3):
+                for i in range(len(words) - size + 1):
+                    terms["p:" + " ".join(words[i:i + size])] += weight
+            for word in words:
+                terms["w:" + word] += weight
+        for word, (match, similarity) in self._fuzzy_words(all_words).items():
+            terms["w:" + match] += terms.pop("w:" + word) * similarity
+            terms["p:" + match] += terms.pop("p:" + word, 0) * similarity
+        return terms
+
+    def query_vector(self, terms: Counter):
+        """Idf-weighted, unnormalized query vector; None if no term is in the vocabulary."""
+        np = _np()
+        q = np.zeros(self.x.shape[1], dtype=np.float32)
+        for term, weight in terms.items():
+            col = self.columns.get(term)
+            if col is not None and weight > 0:
+                q[col] = 1.0 + math.log1p(weight)
+        q *= self.idf
+        return q if q.any() else None
+
+    def recommend(self, education_level: str, interests: str, goals: str, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+        np = _np()
+        terms = self.query_terms([(interests, INTEREST_WEIGHT), (goals, GOAL_WEIGHT)])
+        q = self.query_vector(terms)
+        if q is not None:
+            similarity = self.x @ (q / np.linalg.norm(q))
+            coverage = self.present @ (q / q.sum())
+        else:
+            # Nothing in the vocabulary; an interest the classifier recognises can still rank careers
+            similarity = coverage = np.zeros(len(self.names), dtype=np.float32)
+        score = COSINE_WEIGHT * similarity + COVERAGE_WEIGHT * coverage
+
+        phrases = {t[2:] for t in terms if t.startswith("p:")}
+        wanted = {interest for interest, tags in TAG_INTERESTS.items() if phrases.intersection(tags)}
+        wanted.add(classify(f"{interests}. {goals}").get("interest"))
+        wanted.discard(None)
+        bonus = np.array([INTEREST_BONUS if i in wanted else 0.0 for i in self.interests], dtype=np.float32)
+
+        stage = education_stage(education_level)
+        fit = np.ones(len(self.names), dtype=np.float32)
+        if stage in STAGE_FIT:
+            fit[:] = 0.0
+            for career_stage, weight in STAGE_FIT[stage].items():
+                rows = self.stage_rows.get(career_stage)
+                if rows is not None:
+                    fit[rows] = weight
+
+        scores = np.minimum((score + bonus) * fit, 1.0)
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return [
+            {"title": self.names[i], "stage": self.stages[i], "confidence": round(float(scores[i]), 2),
+             "similarity": round(float(similarity[i]), 4), "coverage": round(float(coverage[i]), 4),
+             "stage_fit": round(float(fit[i]), 2),
+             "interest_match": bool(bonus[i])}
+            for i in order.tolist() if scores[i] >= MIN_SCORE
+        ]
+
+
+def _current() -> RecommenderIndex:
+    global _index
+    index = _index
+    if index is None:
+        with _lock:
+            if _index is None:
+                from chat.utils.data_loader import get_career_data
+                _index = RecommenderIndex(get_career_data())
+            index = _index
+    return index
+
+
+def reset() -> None:
+    """Forget the index (invalidation bus handler); the next recommendation rebuilds it."""
+    global _index
+    _index = None
+
+
+def recommend(education_level: str, interests: str, goals: str, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+    """Best-matching careers, best first, as [{"title", "stage", "confidence", ...}].
+
+    ``confidence`` is the combined score in 0-1; ``similarity``, ``coverage``,
+    ``stage_fit`` and ``interest_match`` are its parts. Empty if nothing in the text
+    matches the dataset.
+    """
+    return _current().recommend(education_level, interests, goals, limit)
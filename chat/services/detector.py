@@ -1,6 +1,7 @@
 import re
 from rapidfuzz import fuzz
-from core.models import Career, Mentor
+from core.caching import mentor_rows
+from core.models import Career
 
 STAGE_PATTERNS = {
     "10th": r"\b(10th|class 10|ssc)\b",
@@ -38,11 +39,12 @@ def match_career(query: str, stage: str, threshold=45):
     return None
 
 def find_mentors_for_tags(tags, top_n=3):
-    mentors = Mentor.objects.all()
+    # Mentor rows come from the two-tier cache, not a table scan per call
+    tags = set(tags)
     scored = []
-    for m in mentors:
-        overlap = len(set(m.tags) & set(tags))
+    for m in mentor_rows():
+        overlap = len(set(m["tags"]) & tags)
         if overlap > 0:
-            scored.append((overlap + (1 if m.available else 0), m))
+            scored.append((overlap, m))
     scored.sort(reverse=True, key=lambda x: x[0])
-    return [{"name":m.name, "bio": m.bio, "contact": m.contact} for _, m in scored[:top_n]]
+    return [{"name": m["name"], "bio": m["expertise"], "contact": m["contact"]} for _, m in scored[:top_n]]
@@ -1,10 +1,8 @@
 # chat/services/generator.py
-import os, json
-import openai
+import json
 
-OPENAI_KEY = os.getenv("OPENAI_API_KEY")
-if OPENAI_KEY:
-    openai.api_key = OPENAI_KEY
+from .llm_gateway import get_gateway
+from .llm_providers import LLMError
 
 def simple_career_card(career):
     return {
@@ -21,13 +19,7 @@ def simple_career_card(career):
         }
     }
 
-def ai_fallback_reply(user_text, retrieved_examples=None, stage=None):
-    # Safe fallback if no OpenAI key
-    if not OPENAI_KEY:
-        if retrieved_examples:
-            return f"Based on similar entries: {', '.join([r.get('name','') for r in retrieved_examples[:3]])}. Tell me if you want details."
-        return "I didn't find exact match. Tell me more about your interests or stage."
-
+def ai_fallback_reply(user_text, retrieved_examples=None, stage=None, deadline=None):
     # Build compact prompt
     context = ""
     if retrieved_examples:
@@ -37,14 +29,23 @@ def ai_fallback_reply(user_text, retrieved_examples=None, stage=None):
         f"You are a helpful career advisor. The user said: '{user_text}'. "
         f"Context: {context}\nReturn a short JSON: {{'best_match':'', 'why':'', 'suggested':['...'], 'next_step':''}}"
     )
-    resp = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role":"system","content":"You are a concise career guide."},
-                  {"role":"user","content":prompt}],
-        temperature=0.2,
-        max_tokens=220
-    )
-    txt = resp["choices"][0]["message"]["content"].strip()
+    try:
+        result = get_gateway().generate(
+            [{"role":"system","content":"You are a concise career guide."},
+             {"role":"user","content":prompt}],
+            endpoint="generator",
+            deadline=deadline,
+            temperature=0.2,
+            max_tokens=220,
+            max_chars=None,
+        )
+    except LLMError:
+        # Safe fallback if no provider is configured or all of them failed
+        if retrieved_examples:
+            return f"Based on similar entries: {', '.join([r.get('name','') for r in retrieved_examples[:3]])}. Tell me if you want details."
+        return "I didn't find exact match. Tell me more about your interests or stage."
+
+    txt = result["text"]
     # try to extract JSON; if fail, return raw text
     try:
         # find first { and parse
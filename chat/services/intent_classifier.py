@@ -0,0 +1,462 @@
+# chat/services/intent_classifier.py
+"""Local classifier for what a chat message says about the user.
+
+It predicts four labels per message. Stage, stream and interest are None
+when the message does not say:
+    stage     10th / 12th / UG / PG
+    stream    Science / Commerce / Arts
+    interest  coding, engineering, medicine, business, accounting, law,
+              design, science, arts
+    intent    reject / choose / unsure / other
+
+A message can name several interests ("I don't want coding or
+engineering"), so interest is multi-label: ``interests`` lists every
+interest above MULTI_LABEL_THRESHOLD, most likely first, and ``interest``
+is the first of them.
+
+The model is a regression per label over hashed features: words, word
+bigrams and character 3-4-grams, hashed into 2**20 buckets with crc32.
+Stage, stream and intent are softmax (multinomial logistic) heads;
+interest has an independent sigmoid per class. Only the buckets seen in
+training are stored. One gather and one sum score all four labels, so
+inference is tokenization plus a few microseconds of NumPy.
+
+Training data:
+  - data/intent_examples.jsonl, hand-labelled chat messages
+    ({"text", "stage", "stream", "interest", "intent"}; null = not said,
+    interest may be a list);
+  - data/intent_lexicon.jsonl, short phrases labelled for one head only
+    (a head that is left out is not trained on that line);
+  - extra labelled exports in the same format, e.g. annotated MessageLog rows;
+  - the career dataset's example queries and names, labelled with the
+    interest their tags map to (interest only).
+
+``manage.py train_intent_classifier`` trains the model, writes it to
+INTENT_MODEL_PATH and reports cross-validated accuracy against
+``rule_labels``, the keyword rules the chat prompt builder used before.
+Until a model is trained, ``classify`` falls back to those rules. They
+return the same rejected paths as before, including "ca" and "bcom"
+rather than the "accounting" label; only the evaluation maps those
+(RULE_PATH_LABELS).
+
+NumPy is imported when a model is first trained or loaded.
+"""
+
+import functools
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+HEADS = {
+    "stage": ("10th", "12th", "UG", "PG"),
+    "stream": ("Science", "Commerce", "Arts"),
+    "interest": ("coding", "engineering", "medicine", "business", "accounting", "law", "design", "science", "arts"),
+    "intent": ("reject", "choose", "unsure", "other"),
+}
+# Heads that may be absent from a message (class "" = not said)
+OPTIONAL_HEADS = ("stage", "stream", "interest")
+# Multi-label heads -> the classify() key listing every label found; "" is not a class of these
+MULTI_LABEL_HEADS = {"interest": "interests"}
+# Smallest sigmoid probability at which a multi-label class counts as said
+MULTI_LABEL_THRESHOLD = 0.5
+
+# Career dataset tags -> interest label, for labelling example queries
+TAG_INTERESTS = {
+    "coding": ("computer science", "software", "it", "data science", "ai", "machine learning",
+               "computer applications", "prompt engineering", "chatbot", "gaming"),
+    "engineering": ("engineering", "btech", "mtech", "polytechnic", "diploma", "iti", "architecture", "barch"),
+    "medicine": ("medicine", "mbbs", "doctor", "healthcare", "dentistry", "dental", "pharmacy", "paramedical",
+                 "medical support", "bds", "bpharm"),
+    "business": ("business", "management", "bba", "mba", "marketing", "digital marketing", "leadership"),
+    "accounting": ("accounting", "commerce", "bcom", "finance"),
+    "law": ("law", "legal", "advocate", "llm"),
+    "design": ("design", "ux", "graphic", "fashion", "bdes", "3d design"),
+    "science": ("science", "research", "biology", "bsc", "msc", "mathematics", "astronomy", "biotech",
+                "food technology"),
+    "arts": ("arts", "humanities", "ba", "psychology", "history", "music", "dance", "creative"),
+}
+
+HASH_BITS = 20
+FORMAT_VERSION = 2
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+
+_model = None
+_model_lock = threading.Lock()
+_model_loaded = False
+
+
+def _np():
+    import numpy
+    return numpy
+
+
+def _sigmoid(v: float) -> float:
+    return 0.5 * (1.0 + math.tanh(0.5 * v))
+
+
+def as_labels(value) -> List[str]:
+    """A label field of an example (None, one label or a list) as a list."""
+    if value is None or value == "":
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+# -- features --------------------------------------------------------------
+
+def tokens(text: str) -> List[str]:
+    # "B.Tech" -> "btech", "don't" -> "dont"
+    text = (text or "").lower().replace(".", "").replace("'", "").replace("’", "")
+    return _TOKEN.findall(text)
+
+
+@functools.lru_cache(maxsize=50000)
+def _word_buckets(word: str, bits: int) -> tuple:
+    # A word's own features (the word and its character n-grams) never change; most words repeat
+    mask = (1 << bits) - 1
+    padded = "<%s>" % word
+    grams = ["w" + word] + ["c" + padded[i:i + n] for n in (3, 4) for i in range(len(padded) - n + 1)]
+    return tuple(zlib.crc32(g.encode("utf-8")) & mask for g in grams)
+
+
+def features(text: str, bits: int = HASH_BITS) -> List[int]:
+    """Sorted distinct hashed feature buckets of ``text``."""
+    mask = (1 << bits) - 1
+    words = tokens(text)
+    buckets = {zlib.crc32(("b%s %s" % pair).encode("utf-8")) & mask for pair in zip(words, words[1:])}
+    for word in words:
+        buckets.update(_word_buckets(word, bits))
+    return sorted(buckets)
+
+
+# -- the model -------------------------------------------------------------
+
+class IntentModel:
+    """Trained weights: ``buckets`` (sorted feature buckets) x classes, plus a bias."""
+
+    def __init__(self, buckets, weights, bias, labels: Dict[str, List[str]], bits: int = HASH_BITS,
+                 multi_label: Iterable[str] = tuple(MULTI_LABEL_HEADS)):
+        self.buckets = buckets
+        self.weights = weights
+        self.bias = bias
+        self.labels = labels
+        self.bits = bits
+        self.multi_label = tuple(multi_label)
+        self._rows = {bucket: row for row, bucket in enumerate(buckets.tolist())}
+        self._slices = {}
+        start = 0
+        for head, classes in labels.items():
+            self._slices[head] = slice(start, start + len(classes))
+            start += len(classes)
+
+    def scores(self, text: str):
+        """Logits of every class of every head, concatenated in ``labels`` order."""
+        rows = [row for row in map(self._rows.get, features(text, self.bits)) if row is not None]
+        return self.weights[rows].sum(axis=0) + self.bias
+
+    def predict(self, text: str, with_confidence: bool = False) -> Dict:
+        """{head: label or None}; with ``with_confidence``, {head: (label, probability)}.
+
+        Multi-label heads also fill their MULTI_LABEL_HEADS key with every
+        label found, most likely first ([(label, probability)] with
+        ``with_confidence``).
+        """
+        logits = self.scores(text).tolist()
+        result = {}
+        for head, part in self._slices.items():
+            z = logits[part]
+            if head in self.multi_label:
+                p = [_sigmoid(v) for v in z]
+                found = sorted((i for i in range(len(z)) if p[i] >= MULTI_LABEL_THRESHOLD), key=lambda i: -p[i])
+                labels = [(self.labels[head][i], p[i]) for i in found]
+                top = labels[0] if labels else (None, 1.0 - max(p))
+                if with_confidence:
+                    result[head], result[MULTI_LABEL_HEADS[head]] = top, labels
+                else:
+                    result[head], result[MULTI_LABEL_HEADS[head]] = top[0], [label for label, _ in labels]
+                continue
+            best = max(range(len(z)), key=z.__getitem__)
+            label = self.labels[head][best] or None
+            if with_confidence:
+                result[head] = (label, 1.0 / sum(math.exp(v - z[best]) for v in z))
+            else:
+                result[head] = label
+        return result
+
+    def save(self, path) -> None:
+        np = _np()
+        tmp_path = f"{path}.tmp{os.getpid()}.npz"
+        np.savez_compressed(
+            tmp_path, buckets=self.buckets, weights=self.weights, bias=self.bias,
+            meta=np.array(json.dumps({"version": FORMAT_VERSION, "bits": self.bits, "labels": self.labels,
+                                      "multi_label": list(self.multi_label)})),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path) -> "IntentModel":
+        np = _np()
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != FORMAT_VERSION:
+                raise ValueError(f"{path} is intent model format {meta.get('version')}, expected {FORMAT_VERSION}")
+            return cls(data["buckets"], data["weights"], data["bias"], meta["labels"], meta["bits"],
+                       meta["multi_label"])
+
+
+def train(examples: List[Dict], epochs: int = 500, learning_rate: float = 10.0, l2: float = 1e-3,
+          bits: int = HASH_BITS) -> IntentModel:
+    """Fit the model on examples {"text", head: label or None, ...} by full-batch gradient descent.
+
+    A head missing from an example (the key itself, not a null label) does
+    not contribute to that head's loss. Multi-label heads take a list of
+    labels too; every class not listed is a negative.
+    """
+    np = _np()
+    labels = {head: ([""] if head in OPTIONAL_HEADS and head not in MULTI_LABEL_HEADS else []) + list(classes)
+              for head, classes in HEADS.items()}
+    offsets, width = {}, 0
+    for head, classes in labels.items():
+        offsets[head] = width
+        width += len(classes)
+
+    example_features = [features(example["text"], bits) for example in examples]
+    buckets = np.unique(np.fromiter((b for f in example_features for b in f), dtype=np.int64))
+    # Training data is small: a dense matrix over the buckets actually seen is cheap
+    x = np.zeros((len(examples), len(buckets)), dtype=np.float32)
+    targets = np.zeros((len(examples), width), dtype=np.float32)
+    mask = np.zeros((len(examples), width), dtype=np.float32)
+    for i, example in enumerate(examples):
+        x[i, np.searchsorted(buckets, example_features[i])] = 1.0
+        for head, classes in labels.items():
+            if head not in example:
+                continue
+            given = as_labels(example[head])
+            if head not in MULTI_LABEL_HEADS:
+                if len(given) > 1:
+                    raise ValueError(f"{head} takes one label, got {given!r} in {example!r}")
+                given = given or [""]
+            for label in given:
+                if label not in classes:
+                    raise ValueError(f"unknown {head} label {label!r} in {example!r}")
+                targets[i, offsets[head] + classes.index(label)] = 1.0
+            mask[i, offsets[head]:offsets[head] + len(classes)] = 1.0
+
+    weights = np.zeros((len(buckets), width), dtype=np.float32)
+    bias = np.zeros(width, dtype=np.float32)
+    counts = np.maximum(mask.sum(axis=0), 1.0)
+    for _ in range(epochs):
+        logits = x @ weights + bias
+        grad = np.empty_like(logits)
+        for head, classes in labels.items():
+            part = slice(offsets[head], offsets[head] + len(classes))
+            if head in MULTI_LABEL_HEADS:
+                grad[:, part] = 0.5 * (1.0 + np.tanh(0.5 * logits[:, part]))
+                continue
+            p = np.exp(logits[:, part] - logits[:, part].max(axis=1, keepdims=True))
+            grad[:, part] = p / p.sum(axis=1, keepdims=True)
+        # Mean (binary) cross-entropy gradient per head, over the examples labelled for it
+        grad = (grad - targets) * mask / counts
+        weights -= learning_rate * (x.T @ grad + l2 * weights)
+        bias -= learning_rate * grad.sum(axis=0)
+    return IntentModel(buckets.astype(np.uint32), weights, bias, labels, bits, MULTI_LABEL_HEADS)
+
+
+# -- training data ---------------------------------------------------------
+
+def load_examples(paths: Iterable) -> List[Dict]:
+    """Labelled examples from JSONL files ({"text", "stage", "stream", "interest", "intent"}).
+
+    ``interest`` may be a single label or a list of them.
+    """
+    examples = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                example = json.loads(line)
+                if not isinstance(example.get("text"), str):
+                    raise ValueError(f"{path}:{line_no}: missing 'text'")
+                examples.append({k: v for k, v in example.items() if k == "text" or k in HEADS})
+    return examples
+
+
+def tag_interest(tags: Iterable[str]) -> Optional[str]:
+    tags = {t.strip().lower() for t in tags or []}
+    for interest, interest_tags in TAG_INTERESTS.items():
+        if tags.intersection(interest_tags):
+            return interest
+    return None
+
+
+def dataset_examples(careers) -> List[Dict]:
+    """Interest-labelled examples from each career's name and example queries."""
+    examples = []
+    for career in careers:
+        interest = tag_interest(career.get("tags"))
+        if interest is None:
+            continue
+        for text in [career.get("name", "")] + list(career.get("example_queries") or []):
+            if text:
+                examples.append({"text": text, "interest": interest})
+    return examples
+
+
+def default_examples_path() -> Path:
+    return Path(settings.BASE_DIR) / "data" / "intent_examples.jsonl"
+
+
+def default_lexicon_path() -> Path:
+    return Path(settings.BASE_DIR) / "data" / "intent_lexicon.jsonl"
+
+
+# -- the previous keyword rules (fallback and evaluation baseline) ----------
+
+# Rejected paths the rules name differently from the interest labels
+RULE_PATH_LABELS = {"ca": "accounting", "bcom": "accounting"}
+
+
+def rule_labels(text: str) -> Dict:
+    """What the chat prompt builder's substring rules extracted from one message.
+
+    A rejection lists every path it names under ``interests``, with the old
+    names ("ca", "bcom"). A message that rejects is not also read as a choice.
+    """
+    t = (text or "").lower()
+    labels = {"stage": None, "stream": None, "interest": None, "interests": [], "intent": "other"}
+    if any(w in t for w in ["10th", "tenth", "class 10"]):
+        labels["stage"] = "10th"
+    elif any(w in t for w in ["12th", "twelfth", "class 12", "intermediate"]):
+        labels["stage"] = "12th"
+    elif any(w in t for w in ["undergraduate", "ug", "bachelor", "btech", "bsc", "ba", "bcom"]):
+        labels["stage"] = "UG"
+    elif any(w in t for w in ["postgraduate", "pg", "master", "mtech", "msc", "ma", "mcom"]):
+        labels["stage"] = "PG"
+
+    if any(w in t for w in ["science", "mpc", "bipc", "pcm", "pcb"]):
+        labels["stream"] = "Science"
+    elif "commerce" in t:
+        labels["stream"] = "Commerce"
+    elif any(w in t for w in ["arts", "humanities"]):
+        labels["stream"] = "Arts"
+
+    if any(p in t for p in ["don't want", "not interested", "don't like", "reject", "no", "not", "hate",
+                            "dislike", "idk", "i don't know"]):
+        labels["intent"] = "reject"
+        for path, words in (("coding", ["coding", "programming", "software", "developer", "tech"]),
+                            ("engineering", ["engineering", "engineer", "btech"]),
+                            ("ca", ["ca", "chartered accountant", "accountant"]),
+                            ("law", ["law", "lawyer", "llb", "legal"]),
+                            ("bcom", ["bcom", "commerce", "commercial"])):
+            if any(w in t for w in words):
+                labels["interests"].append(path)
+    elif any(w in t for w in ["want", "interested in", "like", "prefer", "choose"]):
+        labels["intent"] = "choose"
+        if "law" in t:
+            labels["interest"] = "law"
+        elif "business" in t or "mba" in t or "commerce" in t:
+            labels["interest"] = "business"
+        elif "medicine" in t or "medical" in t or "mbbs" in t:
+            labels["interest"] = "medicine"
+        elif "engineering" in t or "tech" in t:
+            labels["interest"] = "engineering"
+        if labels["interest"]:
+            labels["interests"].append(labels["interest"])
+    elif any(p in t for p in ["i don't know", "what should i take", "what should i do", "help me decide",
+                              "not sure", "confused", "help", "lost", "stuck", "overwhelmed"]):
+        labels["intent"] = "unsure"
+    if labels["interests"]:
+        labels["interest"] = labels["interests"][0]
+    return labels
+
+
+# -- serving ---------------------------------------------------------------
+
+def get_model() -> Optional[IntentModel]:
+    """The trained model from INTENT_MODEL_PATH, loaded once per process; None if there is none."""
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                path = getattr(settings, "INTENT_MODEL_PATH", None)
+                if path and os.path.exists(path):
+                    try:
+                        _model = IntentModel.load(path)
+                    except Exception as e:
+                        logger.warning("Could not load intent model %s, using keyword rules: %s", path, e)
+                _model_loaded = True
+    return _model
+
+
+def reload_model() -> None:
+    """Forget the loaded model; the next ``classify`` reads INTENT_MODEL_PATH again."""
+    global _model, _model_loaded
+    with _model_lock:
+        _model, _model_loaded = None, False
+
+
+def classify(text: str) -> Dict:
+    """{"stage", "stream", "interest", "interests", "intent"} for one message (None / [] = not said)."""
+    model = get_model()
+    return model.predict(text) if model is not None else rule_labels(text)
+
+
+# -- evaluation ------------------------------------------------------------
+
+def evaluate(examples: List[Dict], extra_training: List[Dict] = (), folds: int = 5, seed: int = 0,
+             **train_options) -> Dict:
+    """K-fold accuracy per head of the model and of ``rule_labels`` on ``examples``.
+
+    ``extra_training`` (e.g. the dataset examples) is added to every
+    training fold but never scored.
+    """
+    order = list(range(len(examples)))
+    random.Random(seed).shuffle(order)
+    correct = {head: {"model": 0, "rules": 0, "n": 0} for head in HEADS}
+    for fold in range(folds):
+        held_out = set(order[fold::folds])
+        model = train([e for i, e in enumerate(examples) if i not in held_out] + list(extra_training),
+                      **train_options)
+        for i in held_out:
+            example = examples[i]
+            predicted, rules = model.predict(example["text"]), rule_labels(example["text"])
+            rules["interests"] = [RULE_PATH_LABELS.get(path, path) for path in rules["interests"]]
+            for head in HEADS:
+                if head not in example:
+                    continue
+                correct[head]["n"] += 1
+                if head in MULTI_LABEL_HEADS:
+                    # Right only if exactly the labelled set was found
+                    key, expected = MULTI_LABEL_HEADS[head], set(as_labels(example[head]))
+                    correct[head]["model"] += set(predicted[key]) == expected
+                    correct[head]["rules"] += set(rules[key]) == expected
+                    continue
+                correct[head]["model"] += predicted[head] == example[head]
+                correct[head]["rules"] += rules[head] == example[head]
+    report = {}
+    for head, c in correct.items():
+        if c["n"]:
+            report[head] = {"n": c["n"], "model": c["model"] / c["n"], "rules": c["rules"] / c["n"]}
+    return report
+
+
+def latency_us(model: IntentModel, texts: List[str], repeat: int = 20) -> float:
+    """Mean microseconds per ``predict`` over ``texts``."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            model.predict(text)
+    return (time.perf_counter() - started) / (repeat * len(texts)) * 1e6
@@ -0,0 +1,205 @@
+# chat/services/llm_gateway.py
+"""Single entry point for every LLM call in the project.
+
+Callers build chat messages ({"role", "content"}) and call
+``get_gateway().generate(...)``. The gateway picks the provider(s) for the
+endpoint from LLM_ENDPOINT_PROVIDERS, fails over down that list, applies
+the request Deadline, consults the optional response cache and records
+per-provider metrics. Switching an endpoint to another provider (or to the
+deterministic "local" provider for offline runs) is a settings change.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from chat.utils.deadline import Deadline, DeadlineExceeded
+from .llm_providers import PROVIDERS, LLMError, LLMProvider
+
+logger = logging.getLogger(__name__)
+
+
+def truncate_reply(reply: str, limit: int = 1500) -> str:
+    """Limit response to prevent token exhaustion, but don't cut mid-sentence."""
+    if len(reply) <= limit:
+        return reply
+    cutoff = limit
+
+    # Look backwards for sentence endings, avoiding list markers
+    last_period = -1
+    for i in range(min(cutoff, len(reply)) - 1, max(0, cutoff - 300), -1):
+        if reply[i] in '.!?':
+            # Check if it's not a numbered list marker (1. 2. etc.) or markdown
+            if i > 0 and i < len(reply) - 1:
+                prev_char = reply[i-1]
+                next_char = reply[i+1] if i+1 < len(reply) else ' '
+                # Skip if it's a list marker (digit + period + space) or markdown
+                if not (prev_char.isdigit() and next_char == ' ') and reply[i] != '.':
+                    last_period = i
+                    break
+            elif reply[i] != '.':
+                last_period = i
+                break
+
+    # Also check for periods that end sentences (followed by space and capital or end of text)
+    if last_period == -1:
+        for i in range(min(cutoff, len(reply)) - 1, max(0, cutoff - 300), -1):
+            if reply[i] == '.':
+                if i < len(reply) - 1:
+                    # Check if followed by space and capital letter (sentence end)
+                    if i + 2 < len(reply) and reply[i+1] == ' ' and reply[i+2].isupper():
+                        last_period = i
+                        break
+                else:
+                    # End of text
+                    last_period = i
+                    break
+
+    last_question = reply.rfind('?', 0, cutoff)
+    last_exclamation = reply.rfind('!', 0, cutoff)
+    last_sentence = max(last_period, last_question, last_exclamation)
+
+    if last_sentence > 400:  # Only truncate if we have a reasonable sentence
+        return reply[:last_sentence + 1]
+    # If no good sentence boundary, find last newline or space
+    last_newline = reply.rfind('\n', 0, cutoff)
+    last_space = reply.rfind(' ', 0, cutoff)
+    if last_newline > 400:
+        return reply[:last_newline]
+    if last_space > 400:
+        return reply[:last_space] + "..."
+    return reply[:limit] + "..."
+
+
+class DjangoCacheHook:
+    """Default response cache: Django's cache, enabled when LLM_CACHE_TTL > 0."""
+
+    def get(self, key: str) -> Optional[Dict]:
+        from django.core.cache import cache
+        try:
+            return cache.get(key)
+        except Exception:
+            return None
+
+    def set(self, key: str, value: Dict, ttl: int) -> None:
+        from django.core.cache import cache
+        try:
+            cache.set(key, value, ttl)
+        except Exception:
+            pass
+
+
+class LLMGateway:
+    def __init__(self, providers: Optional[Dict[str, LLMProvider]] = None, cache=None):
+        self.providers = providers or {name: cls() for name, cls in PROVIDERS.items()}
+        # Any object with get(key) / set(key, value, ttl)
+        self.cache = cache if cache is not None else DjangoCacheHook()
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def providers_for(self, endpoint: str) -> List[str]:
+        routes = getattr(settings, "LLM_ENDPOINT_PROVIDERS", {})
+        route = routes.get(endpoint, routes.get("default", "gemini"))
+        return [route] if isinstance(route, str) else list(route)
+
+    def _record(self, provider: str, outcome: str, latency: float = 0.0) -> None:
+        with self._lock:
+            m = self._metrics.setdefault(provider, {"calls": 0, "successes": 0, "failures": 0,
+                                                    "cache_hits": 0, "latency_total": 0.0})
+            if outcome == "cache_hit":
+                m["cache_hits"] += 1
+                return
+            m["calls"] += 1
+            m["successes" if outcome == "success" else "failures"] += 1
+            m["latency_total"] += latency
+
+    def stats(self) -> Dict:
+        """Per-provider call counts, failure counts, cache hits and mean latency."""
+        with self._lock:
+            stats = {name: dict(m) for name, m in self._metrics.items()}
+        for m in stats.values():
+            m["latency_avg"] = m["latency_total"] / m["calls"] if m["calls"] else 0.0
+        return stats
+
+    @staticmethod
+    def cache_key(provider: str, messages: List[Dict], options: Dict) -> str:
+        raw = json.dumps([provider, messages, options], sort_keys=True, ensure_ascii=False)
+        return "llm:reply:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def generate(self, messages: List[Dict], endpoint: str = "default", deadline: Optional[Deadline] = None,
+                 provider: Optional[str] = None, temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None, max_chars: Optional[int] = 1500,
+                 json_mode: bool = False) -> Dict:
+        """Generate a reply for ``messages``.
+
+        ``provider`` forces a provider; otherwise the endpoint's route is used,
+        failing over to the next provider on error. ``json_mode`` requests a
+        single JSON object (never truncated); the caller still validates it. Returns
+        {"text", "provider", "model", "latency", "cached"} or raises ``LLMError``
+        with the last failure.
+        """
+        if deadline is None:
+            deadline = Deadline.for_endpoint(endpoint)
+        options = {"temperature": temperature, "max_tokens": max_tokens}
+        if json_mode:
+            options["json_mode"] = True
+            max_chars = None  # a truncated object is not JSON
+        cache_ttl = getattr(settings, "LLM_CACHE_TTL", 0)
+        last_error = LLMError("No LLM provider available")
+
+        for name in ([provider] if provider else self.providers_for(endpoint)):
+            backend = self.providers.get(name)
+            if backend is None or not backend.available():
+                logger.info("LLM provider %s unavailable for endpoint %s", name, endpoint)
+                continue
+            key = self.cache_key(name, messages, options) if cache_ttl else None
+            if key:
+                cached = self.cache.get(key)
+                if cached:
+                    self._record(name, "cache_hit")
+                    return dict(cached, cached=True)
+            if deadline.expired:
+                raise LLMError("deadline exceeded")
+
+            started = time.monotonic()
+            try:
+                text, model = backend.generate(messages, deadline, temperature=temperature, max_tokens=max_tokens,
+                                               json_mode=json_mode)
+            except (LLMError, DeadlineExceeded) as e:
+                self._record(name, "failure", time.monotonic() - started)
+                logger.warning("LLM provider %s failed: %s", name, str(e)[:200])
+                last_error = e if isinstance(e, LLMError) else LLMError(str(e))
+                continue
+            latency = time.monotonic() - started
+            self._record(name, "success", latency)
+
+            result = {
+                "text": truncate_reply(text, max_chars) if max_chars else text,
+                "provider": name,
+                "model": model,
+                "latency": latency,
+                "cached": False,
+            }
+            if key:
+                self.cache.set(key, result, cache_ttl)
+            return result
+        raise last_error
+
+
+_gateway_lock = threading.Lock()
+_gateway = None
+
+
+def get_gateway() -> LLMGateway:
+    """Process-wide gateway (providers keep their pooled clients between requests)."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
@@ -0,0 +1,476 @@
+# chat/services/llm_providers.py
+"""LLM providers behind the gateway in chat/services/llm_gateway.py.
+
+Each provider turns a list of chat messages ({"role", "content"}) into a
+reply string, or raises ``LLMError``. Providers own their model cascade;
+timeouts always come from the request's Deadline and HTTP goes through one
+pooled session per process.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from career_ai.tiered_cache import TieredCache
+from chat.utils.deadline import Deadline, DeadlineExceeded
+from chat.utils.hedging import hedging_enabled, hedged_cascade, mark_unhealthy, record_latency
+
+logger = logging.getLogger(__name__)
+
+
+
+@functools.lru_cache(maxsize=None)
+def _genai():
+    """The Google Generative AI SDK, imported on first Gemini call (None if not installed).
+
+    The SDK pulls in gRPC/protobuf, so it is kept out of process startup.
+    """
+    try:
+        import google.generativeai as genai
+    except ImportError:
+        logger.debug("google-generativeai SDK not installed, using REST API")
+        return None
+    return genai
+
+
+class LLMError(Exception):
+    """A provider could not produce a reply. ``rate_limited`` marks quota errors."""
+
+    def __init__(self, message: str, rate_limited: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+
+
+def _is_rate_limit(error: str) -> bool:
+    error = str(error or "")
+    return ("429" in error or "quota" in error.lower() or "rate limit" in error.lower()
+            or "RESOURCE_EXHAUSTED" in error)
+
+
+def _retry_after(error: str) -> Optional[float]:
+    match = re.search(r'retry in ([\d.]+)s', str(error or "").lower())
+    return float(match.group(1)) if match else None
+
+
+_session_lock = threading.Lock()
+_session = None
+
+
+def get_http_session() -> "requests.Session":
+    """Process-wide pooled HTTP session shared by all providers."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                session = requests.Session()
+                pool_size = 2 * getattr(settings, "LLM_MAX_CONCURRENCY", 8)
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def split_messages(messages: List[Dict]) -> Tuple[str, List[Dict]]:
+    """Separate system instructions from the conversation turns."""
+    system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+    turns = [m for m in messages if m["role"] != "system"]
+    return system, turns
+
+
+def flatten_messages(messages: List[Dict]) -> str:
+    """Single-prompt rendering for text-in/text-out providers."""
+    system, turns = split_messages(messages)
+    if len(turns) == 1:
+        body = turns[0]["content"]
+    else:
+        body = "\n".join(f"{'Assistant' if m['role'] == 'assistant' else 'User'}: {m['content']}" for m in turns)
+    return f"{system}\n\n{body}" if system else body
+
+
+class LLMProvider:
+    name = ""
+
+    def available(self) -> bool:
+        return True
+
+    def generate(self, messages: List[Dict], deadline: Deadline, temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None, json_mode: bool = False) -> Tuple[str, str]:
+        """Return (reply_text, model_name) or raise LLMError.
+
+        With ``json_mode`` the model is asked for a single JSON object using the
+        provider's structured output option.
+        """
+        raise NotImplementedError
+
+
+# Gemini model lists per API key (they change on the order of weeks)
+_model_lists = TieredCache("llm.models", ttl=3600)
+
+_SDK_CONFIG_KEYS = {"maxOutputTokens": "max_output_tokens", "responseMimeType": "response_mime_type"}
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    # Default fallback list - prioritize newer models (2.5, 2.0)
+    # Note: 1.5 models are deprecated and not available
+    default_models = [
+        ("v1", "gemini-2.5-flash"),
+        ("v1", "gemini-2.5-pro"),
+        ("v1", "gemini-2.0-flash"),
+        ("v1", "gemini-2.0-flash-001"),
+    ]
+    # Only try SDK models that are actually available (2.5 and 2.0)
+    sdk_models = ['gemini-2.5-flash', 'gemini-2.5-pro', 'gemini-2.0-flash']
+
+    def api_key(self) -> Optional[str]:
+        return getattr(settings, 'GEMINI_API_KEY', None) or os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+
+    def available(self) -> bool:
+        return bool(self.api_key())
+
+    def get_available_models(self, api_key: str, deadline: Optional[Deadline] = None) -> List[str]:
+        """Models available to ``api_key``, cached per key so the cascade doesn't list them on every call."""
+        key = hashlib.sha1(api_key.encode("utf-8")).hexdigest()[:16]
+        models = _model_lists.get(key)
+        if models is None:
+            models = self._list_models(api_key, deadline)
+            # An empty list means listing failed; try again on the next call
+            if models:
+                _model_lists.set(key, models)
+        return models
+
+    def _list_models(self, api_key: str, deadline: Optional[Deadline] = None) -> List[str]:
+        """Get list of available models from Gemini API that support generateContent."""
+        http = get_http_session()
+        for api_version in ("v1", "v1beta"):
+            try:
+                url = f"https://generativelanguage.googleapis.com/{api_version}/models?key={api_key}"
+                response = http.get(url, timeout=deadline.timeout(10) if deadline else 10)
+                if response.status_code != 200:
+                    continue
+                all_models = []
+                filtered_models = []
+                # Get all models and filter those that support generateContent
+                for model in response.json().get('models', []):
+                    model_name = model['name'].split('/')[-1]
+                    all_models.append(model_name)
+                    supported_methods = model.get('supportedGenerationMethods', [])
+                    if supported_methods and 'generateContent' in supported_methods:
+                        filtered_models.append(model_name)
+                    elif not supported_methods:
+                        # If supportedGenerationMethods is not present, include it anyway (some APIs don't return this)
+                        filtered_models.append(model_name)
+
+                logger.debug("All models (%s): %s", api_version, all_models)
+                logger.debug("Models with generateContent support (%s): %s", api_version, filtered_models)
+                if filtered_models:
+                    return filtered_models
+                # If no filtered models but we have models, return all (fallback)
+                if all_models:
+                    logger.debug("No generateContent filter found, using all models")
+                    return all_models
+            except Exception as e:
+                logger.debug("Could not list models with %s: %s", api_version, e)
+        return []
+
+    def model_configs(self, available_models: List[str]) -> List[Tuple[str, str]]:
+        """Ordered (api_version, model) cascade: listed gemini models first, then defaults."""
+        model_configs = []
+        # Filter for gemini models (exclude embedding models)
+        gemini_models = [m for m in available_models if "gemini" in m.lower() and "embedding" not in m.lower()]
+        if gemini_models:
+            # Sort models by priority: 2.5 > 2.0 > 1.5 > others
+            def get_priority(model_name):
+                if "2.5" in model_name:
+                    return 1
+                elif "2.0" in model_name:
+                    return 2
+                elif "1.5" in model_name:
+                    return 3
+                else:
+                    return 4
+
+            # Sort by priority, then by name (pro before flash)
+            gemini_models.sort(key=lambda x: (get_priority(x), "pro" not in x.lower(), x))
+            logger.debug("Sorted gemini models: %s", gemini_models)
+            model_configs.extend(("v1", model) for model in gemini_models)
+            # Add v1beta versions as fallback
+            model_configs.extend(("v1beta", model) for model in gemini_models)
+        else:
+            logger.debug("No models from API, using defaults")
+        # Add default models as fallback (in case available_models is empty or didn't work)
+        model_configs.extend(self.default_models)
+        logger.debug("Total model configs to try: %s", len(model_configs))
+        return model_configs
+
+    def _rest_generate(self, api_version: str, model: str, api_key: str, payload: Dict,
+                       timeout: float, http=None):
+        """POST one generateContent attempt. Returns (data, None) on success or (None, error)."""
+        http = http or get_http_session()
+        url = f"https://generativelanguage.googleapis.com/{api_version}/models/{model}:generateContent?key={api_key}"
+        logger.debug("Trying API %s with model: %s", api_version, model)
+
+        started = time.monotonic()
+        try:
+            response = http.post(url, headers={"Content-Type": "application/json"}, json=payload, timeout=timeout)
+            logger.debug("Response status: %s", response.status_code)
+
+            # Check for HTTP errors
+            if response.status_code != 200:
+                error_text = response.text
+                logger.warning("HTTP Error - Status: %s", response.status_code)
+                logger.warning("Error Body: %s", error_text[:500])
+                if response.status_code in (404, 429) or response.status_code >= 500:
+                    mark_unhealthy(api_version, model)
+                if response.status_code == 429:
+                    retry_seconds = _retry_after(error_text)
+                    if retry_seconds:
+                        logger.warning("Quota exceeded. Retry in %.1f seconds", retry_seconds)
+                    logger.warning("Quota exceeded for %s. This API key has hit rate limits.", model)
+                return None, error_text  # Try next model
+
+            data = response.json()
+            # Check for API errors in response
+            if "error" in data:
+                error_msg = str(data['error'])
+                logger.warning("API Error in response: %s", error_msg)
+                return None, error_msg  # Try next model
+
+            record_latency(time.monotonic() - started)
+            logger.debug("Successfully using API %s with model: %s", api_version, model)
+            return data, None
+
+        except Exception as e:
+            logger.warning("Exception with %s/%s: %s", api_version, model, e)
+            return None, str(e)
+
+    @staticmethod
+    def _extract_text(data: Dict) -> str:
+        candidates = data.get("candidates") or []
+        if candidates:
+            parts = candidates[0].get("content", {}).get("parts") or []
+            if parts and "text" in parts[0]:
+                return parts[0]["text"].strip()
+        return ""
+
+    def _generate_sdk(self, genai, api_key: str, prompt: str, deadline: Deadline,
+                      generation_config: Dict) -> Optional[Tuple[str, str]]:
+        try:
+            genai.configure(api_key=api_key)
+        except Exception as e:
+            logger.warning("SDK initialization failed: %s, trying REST API", e)
+            return None
+        # The SDK takes the proto field names, the REST payload their camelCase JSON names
+        sdk_config = {_SDK_CONFIG_KEYS.get(k, k): v for k, v in generation_config.items()} or None
+        for model_name in self.sdk_models:
+            if deadline.expired:
+                logger.info("Deadline exhausted before SDK model %s", model_name)
+                break
+            try:
+                logger.debug("Trying SDK with model: %s", model_name)
+                model = genai.GenerativeModel(model_name)
+                response = model.generate_content(
+                    prompt,
+                    generation_config=sdk_config,
+                    request_options={"timeout": deadline.timeout(30)},
+                )
+                # Check if response has text
+                if not hasattr(response, 'text') or not response.text:
+                    logger.debug("SDK model %s returned empty response", model_name)
+                    continue
+                reply = response.text.strip()
+                if reply:
+                    logger.debug("Successfully using SDK with model: %s", model_name)
+                    return reply, model_name
+            except Exception as e:
+                error_msg = str(e)
+                logger.warning("SDK model %s failed: %s", model_name, error_msg)
+                if "API key" in error_msg or "401" in error_msg or "authentication" in error_msg.lower():
+                    logger.warning("Authentication error with %s - API key may be invalid", model_name)
+                elif _is_rate_limit(error_msg):
+                    logger.warning("Quota/rate limit issue with %s", model_name)
+        logger.warning("All SDK models failed, trying REST API")
+        return None
+
+    def generate(self, messages, deadline, temperature=None, max_tokens=None, json_mode=False):
+        api_key = self.api_key()
+        if not api_key:
+            raise LLMError("No Gemini API key configured")
+        prompt = flatten_messages(messages)
+        generation_config = {}
+        if temperature is not None:
+            generation_config["temperature"] = temperature
+        if max_tokens is not None:
+            generation_config["maxOutputTokens"] = max_tokens
+        if json_mode:
+            generation_config["responseMimeType"] = "application/json"
+
+        # If SDK is available, try using it first
+        genai = _genai()
+        if genai is not None:
+            result = self._generate_sdk(genai, api_key, prompt, deadline, generation_config)
+            if result:
+                return result
+            available_models = []
+        else:
+            available_models = self.get_available_models(api_key, deadline)
+
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        if generation_config:
+            payload["generationConfig"] = generation_config
+        model_configs = self.model_configs(available_models)
+
+        data, model, last_error = None, None, None
+        if hedging_enabled():
+            # Race a second healthy model once the primary is slower than usual
+            def attempt(cfg, http, timeout):
+                return self._rest_generate(cfg[0], cfg[1], api_key, payload, timeout, http)
+
+            data, last_error, config = hedged_cascade(model_configs, attempt, deadline)
+            model = config[1] if config else None
+        else:
+            for api_version, model_name in model_configs:
+                if deadline.expired:
+                    logger.info("Deadline exhausted, stopping cascade before %s/%s", api_version, model_name)
+                    last_error = last_error or "deadline exceeded"
+                    break
+                try:
+                    data, error = self._rest_generate(api_version, model_name, api_key, payload, deadline.timeout(30))
+                except DeadlineExceeded as e:
+                    data, error = None, str(e)
+                if data is not None:
+                    model = model_name
+                    break
+                last_error = error
+
+        if data is None:
+            logger.warning("All models failed. Last error: %s", str(last_error)[:200])
+            raise LLMError(str(last_error or "Unknown error"), rate_limited=_is_rate_limit(last_error),
+                           retry_after=_retry_after(last_error))
+        reply = self._extract_text(data)
+        if not reply:
+            logger.warning("No reply extracted from response. Full response: %s", data)
+            raise LLMError("Empty Gemini response")
+        return reply, model
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+    # Try GPT-4 first, fallback to GPT-3.5-turbo
+    models = [
+        "gpt-4o",  # Latest GPT-4 model
+        "gpt-4-turbo",
+        "gpt-4",
+        "gpt-3.5-turbo",
+    ]
+
+    def __init__(self):
+        self._client = None
+        self._client_key = None
+        self._lock = threading.Lock()
+
+    def api_key(self) -> Optional[str]:
+        return getattr(settings, 'OPENAI_API_KEY', None) or os.getenv("OPENAI_API_KEY")
+
+    def available(self) -> bool:
+        return bool(self.api_key())
+
+    def _get_client(self):
+        api_key = self.api_key()
+        with self._lock:
+            if self._client is None or self._client_key != api_key:
+                from openai import OpenAI
+                # The model loop is the retry policy; SDK retries would overrun the deadline
+                self._client = OpenAI(api_key=api_key, max_retries=0)
+                self._client_key = api_key
+        return self._client
+
+    def generate(self, messages, deadline, temperature=None, max_tokens=None, json_mode=False):
+        if not self.api_key():
+            raise LLMError("No OpenAI API key configured")
+        client = self._get_client()
+        openai_messages = [
+            {"role": "assistant" if m["role"] == "bot" else m["role"], "content": m["content"]}
+            for m in messages
+        ]
+        last_error = None
+        for model in self.models:
+            if deadline.expired:
+                logger.info("Deadline exhausted before GPT model: %s", model)
+                last_error = last_error or "deadline exceeded"
+                break
+            try:
+                logger.debug("Trying GPT model: %s", model)
+                extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+                response = client.chat.completions.create(
+                    model=model,
+                    messages=openai_messages,
+                    temperature=0.7 if temperature is None else temperature,
+                    max_tokens=max_tokens or 1000,
+                    timeout=deadline.timeout(30),
+                    **extra,
+                )
+                reply = (response.choices[0].message.content or "").strip()
+                if reply:
+                    logger.debug("Successfully using GPT model: %s", model)
+                    return reply, model
+                last_error = "empty reply"
+            except Exception as e:
+                logger.warning("Failed with %s: %s", model, str(e))
+                last_error = str(e)
+        raise LLMError(f"All GPT models failed. Last error: {last_error}",
+                       rate_limited=_is_rate_limit(last_error))
+
+
+class LocalProvider(LLMProvider):
+    """Deterministic offline provider for tests, demos and benchmarks.
+
+    The same messages always produce the same reply; LLM_LOCAL_LATENCY_MS
+    adds a fixed simulated latency. In JSON mode the reply is wrapped in a
+    {"reply", "stage", "interest"} object, which callers expecting their own
+    schema reject and handle like any other unusable model output.
+    """
+    name = "local"
+
+    def generate(self, messages, deadline, temperature=None, max_tokens=None, json_mode=False):
+        from chat.utils.ai_fallback import detect_stage_simple, detect_interest_simple
+
+        latency = getattr(settings, "LLM_LOCAL_LATENCY_MS", 0) / 1000.0
+        if latency:
+            time.sleep(min(latency, deadline.remaining()))
+        _, turns = split_messages(messages)
+        user_text = next((m["content"] for m in reversed(turns) if m["role"] == "user"), "")
+        # Prompts lead with the user's own words; the instructions below them would skew detection
+        user_text = user_text.strip().splitlines()[0] if user_text.strip() else ""
+        digest = hashlib.sha1(flatten_messages(messages).encode("utf-8")).hexdigest()[:8]
+        stage = detect_stage_simple(user_text)
+        interest = detect_interest_simple(user_text)
+        parts = [f"You're at {stage}." if stage else "Tell me your stage (10th/12th/UG/PG).",
+                 f"Since you like {interest}, start with one beginner course and a small project this month."
+                 if interest else "Which area excites you most: coding, science, commerce or arts?",
+                 "I can generate a clear roadmap if you want."]
+        reply = " ".join(parts)
+        if json_mode:
+            return json.dumps({"reply": reply, "stage": stage, "interest": interest}), f"local-{digest}"
+        if max_tokens:
+            reply = reply[:max_tokens * 4]
+        return reply, f"local-{digest}"
+
+
+PROVIDERS = {
+    "gemini": GeminiProvider,
+    "openai": OpenAIProvider,
+    "local": LocalProvider,
+}
@@ -0,0 +1,228 @@
+# chat/services/related_careers.py
+"""Precomputed "careers similar to X", served without an LLM call.
+
+``manage.py build_related_careers`` runs offline. It turns each career into
+a TF-IDF vector over its skills, tags, specialties and description,
+computes cosine similarities and keeps the top-k neighbours per career.
+The result is written to RELATED_CAREERS_PATH as JSON. Requests then
+answer with a dict lookup.
+
+Skills, tags and specialties add two kinds of term: the whole phrase
+("machine learning") and its words. A shared skill therefore counts
+more than a shared word. List fields are weighted above the description
+(FIELD_WEIGHTS).
+
+Similarities are computed in row blocks: each block of ``block_size``
+careers is multiplied against the whole matrix and reduced to its top-k
+with ``argpartition``. Memory stays at block_size x n instead of n x n,
+which lets the build scale to tens of thousands of careers. The
+vocabulary is capped at ``max_features`` terms (by document frequency)
+to bound the n x vocabulary matrix.
+
+If no file has been built, the neighbours are computed in-process on
+first use. That is fine for the bundled dataset of a few dozen careers.
+The file records a digest of the careers it was built from
+(``dataset_digest``); when the careers change and the file was not
+rebuilt, it is ignored with a warning and the neighbours are computed
+in-process as well.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+FIELD_WEIGHTS = {"skills": 2.0, "tags": 2.0, "specialties": 1.5, "description": 1.0}
+# Career fields the neighbours depend on (hashed by dataset_digest)
+DATASET_FIELDS = ("name", "stage", "skills", "tags", "specialties", "description")
+DEFAULT_TOP_K = 10
+# Neighbours below this cosine similarity are not worth suggesting
+MIN_SCORE = 0.05
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "at", "by", "from", "is", "are",
+    "be", "it", "this", "that", "as", "into", "its", "their", "who", "which", "can", "will", "you",
+    "your", "after", "year", "years", "course", "courses", "program", "degree", "career", "careers",
+}
+
+_related = None
+_lock = threading.Lock()
+
+
+def _np():
+    import numpy
+    return numpy
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in _WORD.findall((text or "").lower().replace(".", "")) if len(w) > 1 and w not in _STOPWORDS]
+
+
+def career_terms(career, name_weight: float = 0.0) -> Counter:
+    """Weighted term counts of one career; the name's words count only if ``name_weight`` is set."""
+    terms = Counter()
+    if name_weight:
+        for word in _words(career.get("name", "")):
+            terms["w:" + word] += name_weight
+    for field in ("skills", "tags", "specialties"):
+        weight = FIELD_WEIGHTS[field]
+        for item in career.get(field) or []:
+            phrase = item.get("name", "") if isinstance(item, dict) else str(item)
+            words = _words(phrase)
+            if not words:
+                continue
+            terms["p:" + " ".join(words)] += weight
+            for word in words:
+                terms["w:" + word] += weight
+    for word in _words(career.get("description", "")):
+        terms["w:" + word] += FIELD_WEIGHTS["description"]
+    return terms
+
+
+def tfidf_matrix(careers, max_features: int = 20000, min_df: int = 2, name_weight: float = 0.0):
+    """Row-normalized float32 TF-IDF matrix (careers x terms), its vocabulary and idf weights.
+
+    The default ``min_df`` of 2 drops terms found in a single career,
+    which cannot link two careers.
+    """
+    np = _np()
+    counts = [career_terms(c, name_weight) for c in careers]
+    df = Counter(term for terms in counts for term in terms)
+    vocabulary = [t for t, n in sorted(df.items(), key=lambda item: (-item[1], item[0])) if n >= min_df][:max_features]
+    index = {term: i for i, term in enumerate(vocabulary)}
+    n = len(careers)
+    idf = np.array([math.log((1 + n) / (1 + df[t])) + 1.0 for t in vocabulary], dtype=np.float32)
+
+    x = np.zeros((n, len(vocabulary)), dtype=np.float32)
+    for row, terms in enumerate(counts):
+        for term, weight in terms.items():
+            col = index.get(term)
+            if col is not None:
+                x[row, col] = 1.0 + math.log(weight)  # sublinear tf
+    x *= idf
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    x /= np.where(norms > 0, norms, 1.0)
+    return x, vocabulary, idf
+
+
+def top_k_neighbours(x, k: int = DEFAULT_TOP_K, block_size: int = 1024):
+    """(indices, scores) of each row's ``k`` most similar other rows, best first.
+
+    Cosine similarity of normalized rows is a dot product; it is computed
+    block_size rows at a time so peak memory is block_size x n floats.
+    """
+    np = _np()
+    n = x.shape[0]
+    k = max(0, min(k, n - 1))
+    indices = np.zeros((n, k), dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        sims = x[start:stop] @ x.T
+        sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # not its own neighbour
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        indices[start:stop] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+    return indices, scores
+
+
+def dataset_digest(careers) -> str:
+    """Hash of the DATASET_FIELDS of ``careers``, to tell whether a built file is still current."""
+    h = hashlib.sha1()
+    for career in careers:
+        h.update(json.dumps([career.get(field) for field in DATASET_FIELDS], default=str).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()[:16]
+
+
+def build(careers, k: int = DEFAULT_TOP_K, block_size: int = 1024, max_features: int = 20000,
+          min_score: float = MIN_SCORE) -> Dict:
+    """{"version", "digest", "dataset", "built_at", "k", "related": {lower-cased name: [[name, stage, score], ...]}}.
+
+    ``digest`` hashes the neighbours (for ETags), ``dataset`` the careers they were built from.
+    """
+    careers = list(careers)
+    x, _, _ = tfidf_matrix(careers, max_features)
+    indices, scores = top_k_neighbours(x, k, block_size)
+    related = {}
+    for i, career in enumerate(careers):
+        related[career.get("name", "").strip().lower()] = [
+            [careers[j].get("name", ""), careers[j].get("stage", ""), round(float(s), 4)]
+            for j, s in zip(indices[i].tolist(), scores[i].tolist()) if s >= min_score
+        ]
+    digest = hashlib.sha1(json.dumps(related, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return {"version": FORMAT_VERSION, "digest": digest, "dataset": dataset_digest(careers),
+            "built_at": int(time.time()), "k": k, "related": related}
+
+
+def save(data: Dict, path) -> None:
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _load() -> Dict:
+    from chat.utils.data_loader import get_career_data
+    careers = get_career_data()
+    path = getattr(settings, "RELATED_CAREERS_PATH", None)
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != FORMAT_VERSION:
+                logger.warning("%s is related-careers format %s, rebuilding in-process", path, data.get("version"))
+            elif data.get("dataset") != dataset_digest(careers):
+                logger.warning("%s was built from other careers than the current dataset, rebuilding in-process; "
+                               "run `manage.py build_related_careers` after changing the careers", path)
+            else:
+                return data
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read %s, rebuilding in-process: %s", path, e)
+    return build(careers)
+
+
+def _current() -> Dict:
+    global _related
+    data = _related
+    if data is None:
+        with _lock:
+            if _related is None:
+                _related = _load()
+            data = _related
+    return data
+
+
+def reset() -> None:
+    """Forget the loaded neighbours (invalidation bus handler); the next lookup reloads them."""
+    global _related
+    _related = None
+
+
+def version() -> str:
+    """Content hash of the neighbour set currently served (for ETags)."""
+    return _current()["digest"]
+
+
+def related_careers(name: str, limit: Optional[int] = None) -> Optional[List[Dict]]:
+    """Neighbours of career ``name`` as [{"name", "stage", "score"}]; None if the career is unknown."""
+    neighbours = _current()["related"].get((name or "").strip().lower())
+    if neighbours is None:
+        return None
+    return [{"name": n, "stage": stage, "score": score} for n, stage, score in neighbours[:limit]]
@@ -0,0 +1,239 @@
+# chat/services/roadmap_generator.py
+"""Structured career roadmap generation.
+
+The model is called through the gateway in JSON mode with a compact prompt
+(no counselling persona) and must return::
+
+    {"title": str, "steps": [{"title", "description", "estimated_time",
+                              "skills": [str], "resources": [{"name", "url"}]}]}
+
+The reply is validated and normalized server-side into RoadmapItem-shaped
+dicts, so the frontend saves them without parsing any text. Validated
+roadmaps are cached in the two-tier cache by normalized (career, goal,
+stage) for ROADMAP_GENERATION_CACHE_TTL. If the model is unavailable or its
+output does not validate, a roadmap is built from the career dataset
+instead; that fallback is not cached, so the next request tries the model
+again.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from career_ai.tiered_cache import TieredCache
+from chat.utils.admission import LLMOverloaded, llm_slot
+from chat.utils.data_loader import get_career_index
+from chat.utils.deadline import Deadline
+from .llm_gateway import get_gateway
+from .llm_providers import LLMError
+
+logger = logging.getLogger(__name__)
+
+MIN_STEPS = 3
+MAX_STEPS = 8
+MAX_SKILLS = 8
+MAX_RESOURCES = 5
+STAGES = ("10th", "12th", "UG", "PG")
+# Bump when the prompt or the item shape changes, so old cache entries are ignored
+CACHE_VERSION = 1
+_roadmaps = TieredCache("roadmap.gen", ttl=7 * 86400, version=CACHE_VERSION)
+
+SYSTEM_PROMPT = (
+    "You design step-by-step career learning roadmaps. Reply with one JSON object only, no prose: "
+    '{"title": string, "steps": [{"title": string, "description": string (1-2 sentences), '
+    '"estimated_time": string like "2-3 months", "skills": [string], '
+    '"resources": [{"name": string, "url": string or ""}]}]}. '
+    f"Give {MIN_STEPS + 1}-{MAX_STEPS - 2} sequential steps, each building on the previous one."
+)
+
+
+class RoadmapValidationError(ValueError):
+    """The model's reply is not a usable roadmap."""
+
+
+def normalize(text: Optional[str]) -> str:
+    """Case-, accent- and punctuation-insensitive form used for cache keys."""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode().lower()
+    return " ".join(re.sub(r"[^a-z0-9+#]+", " ", text).split())
+
+
+def cache_key(career: str, goal: str = "", stage: str = "") -> str:
+    raw = "|".join((normalize(career), normalize(goal), normalize(stage)))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _canonical_career(career: str) -> Optional[Dict]:
+    index = get_career_index()
+    entry = index.get(career.strip().lower())
+    if entry is None:
+        target = normalize(career)
+        entry = next((c for name, c in index.items() if normalize(name) == target), None)
+    return entry
+
+
+def _clip(value, limit: int) -> str:
+    return " ".join(str(value or "").split())[:limit]
+
+
+def _resource(value) -> Optional[Dict]:
+    if isinstance(value, str):
+        value = {"name": value}
+    if not isinstance(value, dict):
+        return None
+    name = _clip(value.get("name") or value.get("title"), 120)
+    url = _clip(value.get("url"), 500)
+    if not re.match(r"^https?://", url):
+        url = ""
+    if not name:
+        return None
+    return {"name": name, "url": url}
+
+
+def parse_roadmap(text: str) -> Dict:
+    """Validate the model's reply; return {"title", "steps"} or raise RoadmapValidationError."""
+    text = (text or "").strip()
+    # Some models still wrap JSON-mode output in a ``` fence
+    fenced = re.match(r"^```(?:json)?\s*(.*?)\s*```$", text, re.S)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise RoadmapValidationError(f"reply is not JSON: {e}") from None
+    if isinstance(data, list):
+        data = {"steps": data}
+    if not isinstance(data, dict) or not isinstance(data.get("steps"), list):
+        raise RoadmapValidationError("reply has no 'steps' list")
+
+    steps = []
+    for raw in data["steps"][:MAX_STEPS]:
+        if not isinstance(raw, dict):
+            continue
+        title = _clip(raw.get("title"), 120)
+        if not title:
+            continue
+        skills = raw.get("skills") if isinstance(raw.get("skills"), list) else []
+        resources = raw.get("resources") if isinstance(raw.get("resources"), list) else []
+        steps.append({
+            "title": title,
+            "description": _clip(raw.get("description"), 600),
+            "estimated_time": _clip(raw.get("estimated_time") or raw.get("estimatedTime"), 50),
+            "skills": [s for s in (_clip(s, 40) for s in skills if isinstance(s, str)) if s][:MAX_SKILLS],
+            "resources": [r for r in map(_resource, resources) if r][:MAX_RESOURCES],
+        })
+    if len(steps) < MIN_STEPS:
+        raise RoadmapValidationError(f"need at least {MIN_STEPS} valid steps, got {len(steps)}")
+    return {"title": _clip(data.get("title"), 160), "steps": steps}
+
+
+def to_items(steps: List[Dict]) -> List[Dict]:
+    """RoadmapItem-shaped dicts (the /api/roadmap/items/ API fields), ready to save."""
+    return [{
+        "title": step["title"],
+        "description": step["description"] or step["title"],
+        "status": "pending",
+        "priority": "high" if index == 0 else "medium" if index < 3 else "low",
+        "estimatedTime": step["estimated_time"] or "2-4 weeks",
+        "skills": step["skills"],
+        "resources": step["resources"],
+        "source": "ai-generated",
+        "stepNumber": index + 1,
+    } for index, step in enumerate(steps)]
+
+
+def dataset_roadmap(career: str, goal: str = "") -> Dict:
+    """Deterministic roadmap from the career dataset (or a generic one for unknown careers)."""
+    entry = _canonical_career(career) or {}
+    name = entry.get("name") or career.strip()
+    skills = entry.get("skills") or []
+    specialties = [s.get("name", "") if isinstance(s, dict) else str(s) for s in entry.get("specialties") or []]
+    platforms = [{"name": p, "url": ""} for p in (entry.get("lecture_platforms") or [])[:MAX_RESOURCES]]
+    jobs = entry.get("jobs") or []
+    future = entry.get("future_paths") or []
+    steps = [
+        {"title": f"Build the foundations of {name}",
+         "description": entry.get("description") or f"Learn the core concepts behind {name}.",
+         "estimated_time": "1-3 months", "skills": skills[:MAX_SKILLS], "resources": platforms},
+        {"title": "Choose a specialization",
+         "description": ("Explore " + ", ".join(specialties[:4]) + " and pick one to go deeper in.") if specialties
+         else f"Explore the main areas of {name} and pick one to go deeper in.",
+         "estimated_time": "1-2 months", "skills": specialties[:MAX_SKILLS], "resources": []},
+        {"title": "Practice with real projects",
+         "description": "Apply what you learned in small projects and keep them in a portfolio.",
+         "estimated_time": "2-3 months", "skills": skills[:3], "resources": []},
+        {"title": "Get industry exposure",
+         "description": ("Look for internships or entry roles such as " + ", ".join(jobs[:3]) + ".") if jobs
+         else "Look for internships, volunteering or entry-level roles.",
+         "estimated_time": "3-6 months", "skills": [], "resources": []},
+    ]
+    if future or goal:
+        steps.append({
+            "title": "Plan your next move",
+            "description": (f"Work towards your goal: {_clip(goal, 200)}. " if goal else "")
+            + ("Longer-term options include " + ", ".join(future[:3]) + "." if future else ""),
+            "estimated_time": "Ongoing", "skills": [], "resources": [],
+        })
+    return {"title": f"Career Path: {name}", "steps": steps}
+
+
+def _dataset_payload(career: str, goal: str, **extra) -> Dict:
+    roadmap = dataset_roadmap(career, goal)
+    return dict({"title": roadmap["title"], "items": to_items(roadmap["steps"]), "cached": False,
+                 "source": "dataset"}, **extra)
+
+
+def generate_roadmap(career: str, goal: str = "", stage: str = "", deadline: Deadline = None,
+                     use_cache: bool = True) -> Dict:
+    """Roadmap for ``career`` as {"title", "items", "cached", "source"}.
+
+    ``source`` is "model" or "dataset" (the fallback). Cache hits never wait
+    for an LLM admission slot. If no slot frees up, the dataset roadmap is
+    returned with ``degraded`` set, or ``LLMOverloaded`` is raised when
+    LLM_OVERLOAD_MODE is "reject".
+    """
+    key = cache_key(career, goal, stage)
+    if use_cache:
+        hit = _roadmaps.get(key)
+        if hit is not None:
+            return dict(hit, cached=True)
+
+    entry = _canonical_career(career)
+    name = entry["name"] if entry else career.strip()
+    # The user's own words go first (the local provider keys off the first line)
+    prompt = f"Career: {name}"
+    if goal:
+        prompt += f"\nGoal: {goal}"
+    if stage:
+        prompt += f"\nCurrent stage: {stage}"
+    if entry and entry.get("skills"):
+        prompt += "\nKey skills: " + ", ".join(entry["skills"][:MAX_SKILLS])
+
+    deadline = deadline or Deadline.for_endpoint("roadmap")
+    try:
+        with llm_slot(wait=min(getattr(settings, "LLM_QUEUE_TIMEOUT", 2.0), deadline.remaining())):
+            result = get_gateway().generate(
+                [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}],
+                endpoint="roadmap",
+                deadline=deadline,
+                temperature=0.3,
+                max_tokens=1500,
+                json_mode=True,
+            )
+        roadmap = parse_roadmap(result["text"])
+    except LLMOverloaded:
+        if getattr(settings, "LLM_OVERLOAD_MODE", "degrade") != "degrade":
+            raise
+        return _dataset_payload(career, goal, degraded=True)
+    except (LLMError, RoadmapValidationError) as e:
+        logger.warning("Roadmap generation for %r fell back to the dataset: %s", name, str(e)[:200])
+        return _dataset_payload(career, goal)
+
+    payload = {"title": roadmap["title"] or f"Career Path: {name}", "items": to_items(roadmap["steps"]),
+               "source": "model"}
+    _roadmaps.set(key, payload, getattr(settings, "ROADMAP_GENERATION_CACHE_TTL", 7 * 86400))
+    return dict(payload, cached=False)
@@ -0,0 +1,9 @@
+# chat/signals.py
+"""Model signal receivers for the chat app (connected in ChatConfig.ready)."""
+from .models import ConversationSession
+
+
+def touch_session(sender, instance, created, raw=False, **kwargs):
+    """post_save receiver for MessageLog: keep ConversationSession.last_message_at current."""
+    if created and not raw:
+        ConversationSession.objects.filter(pk=instance.session_id).update(last_message_at=instance.created_at)
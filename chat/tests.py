@@ -1,3 +1,477 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from chat import views
+from chat.models import ArchivedConversation, ConversationSession, MessageLog
+from chat.services import archive, intent_classifier, related_careers
+from chat.utils import admission, data_loader, hedging
+from chat.utils.career_snapshot import SnapshotError, build, open_snapshot
+from chat.utils.deadline import Deadline
+from core.models import Career
+
+CAREERS = [
+    {
+        "name": "Data Scientist",
+        "stage": "UG",
+        "description": "Finds patterns in data — statistics, ML and communication.",
+        "salary_range": "6-20 LPA",
+        "skills": ["Python", "Statistics", "Machine Learning"],
+        "tags": ["data science", "ai"],
+        "example_queries": [],
+        "specialties": [{"name": "NLP", "skills": ["Transformers"]}],
+        "mentors": [],
+    },
+    {
+        "name": "Advocate",
+        "stage": "PG",
+        "description": "",
+        "skills": ["Drafting", "Python"],
+        "tags": ["law"],
+        "intelligence_layer": {"demand": "high", "growth": 0.4},
+    },
+]
+
+
+class CareerSnapshotTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.source = os.path.join(tmp.name, "careers.json")
+        self.path = os.path.join(tmp.name, "careers.snapshot")
+        with open(self.source, "w", encoding="utf-8") as f:
+            json.dump(CAREERS, f)
+        build(CAREERS, self.path, source_path=self.source)
+
+    def test_round_trip_matches_the_json(self):
+        snapshot = open_snapshot(self.path, source_path=self.source)
+        self.assertEqual([career.to_dict() for career in snapshot], CAREERS)
+        self.assertNotIn("salary_range", snapshot[1])
+        self.assertEqual(snapshot.find("  advocate ")["tags"], ["law"])
+        self.assertIsNone(snapshot.find("Astronaut"))
+
+    def test_stale_source_is_rejected(self):
+        stat = os.stat(self.source)
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        with self.assertRaises(SnapshotError):
+            open_snapshot(self.path, source_path=self.source)
+
+    def test_truncated_file_raises(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for size in (len(data) - 4, 16):
+            with open(self.path, "wb") as f:
+                f.write(data[:size])
+            with self.assertRaises(SnapshotError):
+                open_snapshot(self.path)
+
+
+class ConversationPagingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("talker", password="x")
+        start = timezone.now() - datetime.timedelta(days=1)
+        for i in range(5):
+            session = ConversationSession.objects.create(user=self.user, session_id=f"user:{self.user.pk}:c{i}")
+            for j in range(3):
+                MessageLog.objects.create(session=session, role="user" if j % 2 == 0 else "bot", text=f"c{i} m{j}",
+                                          created_at=start + datetime.timedelta(minutes=j))
+            # Two conversations share each last_message_at so the id tie-break is exercised
+            ConversationSession.objects.filter(pk=session.pk).update(
+                last_message_at=start + datetime.timedelta(hours=i // 2))
+        ConversationSession.objects.create(session_id="someone-else", last_message_at=start)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _walk(self, url, limit):
+        pages, cursor = [], None
+        while True:
+            response = self.client.get(url, {"limit": limit, **({"cursor": cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json()["results"])
+            cursor = response.json()["next"]
+            if cursor is None:
+                return pages
+
+    def test_conversation_pages_cover_every_conversation_once(self):
+        ids = [row["conversation_id"] for page in self._walk("/api/chat/conversations/", 2) for row in page]
+        expected = ConversationSession.objects.filter(user=self.user).order_by("-last_message_at", "-id")
+        self.assertEqual(ids, list(expected.values_list("session_id", flat=True)))
+
+    def test_message_pages_go_back_in_time(self):
+        pages = self._walk(f"/api/chat/conversations/user:{self.user.pk}:c0/messages/", 2)
+        # Newest page first, each page in chronological order
+        self.assertEqual([[m["text"] for m in page] for page in pages], [["c0 m1", "c0 m2"], ["c0 m0"]])
+
+    def test_bad_cursor_is_a_400(self):
+        response = self.client.get("/api/chat/conversations/", {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 400)
+
+
+@mock.patch.object(views, "chat_with_bot", return_value={"reply": "hi"})
+class SignedInSessionScopingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("owner", password="x")
+        self.other = User.objects.create_user("intruder", password="x")
+        # A bearer token authenticates both the DRF view and the plain chat_ask view
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.other)}")
+
+    def _post(self, conversation_id):
+        return self.client.post("/api/chat/", {"conversation_id": conversation_id, "message": "hello"}, format="json")
+
+    def _ask(self, session_id):
+        return self.client.post("/api/chat/ask/", {"session_id": session_id, "message": "hello"}, format="json")
+
+    def _texts(self, session_id):
+        return list(MessageLog.objects.filter(session__session_id=session_id).values_list("text", flat=True))
+
+    def test_same_client_id_gives_each_user_their_own_session(self, bot):
+        ConversationSession.objects.create(user=self.user, session_id=f"user:{self.user.pk}:chat_1")
+        for send in (self._post, self._ask):
+            self.assertEqual(send("chat_1").status_code, 200)
+        self.assertEqual(self._texts(f"user:{self.user.pk}:chat_1"), [])
+        self.assertEqual(self._texts(f"user:{self.other.pk}:chat_1"), ["hello", "hi"] * 2)
+        self.assertEqual(self._post("chat_1").json()["conversation_id"], f"user:{self.other.pk}:chat_1")
+
+    def test_foreign_and_unowned_sessions_are_not_written_or_adopted(self, bot):
+        foreign = ConversationSession.objects.create(user=self.user, session_id=f"user:{self.user.pk}:chat_2")
+        legacy = ConversationSession.objects.create(session_id="chat_legacy")
+        for send in (self._post, self._ask):
+            send(foreign.session_id)
+            send(legacy.session_id)
+        self.assertEqual(self._texts(foreign.session_id) + self._texts(legacy.session_id), [])
+        legacy.refresh_from_db()
+        self.assertIsNone(legacy.user)
+
+    def test_guest_ids_are_rejected(self, bot):
+        self.assertEqual(self._post("anon:abc:chat_1").status_code, 400)
+        self.assertEqual(self._ask("anon:abc:chat_1").status_code, 400)
+        self.assertFalse(MessageLog.objects.exists())
+
+    def test_over_long_ids_fit_the_column(self, bot):
+        prefix = f"user:{self.other.pk}:"
+        for client_id in ("x" * 300, prefix + "y" * 300):
+            self.assertEqual(self._post(client_id).status_code, 200)
+            self.assertEqual(self._ask(client_id).status_code, 200)
+        session_ids = sorted(ConversationSession.objects.values_list("session_id", flat=True))
+        self.assertEqual(session_ids, [prefix + "x" * 60, prefix + "y" * 60])
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.session = ConversationSession.objects.create(session_id="idle")
+        start = timezone.now() - datetime.timedelta(days=40)
+        for i, role in enumerate(("user", "bot", "user")):
+            MessageLog.objects.create(session=self.session, role=role, text=f"m{i} é",
+                                      created_at=start + datetime.timedelta(minutes=i))
+        self.messages = list(MessageLog.objects.order_by("created_at").values("role", "text", "created_at"))
+
+    def test_round_trip(self):
+        stored = archive.archive_session(self.session)
+        self.assertEqual((stored.message_count, MessageLog.objects.count()), (3, 0))
+        self.assertEqual(archive.read_archive(stored), self.messages)
+        self.assertEqual(archive.rehydrate_session(self.session), 3)
+        self.assertEqual(list(MessageLog.objects.order_by("created_at").values("role", "text", "created_at")),
+                         self.messages)
+        self.assertFalse(ArchivedConversation.objects.exists())
+
+    def test_codec_falls_back_to_zlib(self):
+        with mock.patch.object(archive, "HAS_ZSTD", False):
+            self.assertEqual(archive.compress(b"data")[0], "zlib")
+            with self.assertRaises(RuntimeError):
+                archive.compress(b"data", "zstd")
+            with self.assertRaises(RuntimeError):
+                archive.decompress("zstd", b"blob")
+            self.assertEqual(archive.archive_session(self.session).codec, "zlib")
+
+    @unittest.skipUnless(archive.HAS_ZSTD, "zstandard is not installed")
+    def test_zstd_round_trip(self):
+        stored = archive.archive_session(self.session, codec="zstd")
+        self.assertEqual(stored.codec, "zstd")
+        self.assertEqual(archive.read_archive(stored), self.messages)
+
+    def test_archiving_and_rehydrating_are_idempotent(self):
+        first = archive.archive_session(self.session)
+        self.assertEqual(archive.archive_session(self.session).pk, first.pk)
+        self.assertEqual(ArchivedConversation.objects.count(), 1)
+        self.assertEqual(archive.rehydrate_session(self.session), 3)
+        self.assertEqual(archive.rehydrate_session(self.session), 0)
+        self.assertEqual(MessageLog.objects.count(), 3)
+
+    def test_conversations_active_since_selection_are_skipped(self):
+        selected = list(archive.idle_sessions())
+        self.assertEqual(selected, [self.session])
+        MessageLog.objects.create(session=self.session, role="user", text="back again", created_at=timezone.now())
+        self.assertIsNone(archive.archive_session(self.session))
+        self.assertEqual((MessageLog.objects.count(), ArchivedConversation.objects.exists()), (4, False))
+
+        archive.archive_session(self.session, idle_days=0)
+        self.session.refresh_from_db()
+        archive.ensure_hot(self.session)
+        # Rehydrated counts as active for another idle period
+        self.assertIsNone(archive.archive_session(self.session))
+        self.assertFalse(ArchivedConversation.objects.exists())
+
+
+class CareerReloadTests(TestCase):
+    def setUp(self):
+        snapshot = data_loader._snapshot
+        self.addCleanup(setattr, data_loader, "_snapshot", snapshot)
+
+    def test_reload_reads_the_career_table(self):
+        data_loader.get_career_data()
+        Career.objects.create(name="Drone Pilot", stage="UG", tags=["drones"])
+        data_loader.reload_career_data()
+        self.assertEqual([c["name"] for c in data_loader.get_career_data()], ["Drone Pilot"])
+        self.assertEqual(data_loader.get_career_index()["drone pilot"]["tags"], ["drones"])
+
+    def test_empty_table_falls_back_to_the_dataset_file(self):
+        data_loader.get_career_data()
+        data_loader.reload_career_data()
+        self.assertEqual(len(data_loader.get_career_data()), len(data_loader.load_dataset()))
+
+
+class FakeRedis:
+    """The sorted-set commands chat/utils/admission.py uses, over a dict of token -> score."""
+
+    def __init__(self, **leases):
+        self.leases = leases
+        self.calls = []
+
+    def pipeline(self):
+        return self
+
+    def zremrangebyscore(self, key, low, high):
+        self.calls.append(lambda: [self.leases.pop(t) for t, score in list(self.leases.items()) if score <= high])
+
+    def zadd(self, key, mapping):
+        self.calls.append(lambda: self.leases.update(mapping))
+
+    def zrank(self, key, token):
+        self.calls.append(lambda: sorted(self.leases, key=self.leases.get).index(token))
+
+    def expire(self, key, seconds):
+        self.calls.append(lambda: True)
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return [call() for call in calls]
+
+    def zrem(self, key, token):
+        self.leases.pop(token, None)
+
+
+class DownRedis(FakeRedis):
+    def execute(self):
+        raise ConnectionError("Error 111 connecting to 127.0.0.1:6379. Connection refused.")
+
+
+@override_settings(LLM_MAX_CONCURRENCY=4, LLM_CLUSTER_MAX_CONCURRENCY=2, LLM_LEASE_SECONDS=120)
+class AdmissionTests(SimpleTestCase):
+    def setUp(self):
+        for name, value in (("_local_semaphore", None), ("_cluster_down_until", 0.0)):
+            patcher = mock.patch.object(admission, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _use(self, client):
+        return mock.patch("django_redis.get_redis_connection", return_value=client)
+
+    def test_admits_under_the_cluster_limit_and_releases_the_lease(self):
+        redis = FakeRedis(other=time.time())
+        with self._use(redis), admission.llm_slot(wait=0):
+            self.assertEqual(len(redis.leases), 2)
+        self.assertEqual(list(redis.leases), ["other"])
+
+    def test_rejects_at_the_cluster_limit(self):
+        now = time.time()
+        redis = FakeRedis(a=now, b=now)
+        with self._use(redis), self.assertRaises(admission.LLMOverloaded):
+            with admission.llm_slot(wait=0):
+                pass
+        self.assertEqual(sorted(redis.leases), ["a", "b"])
+
+    def test_leases_of_dead_workers_expire(self):
+        stale = time.time() - 121
+        redis = FakeRedis(a=stale, b=stale)
+        with self._use(redis), admission.llm_slot(wait=0):
+            self.assertEqual(len(redis.leases), 1)
+
+    def test_redis_down_falls_back_to_the_local_limit_and_warns_once(self):
+        redis = DownRedis()
+        with self._use(redis) as get_connection, self.assertLogs(admission.logger, "WARNING") as logs:
+            for _ in range(3):
+                with admission.llm_slot(wait=0):
+                    pass
+        self.assertEqual((len(logs.records), get_connection.call_count), (1, 1))
+        # The cluster is tried again once the retry window has passed
+        with self._use(FakeRedis()) as get_connection, \
+                mock.patch.object(admission, "_cluster_down_until", time.monotonic() - 1):
+            with admission.llm_slot(wait=0):
+                pass
+        get_connection.assert_called_once()
+
+    @override_settings(LLM_MAX_CONCURRENCY=1)
+    def test_local_limit(self):
+        with self._use(FakeRedis()), admission.llm_slot(wait=0):
+            with self.assertRaises(admission.LLMOverloaded), admission.llm_slot(wait=0):
+                pass
+
+
+@override_settings(GEMINI_HEDGE_INITIAL_DELAY=0.02, GEMINI_HEDGE_BUDGET=1.0)
+class HedgingTests(SimpleTestCase):
+    PRIMARY, BACKUP = ("v1beta", "primary"), ("v1beta", "backup")
+
+    def setUp(self):
+        patcher = mock.patch.dict(hedging._stats, dict.fromkeys(hedging._stats, 0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.gates = {}
+        self.addCleanup(lambda: [gate.set() for gate in self.gates.values()])
+
+    def attempt(self, config, http, timeout):
+        gate = self.gates.get(config)
+        if gate is not None:
+            gate.wait(5)
+        return {"model": config[1]}, None
+
+    def _race(self, primary, *remaining):
+        remaining = list(remaining)
+        data, error, config = hedging._race(primary, remaining, self.attempt, Deadline(10))
+        return data, config, remaining
+
+    def _wait_for_losers(self):
+        for _ in range(100):
+            if not hedging._stats["losers_in_flight"]:
+                return
+            time.sleep(0.01)
+        self.fail("loser still running")
+
+    def test_fast_primary_is_not_hedged(self):
+        self.assertEqual(self._race(self.PRIMARY, self.BACKUP), ({"model": "primary"}, self.PRIMARY, [self.BACKUP]))
+        self.assertEqual(hedging._stats["hedges"], 0)
+
+    def test_hedge_wins_over_a_slow_primary(self):
+        self.gates[self.PRIMARY] = threading.Event()
+        # The hedge target is taken out of the cascade
+        self.assertEqual(self._race(self.PRIMARY, self.BACKUP), ({"model": "backup"}, self.BACKUP, []))
+        self.assertEqual((hedging._stats["hedge_wins"], hedging._stats["losers_in_flight"]), (1, 1))
+        self.gates[self.PRIMARY].set()
+        self._wait_for_losers()
+
+    def test_running_losers_count_against_the_budget(self):
+        slow = ("v1beta", "slow")
+        self.gates[self.PRIMARY] = threading.Event()
+        self.assertEqual(self._race(self.PRIMARY, self.BACKUP)[1], self.BACKUP)
+
+        # 2 requests, 1 hedge + 1 loser still running: no room for another hedge
+        self.gates[slow] = threading.Event()
+        threading.Timer(0.1, self.gates[slow].set).start()
+        self.assertEqual(self._race(slow, self.BACKUP)[1], slow)
+        self.assertEqual(hedging._stats["budget_denied"], 1)
+
+        self.gates[self.PRIMARY].set()
+        self._wait_for_losers()
+        self.gates[slow] = threading.Event()
+        self.assertEqual(self._race(slow, self.BACKUP)[1], self.BACKUP)
+        self.gates[slow].set()
+        self._wait_for_losers()
+
+
+class IntentClassifierTests(SimpleTestCase):
+    EXAMPLES = [
+        {"text": "i love coding", "interest": "coding", "intent": "choose"},
+        {"text": "i love law", "interest": "law", "intent": "choose"},
+        {"text": "i love medicine", "interest": "medicine", "intent": "choose"},
+        {"text": "no coding and no law for me", "interest": ["coding", "law"], "intent": "reject"},
+        {"text": "hello there", "interest": None, "intent": "other"},
+        {"text": "i am in 12th", "stage": "12th"},  # stage head only
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.model = intent_classifier.train(cls.EXAMPLES, epochs=200)
+
+    def _interests(self, text):
+        labels = self.model.predict(text)
+        return labels["interest"], labels["interests"], labels["intent"]
+
+    def test_interest_is_multi_label(self):
+        self.assertEqual(self._interests("no coding and no law"), ("coding", ["coding", "law"], "reject"))
+        self.assertEqual(self._interests("i love medicine"), ("medicine", ["medicine"], "choose"))
+        self.assertEqual(self._interests("hello there"), (None, [], "other"))
+
+    def test_single_label_heads_reject_lists(self):
+        with self.assertRaises(ValueError):
+            intent_classifier.train([{"text": "12th or UG", "stage": ["12th", "UG"]}], epochs=1)
+
+    def test_save_and_load(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "intent.npz")
+        self.model.save(path)
+        loaded = intent_classifier.IntentModel.load(path)
+        self.assertEqual(loaded.predict("no coding and no law"), self.model.predict("no coding and no law"))
+        with mock.patch.object(intent_classifier, "FORMAT_VERSION", intent_classifier.FORMAT_VERSION + 1), \
+                self.assertRaises(ValueError):
+            intent_classifier.IntentModel.load(path)
+
+    def test_rules_fallback_keeps_every_rejected_path(self):
+        with mock.patch.object(intent_classifier, "get_model", return_value=None):
+            labels = intent_classifier.classify("I don't want coding or engineering or CA")
+            self.assertEqual((labels["intent"], labels["interest"], labels["interests"]),
+                             ("reject", "coding", ["coding", "engineering", "ca"]))
+            labels = intent_classifier.classify("I want to study law")
+            self.assertEqual((labels["intent"], labels["interests"]), ("choose", ["law"]))
+
+
+class RelatedCareersFileTests(SimpleTestCase):
+    CAREERS = [
+        {"name": "Data Scientist", "stage": "UG", "skills": ["Python", "Statistics"], "tags": ["data science"]},
+        {"name": "ML Engineer", "stage": "UG", "skills": ["Python", "Machine Learning"], "tags": ["data science"]},
+        {"name": "Statistician", "stage": "PG", "skills": ["Statistics", "R"], "tags": ["mathematics"]},
+    ]
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "related.json")
+        data = related_careers.build(self.CAREERS)
+        # Marks answers served from the file rather than rebuilt
+        data["related"]["data scientist"][0][2] = 0.999
+        related_careers.save(data, self.path)
+        self.addCleanup(related_careers.reset)
+        related_careers.reset()
+
+    def _top_score(self, careers):
+        with override_settings(RELATED_CAREERS_PATH=self.path), \
+                mock.patch("chat.utils.data_loader.get_career_data", return_value=careers):
+            related_careers.reset()
+            return related_careers.related_careers("Data Scientist")[0]["score"]
+
+    def test_current_file_is_served(self):
+        self.assertEqual(self._top_score(self.CAREERS), 0.999)
+
+    def test_file_built_from_other_careers_is_rebuilt(self):
+        changed = [dict(self.CAREERS[0], skills=["Python", "Statistics", "SQL"])] + self.CAREERS[1:]
+        with self.assertLogs(related_careers.logger, "WARNING"):
+            self.assertNotEqual(self._top_score(changed), 0.999)
+
+    def test_old_format_is_rebuilt(self):
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        related_careers.save(dict(data, version=related_careers.FORMAT_VERSION - 1), self.path)
+        with self.assertLogs(related_careers.logger, "WARNING"):
+            self.assertNotEqual(self._top_score(self.CAREERS), 0.999)
@@ -1,10 +1,12 @@
 # chat/urls.py
 from django.urls import path
-from .views import chat_ask, ask_career, chat_post, chat_history
+from .views import chat_ask, ask_career, chat_post, chat_history, chat_conversations, chat_messages
 
 urlpatterns = [
     path("", chat_post, name="chat_post"),
     path("ask/", chat_ask, name="chat_ask"),
     path("ask_career/", ask_career, name="ask_career"),
     path("history/", chat_history, name="chat_history"),
+    path("conversations/", chat_conversations, name="chat_conversations"),
+    path("conversations/<str:conversation_id>/messages/", chat_messages, name="chat_messages"),
 ]
\ No newline at end of file
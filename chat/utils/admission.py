@@ -0,0 +1,157 @@
+# chat/utils/admission.py
+"""Admission control for LLM-bound work.
+
+Every chat turn can sit inside the Gemini cascade for a long time, so the
+number of requests allowed to talk to an LLM at once is bounded twice:
+per process (a semaphore, so worker threads stay free for non-LLM
+endpoints) and per cluster (a Redis sorted set of leases shared by every
+worker). Requests that cannot get a slot within a short queue wait raise
+``LLMOverloaded``; callers either degrade to the local reply or answer 503.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY = "llm:admission:leases"
+
+
+class LLMOverloaded(Exception):
+    """Raised when no LLM slot frees up within the queue wait."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"LLM capacity exhausted, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+_local_lock = threading.Lock()
+_local_semaphore = None
+
+
+def _get_local_semaphore() -> threading.BoundedSemaphore:
+    global _local_semaphore
+    if _local_semaphore is None:
+        with _local_lock:
+            if _local_semaphore is None:
+                _local_semaphore = threading.BoundedSemaphore(_setting("LLM_MAX_CONCURRENCY", 8))
+    return _local_semaphore
+
+
+# time.monotonic() until which the cluster limit is skipped after a Redis error
+_cluster_down_until = 0.0
+
+
+def _cluster_unavailable(e: Exception) -> None:
+    """Use only the local limit for LLM_CLUSTER_RETRY_SECONDS, warning once per window."""
+    global _cluster_down_until
+    retry = _setting("LLM_CLUSTER_RETRY_SECONDS", 30)
+    _cluster_down_until = time.monotonic() + retry
+    logger.warning("Cluster admission check failed, using the local limit for %ss: %s", retry, e)
+
+
+def _get_redis():
+    """Return a raw Redis client, or None when Redis is not configured/reachable."""
+    if not _setting("LLM_CLUSTER_MAX_CONCURRENCY", 0) or time.monotonic() < _cluster_down_until:
+        return None
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection("default")
+    except Exception as e:
+        _cluster_unavailable(e)
+        return None
+
+
+def _try_cluster_acquire(client, token: str) -> bool:
+    """Add a lease for ``token``; keep it only if the cluster is under its limit.
+
+    Leases older than LLM_LEASE_SECONDS are dropped first so a crashed worker
+    cannot leak slots forever.
+    """
+    limit = _setting("LLM_CLUSTER_MAX_CONCURRENCY", 0)
+    now = time.time()
+    pipe = client.pipeline()
+    pipe.zremrangebyscore(REDIS_KEY, "-inf", now - _setting("LLM_LEASE_SECONDS", 120))
+    pipe.zadd(REDIS_KEY, {token: now})
+    pipe.zrank(REDIS_KEY, token)
+    pipe.expire(REDIS_KEY, _setting("LLM_LEASE_SECONDS", 120))
+    _, _, rank, _ = pipe.execute()
+    if rank is not None and rank < limit:
+        return True
+    client.zrem(REDIS_KEY, token)
+    return False
+
+
+@contextmanager
+def llm_slot(wait: float = None):
+    """Hold one LLM slot for the duration of the block.
+
+    Waits at most ``wait`` seconds (LLM_QUEUE_TIMEOUT by default) for both the
+    process-local and the cluster-wide slot, then raises ``LLMOverloaded``.
+    """
+    if wait is None:
+        wait = _setting("LLM_QUEUE_TIMEOUT", 2.0)
+    retry_after = _setting("LLM_RETRY_AFTER", 5)
+    give_up_at = time.monotonic() + max(wait, 0)
+
+    semaphore = _get_local_semaphore()
+    if not semaphore.acquire(timeout=max(wait, 0)):
+        raise LLMOverloaded(retry_after)
+
+    client = None
+    token = None
+    try:
+        client = _get_redis()
+        if client is not None:
+            token = uuid.uuid4().hex
+            try:
+                while not _try_cluster_acquire(client, token):
+                    if time.monotonic() >= give_up_at:
+                        token = None
+                        raise LLMOverloaded(retry_after)
+                    time.sleep(0.05)
+            except LLMOverloaded:
+                raise
+            except Exception as e:
+                # Redis went away: the local bound still protects this worker
+                _cluster_unavailable(e)
+                client = token = None
+        yield
+    finally:
+        if client is not None and token is not None:
+            try:
+                client.zrem(REDIS_KEY, token)
+            except Exception:
+                pass
+        semaphore.release()
+
+
+def overload_response(exc: LLMOverloaded) -> JsonResponse:
+    response = JsonResponse(
+        {"error": "The AI service is busy. Please try again shortly.", "fallback": True},
+        status=503,
+    )
+    response["Retry-After"] = str(exc.retry_after)
+    return response
+
+
+def shed_llm_overload(view):
+    """Turn an ``LLMOverloaded`` escaping ``view`` into a fast 503 with Retry-After."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except LLMOverloaded as exc:
+            return overload_response(exc)
+    return wrapper
@@ -0,0 +1,69 @@
+# chat/utils/anon_session.py
+"""Server-issued identities for anonymous chat clients.
+
+An anonymous client gets a random id, signed with a timestamp so it expires
+after CHAT_ANON_SESSION_TTL_DAYS of inactivity. It arrives back as a signed
+cookie, an ``X-Chat-Anon`` header or an ``anon_token`` body field. The
+client's own conversation ids are namespaced under it ("anon:<id>:<chat>"),
+so anonymous users never share a ConversationSession. Nothing is written to
+the database until the first message of a conversation arrives.
+"""
+
+import uuid
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core import signing
+
+ANON_PREFIX = "anon:"
+_SALT = "chat.anon-session"
+
+
+def _ttl_seconds() -> int:
+    return int(getattr(settings, "CHAT_ANON_SESSION_TTL_DAYS", 7) * 86400)
+
+
+def _cookie_name() -> str:
+    return getattr(settings, "CHAT_ANON_COOKIE", "chat_anon")
+
+
+def sign_anon_id(anon_id: str) -> str:
+    return signing.TimestampSigner(salt=_SALT).sign(anon_id)
+
+
+def unsign_anon_token(token: Optional[str]) -> Optional[str]:
+    """The anonymous id inside ``token``, or None if it is missing, forged or expired."""
+    if not token:
+        return None
+    try:
+        return signing.TimestampSigner(salt=_SALT).unsign(token, max_age=_ttl_seconds())
+    except signing.BadSignature:
+        return None
+
+
+def resolve_anon_id(request, body: Optional[dict] = None) -> Tuple[str, str]:
+    """Return (anon_id, fresh token) for the caller, issuing a new id if it has no valid token.
+
+    The token is re-signed on every call, so the expiry slides with activity.
+    """
+    token = (request.COOKIES.get(_cookie_name()) or request.headers.get("X-Chat-Anon")
+             or (body or {}).get("anon_token"))
+    anon_id = unsign_anon_token(token) or uuid.uuid4().hex
+    return anon_id, sign_anon_id(anon_id)
+
+
+def anon_session_id(anon_id: str, client_session_id: Optional[str]) -> str:
+    """ConversationSession.session_id for one of an anonymous client's conversations."""
+    client_session_id = (client_session_id or "default")[:60]
+    return f"{ANON_PREFIX}{anon_id}:{client_session_id}"
+
+
+def set_anon_cookie(response, token: str):
+    response.set_cookie(
+        _cookie_name(), token,
+        max_age=_ttl_seconds(),
+        httponly=True,
+        samesite="Lax",
+        secure=not settings.DEBUG,
+    )
+    return response
@@ -0,0 +1,279 @@
+# chat/utils/career_snapshot.py
+"""Compact, read-only binary snapshot of the career dataset, shared between processes.
+
+``manage.py build_career_snapshot`` compiles data/career_dataset.json into a
+file that every worker ``mmap``s read-only. The pages live in the OS page
+cache and are shared by all processes, and opening the snapshot costs the
+same however big the dataset is. Nothing is parsed until a field is read.
+
+Layout (little-endian; every section starts on a 4-byte boundary)::
+
+    header   MAGIC, format version, source size, source mtime_ns, counts,
+             then (offset, length) of each section below
+    offsets  uint32[n_strings + 1]   start of each string in ``strings``
+    strings  UTF-8 bytes of every distinct string, deduplicated
+    lists    uint32[]                string ids of list fields, record after record
+    records  uint32[n_records * RECORD_WIDTH]
+    names    uint32[n_records]       record ids sorted by lower-cased name
+
+A record holds, for each field, a string id (STRING_FIELDS, and
+JSON_FIELDS stored as JSON text) or a (start, count) slice of ``lists``
+(LIST_FIELDS). ABSENT marks a field the source record did not have.
+
+Records come back as ``CareerView``, a ``__slots__`` Mapping that decodes
+fields on access, so existing ``career.get("skills", [])`` callers work
+unchanged.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+
+MAGIC = b"CAREERSN"
+FORMAT_VERSION = 1
+ABSENT = 0xFFFFFFFF
+
+STRING_FIELDS = ("name", "stage", "description", "salary_range")
+LIST_FIELDS = ("skills", "future_paths", "jobs", "lecture_platforms", "example_queries", "tags")
+JSON_FIELDS = ("specialties", "mentors", "mentor_templates", "intelligence_layer")
+FIELDS = STRING_FIELDS + LIST_FIELDS + JSON_FIELDS
+
+
+def _column_layout():
+    # Column of each field in a record; list fields take two (start, count)
+    columns, width = {}, 0
+    for field in FIELDS:
+        columns[field] = width
+        width += 2 if field in LIST_FIELDS else 1
+    return columns, width
+
+
+_COLUMNS, RECORD_WIDTH = _column_layout()
+
+_SECTIONS = ("offsets", "strings", "lists", "records", "names")
+_HEADER = struct.Struct("<8sIQQII" + "II" * len(_SECTIONS))
+
+
+class SnapshotError(ValueError):
+    """The snapshot file is missing, corrupt, or was built from a different dataset."""
+
+
+def _source_stamp(source_path):
+    st = os.stat(source_path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _le_array(values) -> bytes:
+    data = array("I", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def build(careers, path, source_path=None) -> dict:
+    """Write ``careers`` (the parsed JSON list) to ``path`` atomically; return size stats.
+
+    ``source_path`` is the JSON file the careers came from; its size and
+    mtime are recorded so readers can tell when the snapshot is stale.
+    Keys outside FIELDS are not stored; they are listed in the stats as
+    ``skipped_fields``.
+    """
+    strings = {}
+
+    def intern(text):
+        sid = strings.get(text)
+        if sid is None:
+            sid = strings[text] = len(strings)
+        return sid
+
+    lists, records, skipped = [], [], set()
+    for career in careers:
+        skipped.update(set(career) - set(FIELDS))
+        for field in FIELDS:
+            if field not in career:
+                records.extend((ABSENT, 0) if field in LIST_FIELDS else (ABSENT,))
+            elif field in STRING_FIELDS:
+                records.append(intern(str(career[field] or "")))
+            elif field in LIST_FIELDS:
+                items = [intern(str(item)) for item in career[field] or []]
+                records.extend((len(lists), len(items)))
+                lists.extend(items)
+            else:
+                records.append(intern(json.dumps(career[field], ensure_ascii=False, separators=(",", ":"))))
+    names = sorted(range(len(careers)), key=lambda i: str(careers[i].get("name", "")).strip().lower())
+
+    blobs, offsets = [], [0]
+    for text in strings:  # dicts keep insertion order, i.e. string id order
+        blobs.append(text.encode("utf-8"))
+        offsets.append(offsets[-1] + len(blobs[-1]))
+    strings_blob = b"".join(blobs)
+    sections = {
+        "offsets": _le_array(offsets),
+        "strings": strings_blob + b"\0" * (-len(strings_blob) % 4),
+        "lists": _le_array(lists),
+        "records": _le_array(records),
+        "names": _le_array(names),
+    }
+
+    size, mtime_ns = _source_stamp(source_path) if source_path else (0, 0)
+    position, table = _HEADER.size, []
+    for name in _SECTIONS:
+        table.extend((position, len(sections[name])))
+        position += len(sections[name])
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, size, mtime_ns, len(careers), len(strings), *table)
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for name in _SECTIONS:
+            f.write(sections[name])
+    # Processes that already mapped the old file keep reading it until they reload
+    os.replace(tmp_path, path)
+    return {"careers": len(careers), "strings": len(strings), "bytes": position,
+            "skipped_fields": sorted(skipped)}
+
+
+class CareerSnapshot(Sequence):
+    """The mapped snapshot: a read-only sequence of ``CareerView``."""
+
+    def __init__(self, path, source_path=None):
+        if sys.byteorder != "little":
+            raise SnapshotError("snapshots are only mapped on little-endian hosts")
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                raise SnapshotError(f"{path} is empty") from None
+        if len(self._mmap) < _HEADER.size:
+            raise SnapshotError(f"{path} is truncated")
+        magic, version, size, mtime_ns, self._count, self._n_strings, *table = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise SnapshotError(f"{path} is not a version {FORMAT_VERSION} career snapshot")
+        if source_path and (size, mtime_ns) != _source_stamp(source_path):
+            raise SnapshotError(f"{path} is older than {source_path}; run `manage.py build_career_snapshot`")
+        if table[-2] + table[-1] > len(self._mmap):
+            raise SnapshotError(f"{path} is truncated")
+
+        view = memoryview(self._mmap)
+        sections = {name: view[table[2 * i]:table[2 * i] + table[2 * i + 1]] for i, name in enumerate(_SECTIONS)}
+        self._strings = sections["strings"]
+        self._offsets = sections["offsets"].cast("I")
+        self._lists = sections["lists"].cast("I")
+        self._records = sections["records"].cast("I")
+        self._names = sections["names"].cast("I")
+
+    def string(self, sid: int) -> str:
+        return str(self._strings[self._offsets[sid]:self._offsets[sid + 1]], "utf-8")
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [CareerView(self, i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("career index out of range")
+        return CareerView(self, index)
+
+    def _lower_name(self, position: int) -> str:
+        record = self._names[position]
+        sid = self._records[record * RECORD_WIDTH + _COLUMNS["name"]]
+        return "" if sid == ABSENT else self.string(sid).strip().lower()
+
+    def find(self, name: str):
+        """The career named ``name`` (case-insensitive), by binary search; None if absent."""
+        key = (name or "").strip().lower()
+        position = bisect.bisect_left(_NameKeys(self), key)
+        if position < self._count and self._lower_name(position) == key:
+            return CareerView(self, self._names[position])
+        return None
+
+    def index(self) -> "CareerIndex":
+        return CareerIndex(self)
+
+
+class _NameKeys(Sequence):
+    """Sorted lower-cased names as a lazy sequence, for ``bisect``."""
+
+    __slots__ = ("_snapshot",)
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def __getitem__(self, position):
+        return self._snapshot._lower_name(position)
+
+
+class CareerIndex(Mapping):
+    """Read-only {lower-cased name: CareerView} mapping backed by the snapshot's name table."""
+
+    __slots__ = ("_snapshot",)
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __getitem__(self, name):
+        career = self._snapshot.find(name)
+        if career is None:
+            raise KeyError(name)
+        return career
+
+    def __iter__(self):
+        return (self._snapshot._lower_name(p) for p in range(len(self._snapshot)))
+
+    def __len__(self):
+        return len(self._snapshot)
+
+
+class CareerView(Mapping):
+    """One career record; a read-only Mapping whose fields are decoded from the map on access."""
+
+    __slots__ = ("_snapshot", "_record")
+
+    def __init__(self, snapshot, record: int):
+        self._snapshot = snapshot
+        self._record = record
+
+    def __getitem__(self, field):
+        column = _COLUMNS.get(field)
+        if column is None:
+            raise KeyError(field)
+        snapshot = self._snapshot
+        base = self._record * RECORD_WIDTH + column
+        value = snapshot._records[base]
+        if value == ABSENT:
+            raise KeyError(field)
+        if field in LIST_FIELDS:
+            return [snapshot.string(sid) for sid in snapshot._lists[value:value + snapshot._records[base + 1]]]
+        if field in JSON_FIELDS:
+            return json.loads(snapshot.string(value))
+        return snapshot.string(value)
+
+    def __iter__(self):
+        base = self._record * RECORD_WIDTH
+        records = self._snapshot._records
+        return (field for field in FIELDS if records[base + _COLUMNS[field]] != ABSENT)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"<CareerView {self.get('name', '')!r}>"
+
+
+def open_snapshot(path, source_path=None) -> CareerSnapshot:
+    """Map ``path``; raises SnapshotError (or OSError) if it is unusable."""
+    return CareerSnapshot(path, source_path=source_path)
@@ -1,8 +1,39 @@
 # chat/utils/data_loader.py
+"""The career dataset and its name index, shared by every request in a process.
+
+When a fresh binary snapshot exists (CAREER_SNAPSHOT_PATH, built by
+``manage.py build_career_snapshot``), the dataset is mmap'ed from it and
+shared with every other worker through the page cache; records are
+read-only ``CareerView`` mappings (chat/utils/career_snapshot.py).
+Otherwise the JSON file is parsed into plain dicts, as before.
+
+Both live in one immutable snapshot, built on first use. ``reload_career_data``
+(run by the invalidation bus when the careers change, see core/invalidation.py)
+builds a new snapshot off to the side from the ``core.Career`` table, where
+imports and admin edits land, and swaps it in with a single assignment.
+Readers never wait for a rebuild and never see the data of one snapshot
+with the index of another.
+"""
+import logging
+import threading
 from pathlib import Path
 import json
 from django.conf import settings
 
+from .career_snapshot import SnapshotError, open_snapshot
+
+logger = logging.getLogger(__name__)
+
+# core.Career columns, named like the keys of the JSON dataset
+CAREER_FIELDS = (
+    "name", "stage", "description", "salary_range", "skills", "specialties", "future_paths", "jobs",
+    "mentors", "lecture_platforms", "example_queries", "tags", "mentor_templates", "intelligence_layer",
+)
+
+_snapshot = None
+_build_lock = threading.Lock()
+
+
 def load_dataset(file_name="career_dataset.json"):
     """
     Load JSON dataset from <project_root>/data/
@@ -10,3 +41,67 @@ def load_dataset(file_name="career_dataset.json"):
     file_path = Path(settings.BASE_DIR) / "data" / file_name
     with open(file_path, "r", encoding="utf-8") as f:
         return json.load(f)
+
+
+def _build_snapshot():
+    mapped_path = getattr(settings, "CAREER_SNAPSHOT_PATH", None)
+    if mapped_path:
+        source_path = Path(settings.BASE_DIR) / "data" / "career_dataset.json"
+        try:
+            careers = open_snapshot(mapped_path, source_path=source_path)
+            return careers, careers.index()
+        except FileNotFoundError:
+            pass
+        except (OSError, SnapshotError) as e:
+            logger.warning("Not using the career snapshot, parsing the JSON dataset instead: %s", e)
+    data = load_dataset("career_dataset.json")
+    return data, _name_index(data)
+
+
+def _name_index(data):
+    return {c.get("name", "").strip().lower(): c for c in data}
+
+
+def _build_db_snapshot():
+    """The dataset as stored in core.Career, or None while the table is empty (not imported yet)."""
+    from core.models import Career
+    data = list(Career.objects.order_by("id").values(*CAREER_FIELDS))
+    if not data:
+        return None
+    return data, _name_index(data)
+
+
+def _current():
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None:
+        with _build_lock:
+            if _snapshot is None:
+                _snapshot = _build_snapshot()
+            snapshot = _snapshot
+    return snapshot
+
+
+def get_career_data():
+    """The career dataset, read from disk on first use and shared afterwards."""
+    return _current()[0]
+
+
+def get_career_index():
+    """Careers keyed by lower-cased name, built on first use."""
+    return _current()[1]
+
+
+def reload_career_data():
+    """Rebuild the snapshot from core.Career and swap it in; keep serving the old one if the rebuild fails."""
+    global _snapshot
+    if _snapshot is None:
+        # Nothing loaded in this process yet; the first reader loads fresh data
+        return
+    try:
+        snapshot = _build_db_snapshot() or _build_snapshot()
+    except Exception as e:
+        logger.error("Career dataset reload failed, keeping the current one: %s", e)
+        return
+    _snapshot = snapshot
+    logger.info("Reloaded career dataset (%d careers)", len(snapshot[0]))
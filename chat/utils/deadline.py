@@ -0,0 +1,51 @@
+# chat/utils/deadline.py
+"""Per-request time budget shared by every stage of an LLM call.
+
+A view creates one ``Deadline`` from the endpoint's SLO and hands it down
+the stack. Each HTTP call asks it for a timeout (capped by the stage's own
+limit) instead of using a fixed value, so the whole model cascade is bounded
+by the SLO rather than by the number of models tried.
+"""
+
+import time
+from typing import Optional
+
+from django.conf import settings
+
+
+class DeadlineExceeded(Exception):
+    """Raised when there is not enough budget left to start another attempt."""
+
+
+class Deadline:
+    def __init__(self, seconds: float, endpoint: str = "default"):
+        self.budget = float(seconds)
+        self.endpoint = endpoint
+        self.expires_at = time.monotonic() + self.budget
+
+    @classmethod
+    def for_endpoint(cls, endpoint: str) -> "Deadline":
+        """Build a deadline from LLM_SLO_SECONDS, e.g. ``Deadline.for_endpoint("chat")``."""
+        slos = getattr(settings, "LLM_SLO_SECONDS", {})
+        return cls(slos.get(endpoint, slos.get("default", 25)), endpoint)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() < getattr(settings, "LLM_MIN_ATTEMPT_SECONDS", 1.0)
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Timeout for the next call: the remaining budget, capped at ``cap``.
+
+        Raises ``DeadlineExceeded`` if the remaining budget is too small to be
+        worth starting a call.
+        """
+        if self.expired:
+            raise DeadlineExceeded(f"{self.budget:.0f}s budget exhausted")
+        remaining = self.remaining()
+        return min(cap, remaining) if cap is not None else remaining
+
+    def __repr__(self):
+        return f"Deadline({self.endpoint}: remaining={self.remaining():.2f}s of {self.budget:.0f}s)"
@@ -1,23 +1,27 @@
 # chat/utils/gpt_fallback.py
-import os
+import logging
 from typing import Dict, List, Optional
-from django.conf import settings
-from openai import OpenAI
+from .deadline import Deadline
+from .history_compactor import compact_history
+from chat.services.llm_gateway import get_gateway
 
+logger = logging.getLogger(__name__)
 
-def gpt_fallback(user_message: str, career_data: List[Dict] = None, history: Optional[List[Dict]] = None) -> Optional[Dict]:
+
+def gpt_fallback(user_message: str, career_data: List[Dict] = None, history: Optional[List[Dict]] = None,
+                 deadline: Optional[Deadline] = None) -> Optional[Dict]:
     """Use OpenAI GPT as a powerful fallback for career guidance and general questions.
     
+    Each model attempt gets the remaining ``deadline`` budget as its timeout.
     Returns None if GPT is not available or fails, so callers can try another path.
     """
-    api_key = getattr(settings, 'OPENAI_API_KEY', None) or os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        print("DEBUG: No OpenAI API key found")
+    if deadline is None:
+        deadline = Deadline.for_endpoint("chat")
+    if not get_gateway().providers["openai"].available():
+        logger.debug("No OpenAI API key found")
         return None
     
     try:
-        client = OpenAI(api_key=api_key)
-        
         # Build system prompt for career guidance
         sys_prompt = (
             "You are a professional career mentor and advisor. You help students and professionals "
@@ -45,8 +49,8 @@ def gpt_fallback(user_message: str, career_data: List[Dict] = None, history: Opt
         messages = [{"role": "system", "content": sys_prompt}]
         
         if history:
-            # Add recent conversation history (last 10 messages)
-            for item in history[-10:]:
+            # Scan the whole conversation for question count and key facts
+            for item in history:
                 role = item.get("role", "user")
                 text = item.get("text", "")[:500]  # Limit length
                 
@@ -64,12 +68,19 @@ def gpt_fallback(user_message: str, career_data: List[Dict] = None, history: Opt
                         collected_info["interests"] = text
                     if any(word in text_lower for word in ["goal", "want", "aspire", "dream", "become", "achieve"]):
                         collected_info["goals"] = text
-                
+            
+            # Send a compacted, token-bounded view of the conversation instead of raw turns
+            compacted = compact_history(history, collected_info)
+            logger.debug("History compacted %s -> %s tokens", compacted['original_tokens'], compacted['compacted_tokens'])
+            if compacted["facts"]:
+                messages.append({"role": "system", "content": compacted["facts"]})
+            for item in compacted["messages"]:
+                role = item["role"]
                 if role in ["user", "bot", "assistant"]:
                     # Map "bot" to "assistant" for OpenAI
                     messages.append({
                         "role": "assistant" if role == "bot" else role,
-                        "content": text
+                        "content": item["text"]
                     })
         
         # Check if we have enough information (3-4 questions asked)
@@ -110,55 +121,20 @@ def gpt_fallback(user_message: str, career_data: List[Dict] = None, history: Opt
         # Add current user message
         messages.append({"role": "user", "content": user_message})
         
-        # Call GPT-4 or GPT-3.5-turbo
-        # Try GPT-4 first, fallback to GPT-3.5-turbo
-        models_to_try = [
-            "gpt-4o",  # Latest GPT-4 model
-            "gpt-4-turbo",
-            "gpt-4",
-            "gpt-3.5-turbo"
-        ]
-        
-        response = None
-        last_error = None
-        
-        for model in models_to_try:
-            try:
-                print(f"DEBUG: Trying GPT model: {model}")
-                response = client.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    temperature=0.7,
-                    max_tokens=1000,
-                    timeout=30
-                )
-                print(f"DEBUG: Successfully using GPT model: {model}")
-                break
-            except Exception as e:
-                print(f"DEBUG: Failed with {model}: {str(e)}")
-                last_error = str(e)
-                continue
-        
-        if not response:
-            raise Exception(f"All GPT models failed. Last error: {last_error}")
-        
-        # Extract reply
-        reply = response.choices[0].message.content.strip()
-        
-        if not reply:
-            print("DEBUG: No reply extracted from GPT response")
-            return None
+        # GPT-4 first, falling back to GPT-3.5-turbo (see OpenAIProvider)
+        result = get_gateway().generate(
+            messages, endpoint=deadline.endpoint, deadline=deadline, provider="openai",
+            temperature=0.7, max_tokens=1000,
+        )
         
         return {
-            "reply": reply[:1500],  # Limit response length
+            "reply": result["text"],  # already trimmed to 1500 chars by the gateway
             "career": None,
             "fallback": True,
             "confidence": 0.8,  # GPT responses are generally high confidence
         }
         
     except Exception as e:
-        print(f"DEBUG: Exception in gpt_fallback: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Exception in gpt_fallback: %s: %s", type(e).__name__, e)
         return None
 
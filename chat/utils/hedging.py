@@ -0,0 +1,201 @@
+# chat/utils/hedging.py
+"""Hedged generateContent calls across Gemini models.
+
+When hedging is on, each attempt starts on the primary model; if it has not
+answered after the observed latency percentile (GEMINI_HEDGE_PERCENTILE),
+the same payload is sent to the next healthy model and the first successful
+reply wins. Extra calls are capped at GEMINI_HEDGE_BUDGET of all requests,
+and ``hedge_stats()`` reports how often the hedge actually wins.
+
+A losing attempt that has already started cannot be interrupted: its thread
+runs until the upstream answers or its timeout (the request's remaining
+Deadline) passes. Until then it counts against the budget as well, so the
+budget bounds the extra upstream calls actually in flight.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .deadline import Deadline
+
+logger = logging.getLogger(__name__)
+
+# attempt(config, http_session, timeout) -> (data, error)
+Attempt = Callable[[Tuple[str, str], "requests.Session", float], Tuple[Optional[Dict], Optional[str]]]
+
+_lock = threading.Lock()
+_latencies = deque(maxlen=200)
+_unhealthy_until: Dict[Tuple[str, str], float] = {}
+_stats = {"requests": 0, "hedges": 0, "hedge_wins": 0, "primary_wins": 0, "budget_denied": 0,
+          "losers_in_flight": 0}
+_executor = None
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def hedging_enabled() -> bool:
+    return bool(_setting("GEMINI_HEDGE_ENABLED", False))
+
+
+def record_latency(seconds: float) -> None:
+    """Record the latency of a successful generateContent call."""
+    with _lock:
+        _latencies.append(seconds)
+
+
+def hedge_delay() -> float:
+    """Seconds to wait on the primary before hedging (observed percentile, floored)."""
+    with _lock:
+        samples = sorted(_latencies)
+    if len(samples) < 20:
+        return _setting("GEMINI_HEDGE_INITIAL_DELAY", 3.0)
+    index = min(len(samples) - 1, int(len(samples) * _setting("GEMINI_HEDGE_PERCENTILE", 0.9)))
+    return max(_setting("GEMINI_HEDGE_MIN_DELAY", 0.5), samples[index])
+
+
+def mark_unhealthy(api_version: str, model: str, seconds: Optional[float] = None) -> None:
+    """Keep a model that returned 404/429/5xx out of hedge selection for a while."""
+    cooldown = seconds if seconds is not None else _setting("GEMINI_UNHEALTHY_COOLDOWN", 60)
+    with _lock:
+        _unhealthy_until[(api_version, model)] = time.monotonic() + cooldown
+
+
+def is_healthy(config: Tuple[str, str]) -> bool:
+    with _lock:
+        return _unhealthy_until.get(tuple(config), 0) <= time.monotonic()
+
+
+def hedge_stats() -> Dict:
+    """Snapshot of hedging counters, plus hedge rate and hedge win rate."""
+    with _lock:
+        stats = dict(_stats)
+    stats["hedge_rate"] = stats["hedges"] / stats["requests"] if stats["requests"] else 0.0
+    stats["hedge_win_rate"] = stats["hedge_wins"] / stats["hedges"] if stats["hedges"] else 0.0
+    stats["hedge_delay"] = hedge_delay()
+    return stats
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=2 * _setting("LLM_MAX_CONCURRENCY", 8),
+                    thread_name_prefix="gemini-hedge",
+                )
+    return _executor
+
+
+def _budget_allows() -> bool:
+    with _lock:
+        extra_calls = _stats["hedges"] + _stats["losers_in_flight"]
+        if extra_calls < _setting("GEMINI_HEDGE_BUDGET", 0.1) * _stats["requests"]:
+            _stats["hedges"] += 1
+            return True
+        _stats["budget_denied"] += 1
+        return False
+
+
+def _track_loser(future) -> None:
+    """Count a losing attempt that is still running until its thread returns."""
+    with _lock:
+        _stats["losers_in_flight"] += 1
+
+    def finished(_):
+        with _lock:
+            _stats["losers_in_flight"] -= 1
+    future.add_done_callback(finished)
+
+
+def _race(primary: Tuple[str, str], remaining: List[Tuple[str, str]], attempt: Attempt,
+          deadline: Deadline) -> Tuple[Optional[Dict], Optional[str], Optional[Tuple[str, str]]]:
+    """Run ``primary``, hedging onto the next healthy config in ``remaining`` if it is slow.
+
+    Returns (data, error, winning config). The winner is decided here, from the
+    first successful future seen, so an attempt that answers after it cannot
+    claim the reply. A hedge target is removed from ``remaining`` so the
+    cascade does not try it twice.
+    """
+    with _lock:
+        _stats["requests"] += 1
+
+    import requests
+
+    executor = _get_executor()
+    sessions = {}
+    configs = {}
+
+    def launch(config):
+        http = requests.Session()
+        future = executor.submit(attempt, config, http, deadline.timeout(30))
+        sessions[future] = http
+        configs[future] = config
+        return future
+
+    primary_future = launch(primary)
+    hedge_future = None
+    done, _ = wait([primary_future], timeout=min(hedge_delay(), deadline.remaining()))
+    if not done and not deadline.expired:
+        hedge_config = next((c for c in remaining if is_healthy(c)), None)
+        if hedge_config is not None and _budget_allows():
+            remaining.remove(hedge_config)
+            logger.debug("Primary %s slow, hedging with %s/%s", primary[1], hedge_config[0], hedge_config[1])
+            hedge_future = launch(hedge_config)
+
+    pending = [f for f in (primary_future, hedge_future) if f is not None]
+    winner = None
+    data, last_error = None, None
+    while pending and winner is None:
+        done, _ = wait(pending, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+        if not done:
+            last_error = "deadline exceeded"
+            break
+        for future in done:
+            pending.remove(future)
+            result, error = future.result()
+            if result is not None:
+                winner, data = future, result
+                break
+            last_error = error
+
+    # Cancel the loser: drop it if it never started, otherwise close its session,
+    # discard whatever it returns and count it against the budget until it does.
+    for future in pending:
+        if not future.cancel():
+            _track_loser(future)
+    for http in sessions.values():
+        http.close()
+
+    if winner is not None and hedge_future is not None:
+        with _lock:
+            _stats["hedge_wins" if winner is hedge_future else "primary_wins"] += 1
+    return data, last_error, configs.get(winner)
+
+
+def hedged_cascade(configs: List[Tuple[str, str]], attempt: Attempt,
+                   deadline: Deadline) -> Tuple[Optional[Dict], Optional[str], Optional[Tuple[str, str]]]:
+    """Walk ``configs`` like the plain cascade, but hedge each slow attempt.
+
+    Returns (data, last error, the config that produced ``data``).
+    """
+    remaining = list(configs)
+    last_error = None
+    while remaining:
+        if deadline.expired:
+            logger.info("Deadline exhausted, stopping hedged cascade")
+            return None, last_error or "deadline exceeded", None
+        primary = remaining.pop(0)
+        data, error, config = _race(primary, remaining, attempt, deadline)
+        if data is not None:
+            return data, None, config
+        last_error = error or last_error
+    return None, last_error, None
@@ -0,0 +1,179 @@
+# chat/utils/history_compactor.py
+"""Local, non-LLM compaction of conversation history for prompts.
+
+Instead of sending the last N raw messages, the prompt gets:
+  - the structured facts already extracted into ``user_context``,
+  - the most recent turns (verbatim, lightly truncated),
+  - the most informative older sentences, ranked by TF-IDF and picked
+    greedily under a token budget, with repeated bot text removed.
+The prompt size is therefore bounded no matter how long the session is.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+_WORD_RE = re.compile(r"[a-z0-9+#']+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "if", "of", "to", "in", "on", "for", "with", "at", "by",
+    "from", "is", "am", "are", "was", "were", "be", "been", "it", "this", "that", "these", "those",
+    "i", "me", "my", "you", "your", "we", "our", "they", "them", "he", "she", "so", "do", "does",
+    "can", "will", "would", "should", "could", "what", "which", "how", "about", "as", "just", "also",
+    "there", "here", "then", "than", "some", "any", "very", "really", "let", "lets", "im", "its",
+}
+
+_stats_lock = threading.Lock()
+_stats = {"compactions": 0, "original_tokens": 0, "compacted_tokens": 0}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def _terms(text: str) -> List[str]:
+    return [w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS and len(w) > 1]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def format_facts(user_context: Optional[Dict]) -> str:
+    """One-line summary of the structured facts extracted from the whole conversation."""
+    if not user_context:
+        return ""
+    parts = []
+    for key, label in (("education_level", "Education"), ("education", "Education"), ("stream", "Stream"),
+                       ("interests", "Interests"), ("goals", "Goals"),
+                       ("chosen_direction", "Chosen"), ("rejected_paths", "Rejected")):
+        value = user_context.get(key)
+        if isinstance(value, list):
+            value = ", ".join(value)
+        if value:
+            parts.append(f"{label}={value[:120]}")
+    if user_context.get("rejection_count"):
+        parts.append(f"Rejections={user_context['rejection_count']}")
+    return "Known facts: " + "; ".join(parts) if parts else ""
+
+
+def compact_history(history: Optional[List[Dict]], user_context: Optional[Dict] = None,
+                    token_budget: Optional[int] = None, keep_recent: Optional[int] = None) -> Dict:
+    """Compact ``history`` ([{"role", "text"}, ...], oldest first) under ``token_budget``.
+
+    Returns a dict with:
+      - "facts": the known-facts line (may be "")
+      - "messages": compacted [{"role", "text"}] in chronological order
+      - "original_tokens" / "compacted_tokens": estimated sizes for savings tracking
+    """
+    if token_budget is None:
+        token_budget = getattr(settings, "LLM_HISTORY_TOKEN_BUDGET", 250)
+    if keep_recent is None:
+        keep_recent = getattr(settings, "LLM_HISTORY_KEEP_RECENT", 2)
+    history = [m for m in (history or []) if (m.get("text") or "").strip()]
+    original_tokens = sum(estimate_tokens(m.get("text", "")) for m in history)
+
+    facts = format_facts(user_context)
+    budget = token_budget - estimate_tokens(facts)
+
+    # Most recent turns are kept verbatim (capped) for conversational continuity
+    recent = history[-keep_recent:] if keep_recent else []
+    older = history[:len(history) - len(recent)]
+    kept_recent = []
+    for m in recent:
+        text = m.get("text", "").strip()[:400]
+        kept_recent.append({"role": m.get("role", "user"), "text": text})
+        budget -= estimate_tokens(text)
+
+    # Split older messages into sentences, dropping bot text we've already seen
+    seen = {_normalize(sentence) for m in kept_recent if m["role"] != "user"
+            for sentence in _SENTENCE_RE.split(m["text"])}
+    candidates = []  # (message_index, sentence_index, role, sentence, terms)
+    for mi, m in enumerate(older):
+        role = m.get("role", "user")
+        for si, sentence in enumerate(s.strip() for s in _SENTENCE_RE.split(m.get("text", ""))):
+            if not sentence:
+                continue
+            key = _normalize(sentence)
+            if role != "user":
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+            terms = _terms(sentence)
+            if terms:
+                candidates.append((mi, si, role, sentence, terms))
+
+    selected = []
+    if candidates and budget > 0:
+        doc_freq = Counter()
+        for c in candidates:
+            doc_freq.update(set(c[4]))
+        n = len(candidates)
+        scored = []
+        for c in candidates:
+            tf = Counter(c[4])
+            weight = sum((count / len(c[4])) * (math.log((1 + n) / (1 + doc_freq[t])) + 1)
+                         for t, count in tf.items())
+            score = weight * math.sqrt(len(tf))
+            if c[2] == "user":
+                score *= 1.5  # user statements carry the facts we must not lose
+            scored.append((score, c))
+        scored.sort(key=lambda x: x[0], reverse=True)
+        chosen_terms = []
+        for _, c in scored:
+            cost = estimate_tokens(c[3])
+            if cost > budget:
+                continue
+            # Skip near-duplicates of something already selected
+            terms = set(c[4])
+            if any(len(terms & other) / len(terms | other) >= 0.7 for other in chosen_terms):
+                continue
+            selected.append(c)
+            chosen_terms.append(terms)
+            budget -= cost
+
+    # Rebuild selected sentences per message, in chronological order
+    selected.sort(key=lambda c: (c[0], c[1]))
+    messages = []
+    for mi, _, role, sentence, _ in selected:
+        if messages and messages[-1]["_index"] == mi:
+            messages[-1]["text"] += " " + sentence
+        else:
+            messages.append({"_index": mi, "role": role, "text": sentence})
+    for m in messages:
+        del m["_index"]
+    messages.extend(kept_recent)
+
+    compacted_tokens = estimate_tokens(facts) + sum(estimate_tokens(m["text"]) for m in messages)
+    with _stats_lock:
+        _stats["compactions"] += 1
+        _stats["original_tokens"] += original_tokens
+        _stats["compacted_tokens"] += compacted_tokens
+    return {
+        "facts": facts,
+        "messages": messages,
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+    }
+
+
+def render_context(compacted: Dict) -> str:
+    """Render a compact_history() result as the plain-text context used in prompts."""
+    lines = [compacted["facts"]] if compacted["facts"] else []
+    lines.extend(f"{m['role']}: {m['text']}" for m in compacted["messages"])
+    return "\n".join(lines)
+
+
+def compaction_stats() -> Dict:
+    """Cumulative input-token savings of compaction in this process."""
+    with _stats_lock:
+        stats = dict(_stats)
+    saved = stats["original_tokens"] - stats["compacted_tokens"]
+    stats["saved_tokens"] = saved
+    stats["saved_ratio"] = saved / stats["original_tokens"] if stats["original_tokens"] else 0.0
+    return stats
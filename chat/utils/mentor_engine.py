@@ -1,12 +1,20 @@
 # chat/utils/mentor_engine.py
+import functools
 import re
 import random
 from typing import List, Tuple, Dict, Optional
-try:
-    from rapidfuzz import fuzz
-    _HAS_RAPIDFUZZ = True
-except Exception:
-    _HAS_RAPIDFUZZ = False
+
+from chat.services.related_careers import related_careers
+
+
+@functools.lru_cache(maxsize=None)
+def _fuzz():
+    """rapidfuzz.fuzz, imported on first use (None if not installed)."""
+    try:
+        from rapidfuzz import fuzz
+    except Exception:
+        return None
+    return fuzz
 
 def detect_stage(message: str) -> str:
     msg = message.lower()
@@ -39,7 +47,8 @@ def extract_interest(message: str) -> List[str]:
 
 def _score_message_against_career(msg: str, career: Dict) -> float:
     m = msg.lower()
-    if _HAS_RAPIDFUZZ:
+    fuzz = _fuzz()
+    if fuzz is not None:
         s = 0
         s += 0.35 * fuzz.partial_ratio(m, career.get("name","").lower())
         s += 0.35 * fuzz.partial_ratio(m, " ".join(career.get("skills",[])).lower())
@@ -90,8 +99,10 @@ def format_response(career: Dict, session_stage: str, confidence: float) -> str:
         next_steps = "Look for suitable undergraduate programs or diploma options."
 
     encouragement = intel.get("interest_response") or random.choice(["Nice move!", "Great step!", "Keep going!"])
+    # Precomputed neighbours: a dict lookup, no model call
+    related = ", ".join(r["name"] for r in related_careers(career.get("name", ""), 3) or [])
 
-    parts = [p for p in [opening, stage_text, desc, f"Key skills: {skills}" if skills else "", f"Jobs: {jobs}" if jobs else "", next_steps, encouragement] if p]
+    parts = [p for p in [opening, stage_text, desc, f"Key skills: {skills}" if skills else "", f"Jobs: {jobs}" if jobs else "", f"Similar careers: {related}" if related else "", next_steps, encouragement] if p]
     return "\n\n".join(parts)
 
 def mentor_engine(user_message: str, career_data: List[Dict]) -> Optional[Dict]:
@@ -1,21 +1,39 @@
 # chat/views.py
-import json
-from django.http import JsonResponse
+from career_ai.fastjson import FastJsonResponse, loads_body
+from career_ai.pagination import decode_cursor, encode_cursor
 from django.views.decorators.csrf import csrf_exempt
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.functions import Substr
 from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .models import ConversationSession, MessageLog
+from .models import ArchivedConversation, ConversationSession, MessageLog
 from chat.career_bot import chat_with_bot
-from chat.utils.data_loader import load_dataset
+from chat.services.archive import archived_messages, ensure_hot, read_archive
+from chat.utils.admission import shed_llm_overload
+from chat.utils.deadline import Deadline
+from chat.utils.anon_session import ANON_PREFIX, anon_session_id, resolve_anon_id, set_anon_cookie
+from core import metrics
+
+# Most recent messages loaded per turn (compacted before they reach the model)
+CHAT_HISTORY_LIMIT = 60
+# Page sizes (default, max) of the conversation list and of one conversation's messages
+CONVERSATION_PAGE = (30, 100)
+MESSAGE_PAGE = (50, 200)
+# Characters of the title (first user message) and last message sent with the conversation list
+CONVERSATION_TITLE_CHARS = 80
+CONVERSATION_PREVIEW_CHARS = 160
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@shed_llm_overload
+# One rollup update per metric for the request's session and messages
+@metrics.deferred()
 def chat_post(request):
     try:
-        body = json.loads(request.body.decode() or "{}")
+        body = loads_body(request)
     except Exception:
         return Response({"error": "invalid json"}, status=400)
 
@@ -24,21 +42,23 @@ def chat_post(request):
 
     if not all([conversation_id, msg]):
         return Response({"error": "conversation_id and message are required"}, status=400)
+    if not isinstance(conversation_id, str):
+        return Response({"error": "conversation_id must be a string"}, status=400)
+    conversation_id = _signed_in_session_id(request.user, conversation_id)
+    if conversation_id is None:
+        return Response({"error": "invalid conversation_id"}, status=400)
+
+    # Scoped to the user like chat_ask, so another user's session is never found here
+    sess, _ = ConversationSession.objects.get_or_create(session_id=conversation_id, defaults={'user': request.user})
+    ensure_hot(sess)
 
-    # Get or create session, now associated with the user
-    sess, created = ConversationSession.objects.get_or_create(
-        session_id=conversation_id, 
-        defaults={'user': request.user}
-    )
-    if not created and not sess.user:
-        sess.user = request.user
-        sess.save()
+    deadline = Deadline.for_endpoint("chat")
 
     # Log user message
     MessageLog.objects.create(session=sess, role="user", text=msg, created_at=timezone.now())
 
     # Generate reply using bot
-    bot_response = chat_with_bot(msg)
+    bot_response = chat_with_bot(msg, deadline=deadline)
 
     # Log bot message
     MessageLog.objects.create(session=sess, role="bot", text=bot_response["reply"], created_at=timezone.now())
@@ -51,23 +71,83 @@ def chat_post(request):
         "fallback": bot_response.get("fallback"),
     })
 
+def _request_user(request):
+    """Authenticated user of a plain (non-DRF) view: Django session or JWT bearer token."""
+    if request.user.is_authenticated:
+        return request.user
+    try:
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        result = JWTAuthentication().authenticate(request)
+    except Exception:
+        return None
+    return result[0] if result else None
+
+
+def _user_session_id(user, client_session_id):
+    """ConversationSession.session_id for one of a signed-in user's conversations.
+
+    Client ids (``chat_<timestamp>``) are only unique per browser, so they are
+    namespaced under the user like anon_session_id does for guests. Ids the
+    server already handed out (the conversation list) are passed through.
+    """
+    prefix = f"user:{user.pk}:"
+    client_session_id = client_session_id or "default"
+    if client_session_id.startswith(prefix):
+        client_session_id = client_session_id[len(prefix):]
+    # Truncated after the prefix so the id always fits session_id (max_length=100)
+    return prefix + client_session_id[:60]
+
+
+def _signed_in_session_id(user, client_session_id):
+    """session_id of ``user``'s conversation ``client_session_id``, or None if it names a guest session."""
+    if client_session_id and client_session_id.startswith(ANON_PREFIX):
+        return None
+    # Conversations the user started before ids were namespaced keep their raw id
+    if client_session_id and ConversationSession.objects.filter(session_id=client_session_id, user=user).exists():
+        return client_session_id
+    return _user_session_id(user, client_session_id)
+
+
 @csrf_exempt
+@shed_llm_overload
+@metrics.deferred()
 def chat_ask(request):
     """
     POST { "session_id": "abc", "message": "I am in 12th and like coding" }
+
+    For anonymous callers ``session_id`` is scoped to a server-issued
+    anonymous id (see chat/utils/anon_session.py) returned as the
+    ``chat_anon`` cookie and as ``anon_token`` in the response.
     """
+    deadline = Deadline.for_endpoint("chat")
     try:
-        body = json.loads(request.body.decode() or "{}")
+        body = loads_body(request)
     except Exception:
-        return JsonResponse({"error": "invalid json"}, status=400)
+        return FastJsonResponse({"error": "invalid json"}, status=400)
 
-    session_id = body.get("session_id") or "anon"
     msg = (body.get("message") or "").strip()
     if not msg:
-        return JsonResponse({"error": "empty message"}, status=400)
+        return FastJsonResponse({"error": "empty message"}, status=400)
+
+    # Anonymous clients get their own server-issued namespace instead of one shared "anon" row
+    user = _request_user(request)
+    anon_token = None
+    client_session_id = body.get("session_id")
+    if client_session_id is not None and not isinstance(client_session_id, str):
+        return FastJsonResponse({"error": "session_id must be a string"}, status=400)
+    if user is not None:
+        session_id = _signed_in_session_id(user, client_session_id)
+        if session_id is None:
+            return FastJsonResponse({"error": "invalid session_id"}, status=400)
+    else:
+        anon_id, anon_token = resolve_anon_id(request, body)
+        session_id = anon_session_id(anon_id, client_session_id)
 
-    # Get or create session (core app model)
-    sess, _ = ConversationSession.objects.get_or_create(session_id=session_id)
+    # Sessions are created lazily, on the first message of a conversation. Every
+    # id above is scoped to its caller, so a session is only ever found by its owner.
+    sess, _ = ConversationSession.objects.get_or_create(session_id=session_id, defaults={"user": user})
+    # Continuing an archived conversation brings it back into MessageLog
+    ensure_hot(sess)
 
     # Log user message (chat.models.MessageLog model)
     try:
@@ -76,10 +156,12 @@ def chat_ask(request):
         # If MessageLog or session relations differ, ignore logging but continue
         pass
 
-    # Build short history context for smarter fallback
-    prior = list(MessageLog.objects.filter(session=sess).order_by('created_at')[:6].values('role','text'))
+    # Recent history for context; gemini_fallback compacts it to a token budget
+    prior = list(MessageLog.objects.filter(session=sess).order_by('-created_at')[:CHAT_HISTORY_LIMIT].values('role','text'))
+    prior.reverse()
     # Generate reply using bot with context
-    reply = chat_with_bot(msg, history=prior)["reply"]
+    bot_response = chat_with_bot(msg, history=prior, deadline=deadline)
+    reply = bot_response["reply"]
 
     # Save bot message to logs if possible
     try:
@@ -87,35 +169,50 @@ def chat_ask(request):
     except Exception:
         pass
 
-    return JsonResponse({"type": "bot", "text": reply})
+    data = {"type": "bot", "text": reply}
+    if bot_response.get("degraded"):
+        data["fallback"] = True
+    if anon_token is None:
+        return FastJsonResponse(data)
+    # Also returned in the body for clients that cannot keep cookies (send it back as X-Chat-Anon)
+    data["anon_token"] = anon_token
+    return set_anon_cookie(FastJsonResponse(data), anon_token)
 
 @csrf_exempt
+@shed_llm_overload
 def ask_career(request):
     # quick GET test or POST
     if request.method == "GET":
         user_message = request.GET.get("message","")
     else:
         try:
-            body = json.loads(request.body.decode() or "{}")
+            body = loads_body(request)
             user_message = body.get("message","")
         except Exception:
             user_message = ""
 
-    reply = chat_with_bot(user_message)["reply"]
-    return JsonResponse({"reply": reply})
+    reply = chat_with_bot(user_message, deadline=Deadline.for_endpoint("chat"))["reply"]
+    return FastJsonResponse({"reply": reply})
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def chat_history(request):
     """
     Retrieves the chat history for the authenticated user.
+
+    Returns every message of every conversation; the chat page uses
+    chat_conversations and chat_messages instead, which page by index.
     """
     user = request.user
-    conversations = ConversationSession.objects.filter(user=user).prefetch_related('messagelog_set').order_by('-id')
+    conversations = ConversationSession.objects.filter(user=user).select_related('archive').prefetch_related('messagelog_set').order_by('-id')
     
     history = []
     for convo in conversations:
-        messages = convo.messagelog_set.all().order_by('created_at')
+        if convo.is_archived:
+            # Read straight from the cold blob; it is only rehydrated when the conversation continues
+            messages = [MessageLog(**m) for m in archived_messages(convo)]
+        else:
+            messages = convo.messagelog_set.all().order_by('created_at')
         history.append({
             'conversation_id': convo.session_id,
             'stage': convo.stage,
@@ -131,4 +228,116 @@ def chat_history(request):
             ]
         })
         
-    return Response(history)
\ No newline at end of file
+    return Response(history)
+
+
+def _page_limit(params, page):
+    """``?limit=`` clamped to the (default, max) ``page``; raises ValueError if not an integer."""
+    default, maximum = page
+    limit = params.get('limit')
+    return min(max(int(limit), 1), maximum) if limit is not None else default
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def chat_conversations(request):
+    """
+    The user's conversations, most recently active first, one keyset page at a time.
+
+    GET ?limit=30&cursor=... returns {"results": [{conversation_id, title,
+    last_message, last_message_at, stage, archived}], "next": cursor or None}.
+    Title (first user message) and last message are correlated subqueries
+    served by the (session, created_at, id) index; archived conversations on
+    the page are previewed from their blob.
+    """
+    try:
+        limit = _page_limit(request.query_params, CONVERSATION_PAGE)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=400)
+
+    qs = ConversationSession.objects.filter(user=request.user, last_message_at__isnull=False)
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        try:
+            key, last_id = decode_cursor(cursor, 'datetime')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        qs = qs.filter(Q(last_message_at__lt=key) | Q(last_message_at=key, id__lt=last_id))
+
+    messages = MessageLog.objects.filter(session=OuterRef('pk'))
+    first_user = messages.filter(role='user').order_by('created_at', 'id').values('text')[:1]
+    latest = messages.order_by('-created_at', '-id').values('text')[:1]
+    rows = list(qs.order_by('-last_message_at', '-id').annotate(
+        title=Substr(Subquery(first_user), 1, CONVERSATION_TITLE_CHARS),
+        last_message=Substr(Subquery(latest), 1, CONVERSATION_PREVIEW_CHARS),
+    ).values('id', 'session_id', 'stage', 'is_archived', 'last_message_at', 'title', 'last_message')[:limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor((rows[-1]['last_message_at'], rows[-1]['id']))
+
+    archived = {row['id']: row for row in rows if row['is_archived']}
+    for archive in ArchivedConversation.objects.filter(session_id__in=archived):
+        stored = read_archive(archive)
+        row = archived[archive.session_id]
+        row['title'] = next((m['text'] for m in stored if m['role'] == 'user'), '')[:CONVERSATION_TITLE_CHARS]
+        row['last_message'] = stored[-1]['text'][:CONVERSATION_PREVIEW_CHARS] if stored else ''
+
+    return Response({
+        'results': [{
+            'conversation_id': row['session_id'],
+            'title': row['title'] or '',
+            'last_message': row['last_message'] or '',
+            'last_message_at': row['last_message_at'].isoformat(),
+            'stage': row['stage'],
+            'archived': row['is_archived'],
+        } for row in rows],
+        'next': next_cursor,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def chat_messages(request, conversation_id):
+    """
+    One conversation's messages, newest page first.
+
+    GET ?limit=50&cursor=... returns {"results": [{role, text, created_at}],
+    "next": cursor or None}. Each page is in chronological order; "next"
+    fetches the page of older messages before it. Opening an archived
+    conversation rehydrates it (the archive job moves it back once idle).
+    """
+    try:
+        limit = _page_limit(request.query_params, MESSAGE_PAGE)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=400)
+    sess = ConversationSession.objects.filter(
+        session_id__in=(conversation_id, _user_session_id(request.user, conversation_id)), user=request.user,
+    ).first()
+    if sess is None:
+        return Response({'error': 'Conversation not found'}, status=404)
+    ensure_hot(sess)
+
+    qs = MessageLog.objects.filter(session=sess)
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        try:
+            key, last_id = decode_cursor(cursor, 'datetime')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        qs = qs.filter(Q(created_at__lt=key) | Q(created_at=key, id__lt=last_id))
+    rows = list(qs.order_by('-created_at', '-id').values('id', 'role', 'text', 'created_at')[:limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor((rows[-1]['created_at'], rows[-1]['id']))
+    rows.reverse()
+    return Response({
+        'results': [
+            {'role': row['role'], 'text': row['text'], 'created_at': row['created_at'].isoformat()}
+            for row in rows
+        ],
+        'next': next_cursor,
+    })
@@ -1,6 +1,49 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .db import apply_sqlite_pragmas
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid="core.apply_sqlite_pragmas")
+
+        from django.db.models.signals import post_delete, post_save
+        from .caching import invalidate_on_career_change, invalidate_on_mentor_change
+        from .models import Career, Mentor
+        post_save.connect(invalidate_on_career_change, sender=Career, dispatch_uid="core.career_saved")
+        post_delete.connect(invalidate_on_career_change, sender=Career, dispatch_uid="core.career_deleted")
+        post_save.connect(invalidate_on_mentor_change, sender=Mentor, dispatch_uid="core.mentor_saved")
+        post_delete.connect(invalidate_on_mentor_change, sender=Mentor, dispatch_uid="core.mentor_deleted")
+
+        from .search import index_on_save, unindex_on_delete
+        post_save.connect(index_on_save, sender=Career, dispatch_uid="core.search.career_saved")
+        post_delete.connect(unindex_on_delete, sender=Career, dispatch_uid="core.search.career_deleted")
+
+        from django.core.signals import request_started
+        from . import invalidation
+        from .caching import drop_local_career_caches, drop_local_mentor_cache
+        invalidation.subscribe(invalidation.CAREERS, drop_local_career_caches)
+        invalidation.subscribe(invalidation.MENTORS, drop_local_mentor_cache)
+        # Started lazily so each forked worker gets its own listener thread
+        request_started.connect(invalidation.ensure_listener, dispatch_uid="core.invalidation_listener")
+
+        from django.contrib.auth.models import User
+        from chat.models import ConversationSession, MessageLog
+        from . import metrics
+        post_save.connect(metrics.track_created(metrics.USERS), sender=User, weak=False,
+                          dispatch_uid="core.metrics.user_created")
+        post_delete.connect(metrics.track_deleted(metrics.USERS), sender=User, weak=False,
+                            dispatch_uid="core.metrics.user_deleted")
+        post_save.connect(metrics.track_created(metrics.CAREERS, buckets=False), sender=Career, weak=False,
+                          dispatch_uid="core.metrics.career_created")
+        post_delete.connect(metrics.track_deleted(metrics.CAREERS), sender=Career, weak=False,
+                            dispatch_uid="core.metrics.career_deleted")
+        post_save.connect(metrics.track_created(metrics.CONVERSATIONS), sender=ConversationSession, weak=False,
+                          dispatch_uid="core.metrics.conversation_created")
+        post_delete.connect(metrics.track_deleted(metrics.CONVERSATIONS), sender=ConversationSession, weak=False,
+                            dispatch_uid="core.metrics.conversation_deleted")
+        post_save.connect(metrics.track_created(metrics.MESSAGES), sender=MessageLog, weak=False,
+                          dispatch_uid="core.metrics.message_created")
@@ -0,0 +1,108 @@
+# core/caching.py
+"""HTTP and server-side caching for the read-mostly career endpoints.
+
+Career data only changes when the dataset is re-imported, so responses are
+keyed on a dataset version: a content hash of the Career table, kept in the
+two-tier cache (career_ai/tiered_cache.py) and dropped whenever a Career row
+changes (signals) or an import finishes. The version feeds both the ETag
+(conditional GET / 304) and the keys of the per-career response cache, so
+stale entries are never read after an import and simply expire. Other
+processes pick up a new version within the version cache's 5 second L1 TTL,
+or as soon as the invalidation bus (core/invalidation.py) tells them.
+
+The Mentor table is cached the same way and dropped when a mentor changes.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import transaction
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from career_ai.tiered_cache import TieredCache
+
+from . import invalidation
+
+# Dataset version: no expiry in Redis, re-read by each process every few seconds
+_versions = TieredCache("careers.version", ttl=None, l1_ttl=5)
+# Per-career endpoint responses, keyed under the dataset version
+career_responses = TieredCache("careers.resp", ttl=3600)
+# The (small) Mentor table, dropped on any Mentor change
+_mentors = TieredCache("mentors", ttl=3600)
+
+
+def _compute_dataset_version() -> str:
+    from .models import Career
+    digest = hashlib.sha1()
+    for row in Career.objects.order_by("id").values_list():
+        digest.update(json.dumps(row, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def dataset_version() -> str:
+    """Current career dataset version (computed once per import, then cached in both tiers)."""
+    return _versions.get_or_set("dataset", _compute_dataset_version)
+
+
+def invalidate_dataset_version() -> None:
+    """Forget the dataset version so the next request recomputes it."""
+    _versions.delete("dataset")
+
+
+def invalidate_on_career_change(sender, **kwargs):
+    """post_save/post_delete receiver for Career; waits for the transaction to commit."""
+    transaction.on_commit(invalidate_dataset_version)
+    invalidation.publish(invalidation.CAREERS)
+
+
+def drop_local_career_caches() -> None:
+    """Invalidation bus handler: forget this process's L1 copies of the version and responses."""
+    _versions.clear_local()
+    career_responses.clear_local()
+
+
+def mentor_rows() -> list:
+    """All Mentor rows as dicts (name, expertise, tags, contact), cached until a mentor changes."""
+    from .models import Mentor
+    return _mentors.get_or_set("all", lambda: list(Mentor.objects.values("name", "expertise", "tags", "contact")))
+
+
+def invalidate_on_mentor_change(sender, **kwargs):
+    """post_save/post_delete receiver for Mentor."""
+    transaction.on_commit(lambda: _mentors.delete("all"))
+    invalidation.publish(invalidation.MENTORS)
+
+
+def drop_local_mentor_cache() -> None:
+    """Invalidation bus handler for mentor changes."""
+    _mentors.clear_local()
+
+
+def content_etag(*parts) -> str:
+    """Strong ETag over JSON-serializable ``parts``."""
+    raw = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return '"%s"' % hashlib.sha1(raw).hexdigest()[:20]
+
+
+def career_response_cache_key(field: str, career_name: str) -> str:
+    """Key in ``career_responses``; embeds the dataset version so an import orphans old entries."""
+    return "%s:%s:%s" % (dataset_version(), field, hashlib.sha1(career_name.lower().encode()).hexdigest()[:16])
+
+
+def cached_read_endpoint(etag_func):
+    """ETag/304 handling plus public Cache-Control for a read-mostly GET view.
+
+    ``etag_func(request, *args, **kwargs)`` must be cheap: it runs before the
+    view on every request, and a matching If-None-Match skips the view.
+    """
+    headers = cache_control(
+        public=True,
+        max_age=getattr(settings, "CAREER_CACHE_MAX_AGE", 300),
+        stale_while_revalidate=getattr(settings, "CAREER_CACHE_STALE_WHILE_REVALIDATE", 86400),
+    )
+
+    def decorator(view):
+        return headers(condition(etag_func=etag_func)(view))
+    return decorator
@@ -0,0 +1,18 @@
+# core/db.py
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """connection_created handler: tune every new SQLite connection.
+
+    WAL lets concurrent MessageLog writers queue on busy_timeout instead of
+    failing with "database is locked" while readers keep going.
+    """
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
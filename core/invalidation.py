@@ -0,0 +1,240 @@
+# core/invalidation.py
+"""Cross-worker invalidation bus for per-process caches and indexes.
+
+Writers call ``publish(topic)`` (from post_save/post_delete receivers or at
+the end of an import). Once the transaction commits, the topic's
+``DataVersion`` row is bumped, once per transaction however many rows
+changed, and the new version is published on a Redis pub/sub channel.
+
+Every web process runs one daemon listener thread, started on its first
+request so that it survives gunicorn's fork. The listener receives the
+messages and, as a fallback, polls the ``DataVersion`` rows:
+  - every INVALIDATION_POLL_SECONDS while Redis is unreachable;
+  - every INVALIDATION_RECONCILE_SECONDS otherwise, to catch messages
+    missed during a reconnect.
+When a topic's version moves past the last version this process saw, its
+handlers run in the listener thread. Handlers rebuild indexes and swap
+them in, so requests keep using the old data until the new data is ready
+and never wait for a rebuild.
+
+Handlers are registered with ``subscribe(topic, handler)`` in
+AppConfig.ready().
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+CAREERS = "careers"
+MENTORS = "mentors"
+INTENT_MODEL = "intent_model"
+RELATED_CAREERS = "related_careers"
+
+_handlers = defaultdict(list)
+_pending = threading.local()
+_seen: Dict[str, int] = {}
+_seen_lock = threading.Lock()
+_listener_lock = threading.Lock()
+_listener_pid = None
+
+
+def _channel() -> str:
+    return getattr(settings, "INVALIDATION_CHANNEL", "career_ai:invalidate")
+
+
+def subscribe(topic: str, handler: Callable[[], None]) -> None:
+    """Run ``handler()`` in the listener thread whenever ``topic``'s version changes."""
+    if handler not in _handlers[topic]:
+        _handlers[topic].append(handler)
+
+
+# -- publishing ------------------------------------------------------------
+
+class _Flush:
+    """on_commit callback bumping the topics published at one savepoint level.
+
+    Topics live on the callback itself, so when a savepoint or the whole
+    transaction rolls back Django drops them together with the callback.
+    The flushes of one transaction share ``done``, so a topic published at
+    several levels is still bumped once.
+    """
+
+    def __init__(self, done: set):
+        self.topics = set()
+        self.done = done
+        self.ran = False
+
+    def __call__(self) -> None:
+        self.ran = True
+        for topic in sorted(self.topics - self.done):
+            self.done.add(topic)
+            try:
+                version = bump(topic)
+            except Exception as e:
+                logger.warning("Could not bump data version for %s: %s", topic, e)
+                continue
+            _redis_publish(topic, version)
+
+
+def publish(topic: str) -> None:
+    """Bump ``topic`` once the current transaction commits (immediately in autocommit).
+
+    Repeated calls within one transaction coalesce into a single bump; calls
+    in a block that rolls back bump nothing.
+    """
+    connection = transaction.get_connection()
+    waiting = {entry[1] for entry in connection.run_on_commit}
+    flushes = getattr(_pending, "flushes", None)
+    if not flushes or not any(f in waiting and not f.ran for f in flushes.values()):
+        # No flush of ours is waiting: this is a new transaction
+        flushes = _pending.flushes = {}
+    level = tuple(connection.savepoint_ids)
+    flush = flushes.get(level)
+    if flush in waiting and not flush.ran:
+        flush.topics.add(topic)
+        return
+    done = next(iter(flushes.values())).done if flushes else set()
+    flush = flushes[level] = _Flush(done)
+    flush.topics.add(topic)
+    transaction.on_commit(flush)
+
+
+def bump(topic: str) -> int:
+    """Increment ``topic``'s DataVersion row and return the new version."""
+    from .models import DataVersion
+    with transaction.atomic():
+        if not DataVersion.objects.filter(topic=topic).update(version=F("version") + 1):
+            DataVersion.objects.get_or_create(topic=topic)
+            DataVersion.objects.filter(topic=topic).update(version=F("version") + 1)
+        return DataVersion.objects.filter(topic=topic).values_list("version", flat=True).get()
+
+
+def _get_redis():
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection("default")
+    except Exception:
+        # Not a django_redis cache (e.g. locmem in tests) or Redis unreachable
+        return None
+
+
+def _redis_publish(topic: str, version: int) -> None:
+    client = _get_redis()
+    if client is None:
+        return
+    try:
+        client.publish(_channel(), json.dumps({"topic": topic, "version": version}))
+    except Exception as e:
+        # Listeners still pick the bump up from the DataVersion row
+        logger.info("Invalidation publish for %s failed, relying on polling: %s", topic, e)
+
+
+# -- receiving -------------------------------------------------------------
+
+def apply(topic: str, version: int) -> bool:
+    """Run ``topic``'s handlers if ``version`` is newer than the last one seen here."""
+    with _seen_lock:
+        if version <= _seen.get(topic, 0):
+            return False
+        _seen[topic] = version
+    for handler in _handlers.get(topic, []):
+        try:
+            handler()
+        except Exception as e:
+            logger.exception("Invalidation handler %s for %s failed: %s", handler, topic, e)
+    logger.info("Applied %s data version %s", topic, version)
+    return True
+
+
+def _db_versions() -> Dict[str, int]:
+    from .models import DataVersion
+    try:
+        return dict(DataVersion.objects.values_list("topic", "version"))
+    finally:
+        # This thread must not keep a connection open between polls
+        connection.close()
+
+
+def poll() -> None:
+    """Reconcile with the DataVersion rows (the pub/sub fallback)."""
+    try:
+        versions = _db_versions()
+    except Exception as e:
+        logger.warning("Data version poll failed: %s", e)
+        return
+    for topic, version in versions.items():
+        apply(topic, version)
+
+
+def _baseline() -> None:
+    """Record the current versions without running handlers: this process loads fresh data lazily."""
+    try:
+        versions = _db_versions()
+    except Exception:
+        return
+    with _seen_lock:
+        for topic, version in versions.items():
+            _seen[topic] = max(_seen.get(topic, 0), version)
+
+
+def _listen() -> None:
+    _baseline()
+    poll_seconds = getattr(settings, "INVALIDATION_POLL_SECONDS", 5)
+    reconcile_seconds = getattr(settings, "INVALIDATION_RECONCILE_SECONDS", 60)
+    pubsub = None
+    next_poll = 0.0
+    while True:
+        if pubsub is None:
+            client = _get_redis()
+            if client is not None:
+                try:
+                    pubsub = client.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(_channel())
+                    next_poll = 0.0  # catch up on anything missed while disconnected
+                except Exception as e:
+                    logger.info("Invalidation bus falling back to polling: %s", e)
+                    pubsub = None
+        if time.monotonic() >= next_poll:
+            poll()
+            # Handlers may have queried the database from this thread
+            connection.close()
+            next_poll = time.monotonic() + (reconcile_seconds if pubsub is not None else poll_seconds)
+        if pubsub is None:
+            time.sleep(poll_seconds)
+            continue
+        try:
+            message = pubsub.get_message(timeout=min(poll_seconds, reconcile_seconds))
+        except Exception as e:
+            logger.info("Invalidation bus lost Redis, polling until it is back: %s", e)
+            pubsub = None
+            continue
+        if message and message.get("type") == "message":
+            try:
+                data = json.loads(message["data"])
+                apply(data["topic"], int(data["version"]))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning("Ignoring malformed invalidation message %r: %s", message.get("data"), e)
+            connection.close()
+
+
+def ensure_listener(**kwargs) -> None:
+    """Start this process's listener thread if needed (connected to request_started)."""
+    global _listener_pid
+    pid = os.getpid()
+    if _listener_pid == pid or not getattr(settings, "INVALIDATION_BUS_ENABLED", True):
+        return
+    with _listener_lock:
+        if _listener_pid == pid:
+            return
+        _listener_pid = pid
+        threading.Thread(target=_listen, name="invalidation-bus", daemon=True).start()
@@ -0,0 +1,24 @@
+# core/management/commands/backfill_metrics.py
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import metrics
+from core.models import MetricRollup
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the MetricRollup counters from the User/Career/ConversationSession/MessageLog tables "
+            "and archived conversations")
+
+    def handle(self, *args, **options):
+        rollups = metrics.rollup_rows(apps)
+        with transaction.atomic():
+            MetricRollup.objects.all().delete()
+            MetricRollup.objects.bulk_create(rollups, batch_size=500)
+        try:
+            cache.delete(metrics.DASHBOARD_CACHE_KEY)
+        except Exception:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(rollups)} metric rollup rows."))
@@ -2,9 +2,13 @@
 from django.core.management.base import BaseCommand
 from django.apps import apps
 from django.conf import settings
+from django.db import transaction
 from pathlib import Path
 import json
 
+from core import invalidation, metrics
+from core.caching import invalidate_dataset_version
+
 class Command(BaseCommand):
     help = "Import careers from data/career_dataset.json into core.Career or core.CareerPath model"
 
@@ -23,19 +27,29 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR("No Career/CareerPath model found in core app."))
                 return
 
-        Career.objects.all().delete()
-        for item in data:
-            Career.objects.create(
-                name = item.get("name",""),
-                stage = item.get("stage",""),
-                description = item.get("description",""),
-                salary_range = item.get("salary_range",""),
-                skills = item.get("skills",[]),
-                specialties = item.get("specialties",[]),
-                future_paths = item.get("future_paths",[]),
-                jobs = item.get("jobs",[]),
-                tags = item.get("tags",[]),
-                mentor_templates = item.get("mentor_templates",{}),
-                intelligence_layer = item.get("intelligence_layer",{})
-            )
+        # One careers rollup update for the whole import instead of one per deleted and created row
+        with metrics.deferred(), transaction.atomic():
+            Career.objects.all().delete()
+            # The search index follows through the Career post_save/post_delete receivers (core/search.py)
+            for item in data:
+                Career.objects.create(
+                    name = item.get("name",""),
+                    stage = item.get("stage",""),
+                    description = item.get("description",""),
+                    salary_range = item.get("salary_range",""),
+                    skills = item.get("skills",[]),
+                    specialties = item.get("specialties",[]),
+                    future_paths = item.get("future_paths",[]),
+                    jobs = item.get("jobs",[]),
+                    mentors = item.get("mentors",[]),
+                    lecture_platforms = item.get("lecture_platforms",[]),
+                    example_queries = item.get("example_queries",[]),
+                    tags = item.get("tags",[]),
+                    mentor_templates = item.get("mentor_templates",{}),
+                    intelligence_layer = item.get("intelligence_layer",{})
+                )
+            # One version bump for the whole import, sent to every worker on commit
+            invalidation.publish(invalidation.CAREERS)
+        # Drop cached career responses and ETags built from the old dataset
+        invalidate_dataset_version()
         self.stdout.write(self.style.SUCCESS("Imported careers successfully."))
@@ -0,0 +1,37 @@
+# core/management/commands/rebuild_career_search.py
+"""Refill the SQLite FTS5 career search index (core/search.py) from core_career.
+
+Only needed to repair the index, e.g. after careers were changed with raw SQL
+or SQLite was upgraded to a build with FTS5:
+    cd /srv/career-ai && python manage.py rebuild_career_search
+On PostgreSQL the search column is generated by the database and never needs this.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index over careers (SQLite FTS5)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        connection = connections[using]
+        if connection.vendor == "postgresql":
+            self.stdout.write("PostgreSQL maintains the search column itself; nothing to do.")
+            return
+        if connection.vendor != "sqlite" or not search.create_fts5(connection):
+            self.stdout.write(self.style.WARNING("No full-text index on this database; search scans the table."))
+            return
+        started = time.monotonic()
+        with transaction.atomic(using=using):
+            count = search.rebuild(using)
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} careers in {time.monotonic() - started:.2f}s."
+        ))
@@ -0,0 +1,216 @@
+# core/metrics.py
+"""Materialized dashboard counters.
+
+Creation signals on User, Career, ConversationSession and MessageLog bump
+hourly and daily ``MetricRollup`` buckets plus a running total, once the
+creating transaction commits. The dashboard then reads a handful of rollup
+rows (cached briefly in Redis) instead of COUNT(*) over the source tables.
+Migration 0008 fills the rollups from the rows that already exist, and
+``manage.py backfill_metrics`` rebuilds them from the source tables; both
+build their rows with ``rollup_rows``.
+"""
+
+import datetime
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import MetricRollup
+
+logger = logging.getLogger(__name__)
+
+USERS = "users"
+CAREERS = "careers"
+CONVERSATIONS = "conversations"
+MESSAGES = "messages"
+
+# Fixed bucket for the "total" granularity
+TOTAL_BUCKET = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+DASHBOARD_CACHE_KEY = "metrics:dashboard"
+
+
+def hour_bucket(when: datetime.datetime) -> datetime.datetime:
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(when: datetime.datetime) -> datetime.datetime:
+    return timezone.localtime(when).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add(metric: str, granularity: str, bucket_start: datetime.datetime, amount: int) -> None:
+    lookup = {"metric": metric, "granularity": granularity, "bucket_start": bucket_start}
+    if MetricRollup.objects.filter(**lookup).update(value=F("value") + amount):
+        return
+    try:
+        with transaction.atomic():
+            MetricRollup.objects.create(value=amount, **lookup)
+    except IntegrityError:
+        # Another worker created the bucket first
+        MetricRollup.objects.filter(**lookup).update(value=F("value") + amount)
+
+
+def increment(metric: str, amount: int = 1, at: datetime.datetime = None, buckets: bool = True) -> None:
+    """Add ``amount`` to the total of ``metric`` and, if ``buckets``, to its hour/day buckets."""
+    at = at or timezone.now()
+    try:
+        with transaction.atomic():
+            _add(metric, "total", TOTAL_BUCKET, amount)
+            if buckets:
+                _add(metric, "hour", hour_bucket(at), amount)
+                _add(metric, "day", day_bucket(at), amount)
+    except Exception as e:
+        # Counters must never break the write that triggered them
+        logger.warning("Could not update metric %s: %s", metric, e)
+
+
+_deferred = threading.local()
+
+
+@contextmanager
+def deferred():
+    """Coalesce the counter updates fired inside the block into one per metric.
+
+    For bulk jobs (e.g. purging thousands of rows) that would otherwise run a
+    rollup UPDATE per row, and for chat views that log several messages per
+    request. Updates still count only once their transaction commits; the
+    totals are applied when the block exits, and updates whose transaction
+    commits after that are applied on commit as usual.
+    """
+    pending = getattr(_deferred, "pending", None)
+    if pending is not None:  # already inside a deferred block
+        yield
+        return
+    _deferred.pending = pending = Counter()
+    try:
+        yield
+    finally:
+        _deferred.pending = None
+        at = timezone.now()
+        for (metric, buckets), amount in pending.items():
+            if amount:
+                increment(metric, amount, at, buckets)
+
+
+def _on_commit_increment(metric, amount=1, buckets=True):
+    pending = getattr(_deferred, "pending", None)
+    at = timezone.now()
+
+    def apply():
+        if pending is not None and getattr(_deferred, "pending", None) is pending:
+            pending[(metric, buckets)] += amount
+        else:
+            increment(metric, amount, at, buckets)
+    transaction.on_commit(apply)
+
+
+def track_created(metric: str, buckets: bool = True):
+    """post_save receiver factory counting newly created rows."""
+    def receiver(sender, instance, created, raw=False, **kwargs):
+        if created and not raw:
+            _on_commit_increment(metric, 1, buckets)
+    return receiver
+
+
+def track_deleted(metric: str):
+    """post_delete receiver factory keeping the running total in step."""
+    def receiver(sender, instance, **kwargs):
+        _on_commit_increment(metric, -1, buckets=False)
+    return receiver
+
+
+def _bucketed(queryset, field, key="pk"):
+    """[(granularity, bucket_start, count)] of ``queryset`` in hourly and daily buckets of ``field``."""
+    rows = []
+    for granularity, bucket in (("hour", TruncHour(field)),
+                                ("day", TruncDay(field, tzinfo=timezone.get_current_timezone()))):
+        for row in queryset.annotate(bucket=bucket).values("bucket").annotate(n=Count(key)).order_by():
+            if row["bucket"] is not None:
+                rows.append((granularity, row["bucket"], row["n"]))
+    return rows
+
+
+def rollup_rows(apps) -> list:
+    """Unsaved MetricRollup rows rebuilt from the source tables.
+
+    ``apps`` is ``django.apps.apps`` or a migration's historical app
+    registry. Archived conversations count with their ``message_count`` and
+    start at ``first_message_at``; their messages are only in the totals,
+    as they are older than any bucket the dashboard reads.
+    """
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Career = apps.get_model("core", "Career")
+    ConversationSession = apps.get_model("chat", "ConversationSession")
+    MessageLog = apps.get_model("chat", "MessageLog")
+    Rollup = apps.get_model("core", "MetricRollup")
+    try:
+        archives = apps.get_model("chat", "ArchivedConversation").objects.all()
+    except LookupError:  # migration 0008 can run before chat's archive table exists
+        archives = None
+    rows = []
+
+    def add(metric, total, buckets=()):
+        rows.append(Rollup(metric=metric, granularity="total", bucket_start=TOTAL_BUCKET, value=total))
+        rows.extend(Rollup(metric=metric, granularity=granularity, bucket_start=start, value=n)
+                    for granularity, start, n in buckets)
+
+    add(USERS, User.objects.count(), _bucketed(User.objects.all(), "date_joined"))
+    add(CAREERS, Career.objects.count())
+    archived_messages = 0
+    if archives is not None:
+        archived_messages = archives.aggregate(n=Sum("message_count"))["n"] or 0
+    add(MESSAGES, MessageLog.objects.count() + archived_messages, _bucketed(MessageLog.objects.all(), "created_at"))
+
+    # Sessions have no timestamp of their own: a conversation starts with its first message
+    first = dict(MessageLog.objects.values("session").annotate(first=Min("created_at"))
+                 .values_list("session", "first").order_by())
+    if archives is not None:
+        for session_id, at in archives.filter(first_message_at__isnull=False).values_list(
+                "session", "first_message_at"):
+            first[session_id] = min(first.get(session_id, at), at)
+    started = Counter()
+    for at in first.values():
+        started[("hour", hour_bucket(at))] += 1
+        started[("day", day_bucket(at))] += 1
+    add(CONVERSATIONS, ConversationSession.objects.count(), [(g, start, n) for (g, start), n in started.items()])
+    return rows
+
+
+def bucket_sum(metric: str, granularity: str, since: datetime.datetime) -> int:
+    return MetricRollup.objects.filter(metric=metric, granularity=granularity,
+                                       bucket_start__gte=since).aggregate(total=Sum("value"))["total"] or 0
+
+
+def total(metric: str) -> int:
+    row = MetricRollup.objects.filter(metric=metric, granularity="total", bucket_start=TOTAL_BUCKET).first()
+    return row.value if row else 0
+
+
+def dashboard_snapshot() -> dict:
+    """Dashboard numbers from rollup rows (at most ~10 rows read), cached for METRICS_CACHE_TTL."""
+    try:
+        data = cache.get(DASHBOARD_CACHE_KEY)
+    except Exception:
+        data = None
+    if data is not None:
+        return data
+    today = day_bucket(timezone.now())
+    data = {
+        "total_users": total(USERS),
+        "total_careers": total(CAREERS),
+        "conversations_today": bucket_sum(CONVERSATIONS, "day", today),
+        "messages_today": bucket_sum(MESSAGES, "day", today),
+        "new_users_this_week": bucket_sum(USERS, "day", today - datetime.timedelta(days=6)),
+    }
+    try:
+        cache.set(DASHBOARD_CACHE_KEY, data, getattr(settings, "METRICS_CACHE_TTL", 30))
+    except Exception:
+        pass
+    return data
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-19 02:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_add_roadmap_sh_source'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='roadmapitem',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='roadmap_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roadmapitem',
+            index=models.Index(fields=['user', 'step_number', 'id'], name='roadmap_user_step_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-19 02:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    """Same rows as ``manage.py backfill_metrics``, so the dashboard starts from the real counts."""
+    from core.metrics import rollup_rows
+    apps.get_model("core", "MetricRollup").objects.bulk_create(rollup_rows(apps), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_roadmapitem_indexes'),
+        ('chat', '0002_conversationsession_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=64)),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day'), ('total', 'Total')], max_length=8)),
+                ('bucket_start', models.DateTimeField()),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='metricrollup',
+            constraint=models.UniqueConstraint(fields=('metric', 'granularity', 'bucket_start'), name='metric_rollup_bucket_uniq'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# Full-text search index over careers, see core/search.py
+
+import logging
+
+from django.db import DatabaseError, migrations
+
+logger = logging.getLogger(__name__)
+
+SEARCH_COLUMNS = ("name", "description", "skills", "tags", "example_queries")
+
+
+def _flatten(value):
+    if isinstance(value, (list, tuple)):
+        return " ; ".join(_flatten(item) for item in value)
+    if isinstance(value, dict):
+        return str(value.get("name", ""))
+    return str(value or "")
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        schema_editor.execute("""
+            ALTER TABLE core_career ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(tags::text, '')), 'B')
+                || setweight(to_tsvector('simple', coalesce(skills::text, '')), 'B')
+                || setweight(to_tsvector('simple', coalesce(example_queries::text, '')), 'C')
+                || setweight(to_tsvector('simple', coalesce(description, '')), 'D')
+            ) STORED
+        """)
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS core_career_search_gin ON core_career USING GIN (search_vector)"
+        )
+    elif connection.vendor == "sqlite":
+        try:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS core_career_fts USING fts5("
+                + ", ".join(SEARCH_COLUMNS)
+                + ", tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+            )
+        except DatabaseError as e:
+            # Search falls back to unindexed substring matching
+            logger.warning("SQLite has no FTS5, career search will scan the table: %s", e)
+            return
+        Career = apps.get_model("core", "Career")
+        rows = [
+            (career.pk, *(_flatten(getattr(career, column)) for column in SEARCH_COLUMNS))
+            for career in Career.objects.only("id", *SEARCH_COLUMNS).iterator()
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO core_career_fts (rowid, " + ", ".join(SEARCH_COLUMNS) + ") VALUES (%s, %s, %s, %s, %s, %s)",
+                rows,
+            )
+
+
+def drop_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS core_career_search_gin")
+        schema_editor.execute("ALTER TABLE core_career DROP COLUMN IF EXISTS search_vector")
+    elif connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS core_career_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_dataversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -104,6 +104,50 @@ class RoadmapItem(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Default listing (newest first) and its keyset pagination tiebreaker
+            models.Index(fields=['user', '-created_at', '-id'], name='roadmap_user_created_idx'),
+            # Step-ordered listing
+            models.Index(fields=['user', 'step_number', 'id'], name='roadmap_user_step_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.title} ({self.user.username})"
\ No newline at end of file
+        return f"{self.title} ({self.user.username})"
+
+class MetricRollup(models.Model):
+    """Pre-aggregated counter: ``value`` events of ``metric`` in one time bucket.
+
+    Maintained incrementally by core.metrics; "total" rows hold running totals.
+    """
+    GRANULARITY_CHOICES = [
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+        ('total', 'Total'),
+    ]
+
+    metric = models.CharField(max_length=64)
+    granularity = models.CharField(max_length=8, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'granularity', 'bucket_start'], name='metric_rollup_bucket_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.granularity} {self.bucket_start:%Y-%m-%d %H:%M} = {self.value}"
+
+
+class DataVersion(models.Model):
+    """Monotonic version per invalidation topic (e.g. "careers", "mentors").
+
+    Bumped by core.invalidation whenever the topic's data changes; workers
+    poll these rows when Redis pub/sub is unavailable.
+    """
+    topic = models.CharField(max_length=64, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.topic} v{self.version}"
@@ -0,0 +1,229 @@
+# core/search.py
+"""Indexed full-text search over core.Career, for /api/careers/search.
+
+The index covers name, description, skills, tags and example_queries, and
+depends on the database:
+
+* SQLite: an FTS5 virtual table (FTS_TABLE) keyed by the career id, with
+  prefix indexes so type-ahead prefixes are index lookups too. It is
+  kept in step by the Career post_save/post_delete receivers below,
+  which run inside the saving transaction.
+  ``manage.py rebuild_career_search`` refills it from scratch.
+* PostgreSQL: a generated ``tsvector`` column on core_career with a GIN
+  index. Postgres maintains it on every write; nothing to do here.
+* Anything else (MySQL, or SQLite built without FTS5): case-insensitive
+  substring matching, unindexed.
+
+Both indexes are created by migration 0010_career_search. The last word
+of a query is matched as a prefix ("data sci" finds Data Science); earlier
+words must match whole. Results are ranked best first (bm25 with
+COLUMN_WEIGHTS on SQLite, ts_rank_cd over setweight'ed fields on Postgres)
+and paged with keyset cursors over (score, id), like the other listings
+(career_ai/pagination.py).
+
+Finding the matches is an index lookup, but every match is scored to
+rank them. Selective queries take well under a millisecond at 100k
+careers; a word found in most careers costs tens of milliseconds.
+"""
+import logging
+import re
+
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "core_career_fts"
+SEARCH_COLUMNS = ("name", "description", "skills", "tags", "example_queries")
+# bm25 weight of a hit in each column (SQLite); Postgres uses setweight A-D in the same order
+COLUMN_WEIGHTS = {"name": 10.0, "description": 1.0, "skills": 4.0, "tags": 5.0, "example_queries": 2.0}
+# Query words beyond this are ignored
+MAX_TERMS = 8
+# A shorter last word is matched whole: a one-letter prefix would match (and rank) most careers
+MIN_PREFIX = 2
+RESULT_COLUMNS = ("id", "name", "stage", "salary_range")
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+# alias -> True/False, whether the FTS5 table exists on that SQLite database
+_fts_ready = {}
+
+FTS5_CREATE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    + ", ".join(SEARCH_COLUMNS)
+    + ", tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+)
+
+
+class SearchQueryError(ValueError):
+    """The query has no searchable words."""
+
+
+def _flatten(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ; ".join(_flatten(item) for item in value)
+    if isinstance(value, dict):
+        return str(value.get("name", ""))
+    return str(value or "")
+
+
+def document(career) -> tuple:
+    """The indexed text of one Career, in SEARCH_COLUMNS order."""
+    return tuple(_flatten(getattr(career, column)) for column in SEARCH_COLUMNS)
+
+
+def terms(query: str):
+    words = _TOKEN.findall((query or "").lower())[:MAX_TERMS]
+    if not words:
+        raise SearchQueryError("q must contain at least one letter or digit")
+    return words
+
+
+def backend(using: str = "default") -> str:
+    """"fts5", "postgres" or "like" for the database ``using``."""
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        return "postgres"
+    if connection.vendor == "sqlite":
+        ready = _fts_ready.get(using)
+        if ready is None:
+            ready = _fts_ready[using] = FTS_TABLE in connection.introspection.table_names()
+        if ready:
+            return "fts5"
+    return "like"
+
+
+# -- SQLite index maintenance --------------------------------------------
+
+def create_fts5(connection) -> bool:
+    """Create the FTS5 table on ``connection``; False if this SQLite lacks FTS5."""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(FTS5_CREATE)
+    except DatabaseError as e:
+        logger.warning("SQLite has no FTS5, career search will scan the table: %s", e)
+        return False
+    _fts_ready.pop(connection.alias, None)
+    return True
+
+
+def _index_rows(cursor, rows, replace: bool = True):
+    if replace:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk, _ in rows])
+    cursor.executemany(
+        f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) VALUES (%s{', %s' * len(SEARCH_COLUMNS)})",
+        [(pk, *doc) for pk, doc in rows],
+    )
+
+
+def rebuild(using: str = "default", batch_size: int = 1000) -> int:
+    """Refill the FTS5 table from core_career; returns the number of careers indexed (0 if not FTS5)."""
+    from .models import Career
+    if backend(using) != "fts5":
+        return 0
+    count = 0
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        rows = []
+        for career in Career.objects.using(using).only("id", *SEARCH_COLUMNS).iterator(chunk_size=batch_size):
+            rows.append((career.pk, document(career)))
+            if len(rows) >= batch_size:
+                _index_rows(cursor, rows, replace=False)
+                count, rows = count + len(rows), []
+        if rows:
+            _index_rows(cursor, rows, replace=False)
+            count += len(rows)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return count
+
+
+def index_on_save(sender, instance, using, **kwargs):
+    """post_save receiver for Career: (re)index it in the FTS5 table."""
+    if backend(using) == "fts5":
+        with connections[using].cursor() as cursor:
+            _index_rows(cursor, [(instance.pk, document(instance))])
+
+
+def unindex_on_delete(sender, instance, using, **kwargs):
+    """post_delete receiver for Career."""
+    if backend(using) == "fts5":
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [instance.pk])
+
+
+# -- queries -------------------------------------------------------------
+
+def _fts5_query(words) -> str:
+    # Quoted so FTS5 operators in the input are plain words; the last one is a prefix
+    quoted = [f'"{w}"' for w in words]
+    if len(words[-1]) >= MIN_PREFIX:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _tsquery(words) -> str:
+    last = words[-1] + ":*" if len(words[-1]) >= MIN_PREFIX else words[-1]
+    return " & ".join(words[:-1] + [last])
+
+
+def _page_sql(inner: str, after) -> tuple:
+    """Wrap ``inner`` (selecting RESULT_COLUMNS and score) with keyset filtering; returns (sql, params)."""
+    sql = f"SELECT * FROM ({inner}) AS hits"
+    params = []
+    if after is not None:
+        sql += " WHERE score < %s OR (score = %s AND id > %s)"
+        params = [after[0], after[0], after[1]]
+    return sql + " ORDER BY score DESC, id LIMIT %s", params
+
+
+def _raw_search(kind, words, limit, after, using):
+    columns = ", ".join(f"c.{column}" for column in RESULT_COLUMNS)
+    if kind == "fts5":
+        weights = ", ".join(str(COLUMN_WEIGHTS[column]) for column in SEARCH_COLUMNS)
+        inner = (f"SELECT {columns}, -bm25({FTS_TABLE}, {weights}) AS score FROM {FTS_TABLE} "
+                 f"JOIN core_career c ON c.id = {FTS_TABLE}.rowid WHERE {FTS_TABLE} MATCH %s")
+        query = _fts5_query(words)
+    else:
+        inner = (f"SELECT {columns}, ts_rank_cd(c.search_vector, query) AS score "
+                 f"FROM core_career c, to_tsquery('simple', %s) query WHERE c.search_vector @@ query")
+        query = _tsquery(words)
+    sql, params = _page_sql(inner, after)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, [query, *params, limit])
+        names = [col[0] for col in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def _like_search(words, limit, after, using):
+    from django.db.models import Case, FloatField, Q, Value, When
+    from .models import Career
+    matches = Q()
+    for word in words:
+        matches &= Q(*[Q(**{f"{column}__icontains": word}) for column in SEARCH_COLUMNS], _connector=Q.OR)
+    first = words[0]
+    score = Case(
+        When(name__istartswith=first, then=Value(3.0)),
+        When(name__icontains=first, then=Value(2.0)),
+        When(Q(tags__icontains=first) | Q(skills__icontains=first), then=Value(1.0)),
+        default=Value(0.5), output_field=FloatField(),
+    )
+    qs = Career.objects.using(using).filter(matches).annotate(score=score)
+    if after is not None:
+        qs = qs.filter(Q(score__lt=after[0]) | Q(score=after[0], id__gt=after[1]))
+    return list(qs.order_by("-score", "id").values(*RESULT_COLUMNS, "score")[:limit])
+
+
+def search(query: str, limit: int = 20, after=None, using: str = "default"):
+    """Careers matching ``query`` as [{id, name, stage, salary_range, score}], best first.
+
+    ``after`` is the (score, id) of the last result of the previous page.
+    Raises SearchQueryError for a query without words.
+    """
+    words = terms(query)
+    kind = backend(using)
+    if kind == "like":
+        rows = _like_search(words, limit, after, using)
+    else:
+        rows = _raw_search(kind, words, limit, after, using)
+    for row in rows:
+        # Unrounded: the next page's cursor compares against it exactly
+        row["score"] = float(row["score"])
+    return rows
@@ -1,3 +1,274 @@
-from django.test import TestCase
+import datetime
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from career_ai import tiered_cache
+from career_ai.pagination import decode_cursor, encode_cursor
+from chat import views as chat_views
+from chat.models import ArchivedConversation, ConversationSession, MessageLog
+from core import invalidation, metrics, search
+from core.models import Career, DataVersion, MetricRollup, RoadmapItem
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        when = datetime.datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+        self.assertEqual(decode_cursor(encode_cursor((when, 7)), "datetime"), (when, 7))
+        self.assertEqual(decode_cursor(encode_cursor((3, 9)), int), (3, 9))
+        self.assertEqual(decode_cursor(encode_cursor((2.5, 4)), (int, float)), (2.5, 4))
+
+    def test_malformed_cursors_raise_value_error(self):
+        for cursor, key_type in (("not-base64!", None), (encode_cursor(("x",)), None),
+                                 (encode_cursor(("yesterday", 1)), "datetime"),
+                                 (encode_cursor(("3", 1)), int), (encode_cursor((3, "1")), int)):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor, key_type)
+
+
+class RoadmapItemPagingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("pager", password="x")
+        other = User.objects.create_user("other", password="x")
+        created = timezone.now()
+        # Pairs share created_at so the id tie-break is exercised
+        for i in range(7):
+            item = RoadmapItem.objects.create(user=self.user, title=f"step {i}", step_number=7 - i,
+                                              status="completed" if i % 3 == 0 else "pending")
+            RoadmapItem.objects.filter(pk=item.pk).update(created_at=created - datetime.timedelta(minutes=i // 2))
+        RoadmapItem.objects.create(user=other, title="not mine", step_number=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _walk(self, **params):
+        ids, cursor = [], None
+        while True:
+            query = dict(params, limit=2, **({"cursor": cursor} if cursor else {}))
+            response = self.client.get("/api/roadmap/items/", query)
+            self.assertEqual(response.status_code, 200)
+            ids += [int(item["id"]) for item in response.json()["results"]]
+            cursor = response.json()["next"]
+            if cursor is None:
+                return ids
+
+    def test_pages_cover_every_item_once_in_order(self):
+        items = RoadmapItem.objects.filter(user=self.user)
+        self.assertEqual(self._walk(), list(items.order_by("-created_at", "-id").values_list("id", flat=True)))
+        self.assertEqual(self._walk(ordering="step"),
+                         list(items.order_by("step_number", "id").values_list("id", flat=True)))
+        completed = items.filter(status="completed").order_by("-created_at", "-id")
+        self.assertEqual(self._walk(status="completed"), list(completed.values_list("id", flat=True)))
+
+    def test_bad_cursor_is_a_400(self):
+        response = self.client.get("/api/roadmap/items/", {"limit": 2, "cursor": encode_cursor(("soon", 1))})
+        self.assertEqual(response.status_code, 400)
+
+
+class CareerSearchPagingTests(TestCase):
+    def setUp(self):
+        # Several careers tie on score, so pages must split ties by id
+        for i in range(9):
+            Career.objects.create(name=f"Engineer {i}", tags=["engineering"] if i % 2 else [],
+                                  description="An engineering career." if i % 3 else "Builds things.")
+        Career.objects.create(name="Chef", description="Cooks food.")
+
+    def _walk(self, query, limit):
+        ids, cursor = [], None
+        while True:
+            params = {"q": query, "limit": limit, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get("/api/careers/search", params)
+            self.assertEqual(response.status_code, 200)
+            ids += [row["id"] for row in response.json()["results"]]
+            cursor = response.json()["next"]
+            if cursor is None:
+                return ids
+
+    def _assert_pages_match_one_query(self, query):
+        expected = [row["id"] for row in search.search(query, limit=100)]
+        self.assertEqual(len(expected), 9)
+        for limit in (1, 4):
+            self.assertEqual(self._walk(query, limit), expected)
+
+    def test_pages_match_a_single_query(self):
+        self._assert_pages_match_one_query("engin")
+
+    def test_unindexed_fallback_pages_the_same_way(self):
+        with mock.patch.object(search, "backend", return_value="like"):
+            self._assert_pages_match_one_query("engineer")
+
+    def test_bad_input_is_a_400(self):
+        self.assertEqual(self.client.get("/api/careers/search", {"q": "!!"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/careers/search", {"q": "chef", "cursor": encode_cursor(("a", 1))})
+                         .status_code, 400)
+
+
+@mock.patch.object(invalidation, "_redis_publish")
+class PublishCoalescingTests(TestCase):
+    def _versions(self):
+        return dict(DataVersion.objects.values_list("topic", "version"))
+
+    def test_one_bump_per_topic_per_transaction(self, redis_publish):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for i in range(3):
+                    Career.objects.create(name=f"Career {i}")  # each save publishes CAREERS
+                invalidation.publish(invalidation.MENTORS)
+                invalidation.publish(invalidation.CAREERS)
+                self.assertEqual(self._versions(), {})
+        self.assertEqual(self._versions(), {invalidation.CAREERS: 1, invalidation.MENTORS: 1})
+        self.assertEqual(sorted(call.args for call in redis_publish.call_args_list),
+                         [(invalidation.CAREERS, 1), (invalidation.MENTORS, 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidation.publish(invalidation.CAREERS)
+        self.assertEqual(self._versions()[invalidation.CAREERS], 2)
+
+    def test_rolled_back_transaction_bumps_nothing(self, redis_publish):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                invalidation.publish(invalidation.CAREERS)
+                raise RuntimeError
+        self.assertEqual(self._versions(), {})
+        redis_publish.assert_not_called()
+
+    def test_rolled_back_topics_do_not_leak_into_the_next_commit(self, redis_publish):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                invalidation.publish(invalidation.CAREERS)
+                raise RuntimeError
+            with transaction.atomic():
+                invalidation.publish(invalidation.MENTORS)
+        self.assertEqual(self._versions(), {invalidation.MENTORS: 1})
+
+    def test_savepoints(self, redis_publish):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                invalidation.publish(invalidation.MENTORS)
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    invalidation.publish(invalidation.CAREERS)
+                    raise RuntimeError
+                with transaction.atomic():
+                    invalidation.publish(invalidation.INTENT_MODEL)
+                    invalidation.publish(invalidation.MENTORS)
+        # The rolled-back savepoint bumps nothing; a topic published at two levels is bumped once
+        self.assertEqual(self._versions(), {invalidation.MENTORS: 1, invalidation.INTENT_MODEL: 1})
+
+
+class BackfillMetricsTests(TestCase):
+    def test_archived_conversations_are_counted(self):
+        User.objects.create_user("counted", password="x")
+        now = timezone.now()
+        hot = ConversationSession.objects.create(session_id="hot")
+        for i in range(2):
+            MessageLog.objects.create(session=hot, role="user", text="hi", created_at=now)
+        cold = ConversationSession.objects.create(session_id="cold", is_archived=True)
+        ArchivedConversation.objects.create(session=cold, codec="zlib", blob=b"", message_count=5,
+                                            first_message_at=now - datetime.timedelta(days=1),
+                                            last_message_at=now - datetime.timedelta(hours=20))
+        MetricRollup.objects.all().delete()
+        call_command("backfill_metrics", stdout=mock.Mock())
+
+        self.assertEqual((metrics.total(metrics.MESSAGES), metrics.total(metrics.CONVERSATIONS)), (7, 2))
+        self.assertEqual(metrics.bucket_sum(metrics.MESSAGES, "hour", metrics.hour_bucket(now)), 2)
+        week = metrics.day_bucket(now) - datetime.timedelta(days=6)
+        self.assertEqual(metrics.bucket_sum(metrics.CONVERSATIONS, "day", week), 2)
+        self.assertEqual(metrics.bucket_sum(metrics.USERS, "day", week), 1)
+
+
+@mock.patch.object(invalidation, "_redis_publish")
+class DeferredMetricsTests(TransactionTestCase):
+    def test_one_update_per_metric_for_committed_work(self, redis_publish):
+        with mock.patch.object(metrics, "increment") as increment:
+            with metrics.deferred():
+                with transaction.atomic():
+                    careers = [Career.objects.create(name=f"Career {i}") for i in range(3)]
+                    careers[0].delete()
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    Career.objects.create(name="Rolled back")
+                    raise RuntimeError
+                increment.assert_not_called()
+        self.assertEqual([call.args[:2] for call in increment.call_args_list], [(metrics.CAREERS, 2)])
+
+    def test_chat_request_updates_each_metric_once(self, redis_publish):
+        with mock.patch.object(chat_views, "chat_with_bot", return_value={"reply": "hi"}), \
+                mock.patch.object(metrics, "increment", wraps=metrics.increment) as increment:
+            response = self.client.post("/api/chat/ask/", {"session_id": "s1", "message": "hello"},
+                                        content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(call.args[:2] for call in increment.call_args_list),
+                         [(metrics.CONVERSATIONS, 1), (metrics.MESSAGES, 2)])
+        self.assertEqual((metrics.total(metrics.MESSAGES), metrics.total(metrics.CONVERSATIONS)), (2, 1))
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                           "tiered": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(tiered_cache._l2_down_until, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _pair(self, name):
+        """Two caches over one L2, like the same namespace in two processes."""
+        return (tiered_cache.TieredCache(f"test.{name}", alias="tiered"),
+                tiered_cache.TieredCache(f"test.{name}", alias="tiered"))
+
+    def test_hits_come_from_l1_then_l2(self):
+        here, there = self._pair("hits")
+        here.set("k", {"v": 1})
+        self.assertEqual(here.get("k"), {"v": 1})
+        self.assertEqual([there.get("k"), there.get("k")], [{"v": 1}] * 2)
+        self.assertEqual((here.stats()["l1_hits"], there.stats()["l2_hits"], there.stats()["l1_hits"]), (1, 1, 1))
+        self.assertIsNone(there.get("missing"))
+        self.assertEqual(there.stats()["misses"], 1)
+
+    def test_invalidate_all_reaches_other_processes_after_their_l1(self):
+        here, there = self._pair("generation")
+        here.set("k", 1)
+        self.assertEqual(there.get("k"), 1)
+        here.invalidate_all()
+        self.assertIsNone(here.get("k"))
+        self.assertEqual(there.get("k"), 1)  # still within its l1_ttl
+        there.clear_local()
+        self.assertIsNone(there.get("k"))
+
+    def test_concurrent_misses_compute_once(self):
+        cache, _ = self._pair("single-flight")
+        calls = []
+
+        def producer():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_set("k", producer)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((len(calls), results), (1, ["value"] * 8))
+
+    def test_l2_is_skipped_for_a_while_after_an_error(self):
+        cache, _ = self._pair("down")
+        broken = mock.Mock(**{"get.side_effect": ConnectionError, "set.side_effect": ConnectionError})
+        with mock.patch.object(cache, "_l2", return_value=broken):
+            self.assertEqual(cache.get_or_set("k", lambda: 1), 1)
+            self.assertEqual(cache.get_or_set("other", lambda: 2), 2)
+            cache.delete("k")
+        self.assertEqual(broken.get.call_count, 1)
+        self.assertEqual(broken.set.call_count, 0)
+        broken.delete.assert_called_once()
+        self.assertEqual((cache.stats()["l2_errors"], cache.stats()["l2_skipped"]), (1, 4))
+        # L2 is used again once the window has passed
+        tiered_cache._l2_down_until.clear()
+        cache.set("k", 3)
+        self.assertEqual(cache._l2().get(cache.make_key("k"))[0], 3)
@@ -17,8 +17,9 @@ Including another URLconf
 from django.urls import path
 from .views import (
     register_user, login_user,
-    career_roadmap, career_skill_builder, career_jobs, career_mentors, user_profile, dashboard_metrics,
-    trending_careers, roadmap_items, roadmap_item_detail, scrape_roadmap_sh,
+    career_roadmap, career_skill_builder, career_jobs, career_mentors, career_related, career_search, user_profile,
+    dashboard_metrics, trending_careers, roadmap_items, roadmap_items_bulk, roadmap_items_reorder, roadmap_generate, roadmap_item_detail,
+    scrape_roadmap_sh,
 )
 
 urlpatterns = [
@@ -31,7 +32,12 @@ urlpatterns = [
     path("career/skill-builder/", career_skill_builder, name="career_skill_builder"),
     path("career/jobs/", career_jobs, name="career_jobs"),
     path("career/mentors/", career_mentors, name="career_mentors"),
+    path("career/related/", career_related, name="career_related"),
+    path("careers/search", career_search, name="career_search"),
     path("roadmap/items/", roadmap_items, name="roadmap_items"),
+    path("roadmap/items/bulk/", roadmap_items_bulk, name="roadmap_items_bulk"),
+    path("roadmap/items/reorder/", roadmap_items_reorder, name="roadmap_items_reorder"),
+    path("roadmap/generate/", roadmap_generate, name="roadmap_generate"),
     path("roadmap/items/<int:item_id>/", roadmap_item_detail, name="roadmap_item_detail"),
     path("roadmap/scrape/", scrape_roadmap_sh, name="scrape_roadmap_sh"),
 ]
@@ -1,106 +1,195 @@
 # core/views.py
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-import json
-import os
+from django.conf import settings
+from career_ai.fastjson import FastJsonResponse
+from career_ai.pagination import decode_cursor, encode_cursor
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+import logging
 import re
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
+from .metrics import dashboard_snapshot
+from .caching import (
+    cached_read_endpoint, career_response_cache_key, career_responses, content_etag, dataset_version,
+)
 from .models import Career, RoadmapItem
+from . import search
+from chat.services.related_careers import related_careers, version as related_careers_version
+from chat.services.roadmap_generator import STAGES as ROADMAP_STAGES, generate_roadmap
+from chat.utils.admission import shed_llm_overload
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from .serializers import UserSerializer, RegisterSerializer
 
+logger = logging.getLogger(__name__)
+
+
 def home(request):
     """A simple view for the root URL to confirm the API is running."""
-    return JsonResponse({"message": "Welcome to the Career AI API. See /api/... for endpoints."})
+    return FastJsonResponse({"message": "Welcome to the Career AI API. See /api/... for endpoints."})
 
 
 def _get_career_data(request, field_name, json_key):
-    """Helper to fetch a specific field from a career model instance."""
+    """Helper to fetch a specific field from a career model instance.
+
+    Responses are cached per career (in-process, then Redis) under the current
+    dataset version, so a re-import makes every cached entry unreachable.
+    """
     career_name = request.GET.get("career", "")
     if not career_name:
-        return JsonResponse({"error": "career parameter is required"}, status=400)
-    try:
-        career = Career.objects.get(name__iexact=career_name)
-        return JsonResponse({json_key: getattr(career, field_name)})
-    except Career.DoesNotExist:
-        return JsonResponse({"error": "Career not found"}, status=404)
+        return FastJsonResponse({"error": "career parameter is required"}, status=400)
+
+    def load():
+        value = Career.objects.filter(name__iexact=career_name).values_list(field_name, flat=True).first()
+        # Misses are cached too: a career can only appear through an import
+        if value is None:
+            return (404, {"error": "Career not found"})
+        return (200, {json_key: value})
 
+    status, payload = career_responses.get_or_set(career_response_cache_key(field_name, career_name), load,
+                                                  getattr(settings, "CAREER_RESPONSE_CACHE_TTL", 3600))
+    return FastJsonResponse(payload, status=status)
+
+
+def _career_etag(field_name):
+    def etag(request):
+        return content_etag(dataset_version(), field_name, request.GET.get("career", "").lower())
+    return etag
+
+
+TRENDING_CAREERS = [
+    {
+        "id": "1",
+        "title": "Software Engineer", 
+        "growth": 25, 
+        "salary": "$80,000 - $150,000", 
+        "skills": ["JavaScript", "Python", "React", "Node.js"]
+    },
+    {
+        "id": "2",
+        "title": "Data Scientist", 
+        "growth": 35, 
+        "salary": "$90,000 - $160,000", 
+        "skills": ["Python", "Machine Learning", "SQL", "Statistics"]
+    },
+    {
+        "id": "3",
+        "title": "Product Manager", 
+        "growth": 20, 
+        "salary": "$85,000 - $140,000", 
+        "skills": ["Strategy", "Analytics", "Leadership", "Communication"]
+    },
+    {
+        "id": "4",
+        "title": "UX Designer", 
+        "growth": 30, 
+        "salary": "$70,000 - $120,000", 
+        "skills": ["Figma", "User Research", "Prototyping", "Design Thinking"]
+    },
+    {
+        "id": "5",
+        "title": "DevOps Engineer", 
+        "growth": 28, 
+        "salary": "$85,000 - $145,000", 
+        "skills": ["AWS", "Docker", "Kubernetes", "CI/CD"]
+    },
+    {
+        "id": "6",
+        "title": "AI/ML Engineer", 
+        "growth": 40, 
+        "salary": "$95,000 - $170,000", 
+        "skills": ["TensorFlow", "PyTorch", "Python", "Deep Learning"]
+    }
+]
+TRENDING_CAREERS_ETAG = content_etag(TRENDING_CAREERS)
 
+
+@cached_read_endpoint(lambda request: TRENDING_CAREERS_ETAG)
 def trending_careers(request):
     """Public endpoint consumed by the frontend homepage.
 
     Returns a simple list of trending careers with the fields expected by
     the React page: id, title, growth, salary, and skills.
     """
-    careers = [
-        {
-            "id": "1",
-            "title": "Software Engineer", 
-            "growth": 25, 
-            "salary": "$80,000 - $150,000", 
-            "skills": ["JavaScript", "Python", "React", "Node.js"]
-        },
-        {
-            "id": "2",
-            "title": "Data Scientist", 
-            "growth": 35, 
-            "salary": "$90,000 - $160,000", 
-            "skills": ["Python", "Machine Learning", "SQL", "Statistics"]
-        },
-        {
-            "id": "3",
-            "title": "Product Manager", 
-            "growth": 20, 
-            "salary": "$85,000 - $140,000", 
-            "skills": ["Strategy", "Analytics", "Leadership", "Communication"]
-        },
-        {
-            "id": "4",
-            "title": "UX Designer", 
-            "growth": 30, 
-            "salary": "$70,000 - $120,000", 
-            "skills": ["Figma", "User Research", "Prototyping", "Design Thinking"]
-        },
-        {
-            "id": "5",
-            "title": "DevOps Engineer", 
-            "growth": 28, 
-            "salary": "$85,000 - $145,000", 
-            "skills": ["AWS", "Docker", "Kubernetes", "CI/CD"]
-        },
-        {
-            "id": "6",
-            "title": "AI/ML Engineer", 
-            "growth": 40, 
-            "salary": "$95,000 - $170,000", 
-            "skills": ["TensorFlow", "PyTorch", "Python", "Deep Learning"]
-        }
-    ]
-    return JsonResponse(careers, safe=False)
+    return FastJsonResponse(TRENDING_CAREERS, safe=False)
 
 
+@cached_read_endpoint(_career_etag("skills"))
 def career_skill_builder(request):
     """Return skills required for a career."""
     return _get_career_data(request, "skills", "skills")
 
+@cached_read_endpoint(_career_etag("jobs"))
 def career_jobs(request):
     """Return jobs related to a career."""
     return _get_career_data(request, "jobs", "jobs")
 
+@cached_read_endpoint(_career_etag("mentors"))
 def career_mentors(request):
     """Return mentor profiles for a career."""
     return _get_career_data(request, "mentors", "mentors")
 
+@cached_read_endpoint(_career_etag("future_paths"))
 def career_roadmap(request):
     """Return future paths (roadmap) for a career."""
     return _get_career_data(request, "future_paths", "roadmap")
 
+RELATED_CAREERS_MAX = 10
+
+@cached_read_endpoint(lambda request: content_etag(related_careers_version(), request.GET.get("career", "").lower(),
+                                                   request.GET.get("limit", "")))
+def career_related(request):
+    """Return careers similar to a career, most similar first (precomputed, no LLM call).
+
+    Query params: career (required), limit (default 5, max RELATED_CAREERS_MAX).
+    """
+    career_name = request.GET.get("career", "")
+    if not career_name:
+        return FastJsonResponse({"error": "career parameter is required"}, status=400)
+    try:
+        limit = min(max(int(request.GET.get("limit", 5)), 1), RELATED_CAREERS_MAX)
+    except ValueError:
+        return FastJsonResponse({"error": "limit must be an integer"}, status=400)
+    related = related_careers(career_name, limit)
+    if related is None:
+        return FastJsonResponse({"error": "Career not found"}, status=404)
+    return FastJsonResponse({"career": career_name, "related": related})
+
+CAREER_SEARCH_MAX = 50
+
+@cached_read_endpoint(lambda request: content_etag(dataset_version(), request.GET.get("q", ""),
+                                                   request.GET.get("limit", ""), request.GET.get("cursor", "")))
+def career_search(request):
+    """Full-text search over careers, best match first (see core/search.py).
+
+    Query params: q (required; its last word matches as a prefix, for
+    type-ahead), limit (default 20, max CAREER_SEARCH_MAX), cursor (the
+    ``next`` of the previous page).
+    """
+    query = request.GET.get("q", "")
+    try:
+        limit = min(max(int(request.GET.get("limit", 20)), 1), CAREER_SEARCH_MAX)
+    except ValueError:
+        return FastJsonResponse({"error": "limit must be an integer"}, status=400)
+    after = None
+    if request.GET.get("cursor"):
+        try:
+            after = decode_cursor(request.GET["cursor"], (int, float))
+        except ValueError as e:
+            return FastJsonResponse({"error": str(e)}, status=400)
+    try:
+        results = search.search(query, limit + 1, after)
+    except search.SearchQueryError as e:
+        return FastJsonResponse({"error": str(e)}, status=400)
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        next_cursor = encode_cursor((results[-1]["score"], results[-1]["id"]))
+    return FastJsonResponse({"query": query, "results": results, "next": next_cursor})
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -120,20 +209,20 @@ def login_user(request):
         password = request.data.get('password', '').strip()
 
         if not email or not password:
-            return JsonResponse({"error": "email and password are required"}, status=400)
+            return FastJsonResponse({"error": "email and password are required"}, status=400)
 
         # Authenticate using email as the username
         user = authenticate(username=email, password=password)
         
         if user:
             login(request, user)
-            return JsonResponse({"message": "Login successful", "user_id": user.id})
+            return FastJsonResponse({"message": "Login successful", "user_id": user.id})
         
-        return JsonResponse({"error": "Invalid credentials"}, status=400)
+        return FastJsonResponse({"error": "Invalid credentials"}, status=400)
     except Exception as e:
         # Log the exception for debugging purposes
-        print(f"Login error: {e}")
-        return JsonResponse({"error": "An unexpected error occurred during login."}, status=500)
+        logger.warning("Login error: %s", e)
+        return FastJsonResponse({"error": "An unexpected error occurred during login."}, status=500)
 
 @api_view(['GET', 'PATCH'])
 @permission_classes([IsAuthenticated])
@@ -152,39 +241,151 @@ def user_profile(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_metrics(request):
-    # Dummy data for now
-    data = {
-        'total_users': User.objects.count(),
-        'total_careers': Career.objects.count(),
-        'conversations_today': 15,
-        'new_users_this_week': 5,
-    }
-    return Response(data)
+    """Dashboard counters, read from the materialized rollups in core.metrics."""
+    return Response(dashboard_snapshot())
 
 
 # Roadmap API Endpoints
+
+# API (camelCase) name -> RoadmapItem field, for the fields a client may write
+ROADMAP_ITEM_FIELDS = {
+    'title': 'title',
+    'description': 'description',
+    'status': 'status',
+    'priority': 'priority',
+    'estimatedTime': 'estimated_time',
+    'skills': 'skills',
+    'resources': 'resources',
+    'source': 'source',
+    'stepNumber': 'step_number',
+}
+ROADMAP_BULK_MAX_ITEMS = 100
+ROADMAP_GENERATE_MAX_CAREER = 120
+ROADMAP_GENERATE_MAX_GOAL = 300
+ROADMAP_PAGE_MAX = 200
+# Model columns read for serialization (via .values(), no model instances)
+ROADMAP_ITEM_COLUMNS = ('id', 'created_at', *ROADMAP_ITEM_FIELDS.values())
+# ?ordering= -> (ORDER BY columns, cursor columns); both end in id so keysets are unique
+ROADMAP_ORDERINGS = {
+    'created': (('-created_at', '-id'), ('created_at', 'id')),
+    'step': (('step_number', 'id'), ('step_number', 'id')),
+}
+
+
+def _roadmap_item_dict(row):
+    """Serialize a RoadmapItem ``.values()`` row (or a model instance) to the API shape."""
+    if isinstance(row, RoadmapItem):
+        row = {column: getattr(row, column) for column in ROADMAP_ITEM_COLUMNS}
+    data = {'id': str(row['id'])}
+    data.update((key, row[field]) for key, field in ROADMAP_ITEM_FIELDS.items())
+    data['createdAt'] = row['created_at'].isoformat()
+    return data
+
+
+def _roadmap_items_payload(user):
+    """All roadmap items of ``user``, serialized, in one query."""
+    return [_roadmap_item_dict(row) for row in RoadmapItem.objects.filter(user=user).values(*ROADMAP_ITEM_COLUMNS)]
+
+
+def _roadmap_items_page(request):
+    """Filtered, keyset-paginated listing: {"results": [...], "next": cursor or None}.
+
+    Query params: limit (required to paginate), cursor, ordering ("created"
+    newest first, or "step"), status, priority. Filters and the keyset
+    predicate are applied in SQL and served by the (user, ...) indexes.
+    """
+    params = request.query_params
+    ordering = params.get('ordering', 'created')
+    if ordering not in ROADMAP_ORDERINGS:
+        return Response({'error': f"ordering must be one of {', '.join(ROADMAP_ORDERINGS)}"}, status=400)
+    order_by, (key_column, _) = ROADMAP_ORDERINGS[ordering]
+
+    qs = RoadmapItem.objects.filter(user=request.user)
+    for param, choices in (('status', RoadmapItem.STATUS_CHOICES), ('priority', RoadmapItem.PRIORITY_CHOICES)):
+        values = [v for v in params.get(param, '').split(',') if v]
+        if values:
+            valid = {choice for choice, _ in choices}
+            if not set(values) <= valid:
+                return Response({'error': f"{param} must be one of {', '.join(sorted(valid))}"}, status=400)
+            qs = qs.filter(**{f'{param}__in': values})
+
+    limit = params.get('limit')
+    try:
+        limit = min(max(int(limit), 1), ROADMAP_PAGE_MAX) if limit is not None else None
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=400)
+    cursor = params.get('cursor')
+    if cursor:
+        try:
+            key, last_id = decode_cursor(cursor, 'datetime' if ordering == 'created' else int)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        after = 'lt' if ordering == 'created' else 'gt'
+        qs = qs.filter(Q(**{f'{key_column}__{after}': key}) | Q(**{key_column: key, f'id__{after}': last_id}))
+
+    rows = list(qs.order_by(*order_by).values(*ROADMAP_ITEM_COLUMNS)[:limit + 1 if limit else None])
+    if limit is None:
+        return Response([_roadmap_item_dict(row) for row in rows])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor((rows[-1][key_column], rows[-1]['id']))
+    return Response({'results': [_roadmap_item_dict(row) for row in rows], 'next': next_cursor})
+
+
+def _bulk_items(data, key):
+    """Return the list under ``key`` (or the body itself if it is a list), or an error string."""
+    items = data if isinstance(data, list) else data.get(key) if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return None, f"'{key}' must be a non-empty list"
+    if len(items) > ROADMAP_BULK_MAX_ITEMS:
+        return None, f"At most {ROADMAP_BULK_MAX_ITEMS} items per request"
+    return items, None
+
+
+def _create_roadmap_items(user, entries):
+    """Insert API-shaped item dicts for ``user`` with one bulk_create.
+
+    Entries without a stepNumber are numbered after the existing items.
+    The returned objects only have primary keys on backends that return
+    them from bulk inserts; re-read the items to serialize them.
+    """
+    next_step = None
+    objs = []
+    for entry in entries:
+        step_number = entry.get('stepNumber')
+        if step_number is None:
+            if next_step is None:
+                next_step = RoadmapItem.objects.filter(user=user).count() + 1
+            step_number = next_step
+            next_step += 1
+        objs.append(RoadmapItem(
+            user=user,
+            title=entry.get('title', ''),
+            description=entry.get('description', ''),
+            status=entry.get('status', 'pending'),
+            priority=entry.get('priority', 'medium'),
+            estimated_time=entry.get('estimatedTime', ''),
+            skills=entry.get('skills', []),
+            resources=entry.get('resources', []),
+            source=entry.get('source', 'user-added'),
+            step_number=step_number,
+        ))
+    return RoadmapItem.objects.bulk_create(objs)
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([AllowAny])  # Allow unauthenticated access, but prefer authenticated
 def roadmap_items(request):
-    """Get all roadmap items for the authenticated user or create a new one."""
+    """Get all roadmap items for the authenticated user or create a new one.
+
+    GET returns a plain list; with ``?limit=`` it returns one keyset page
+    ({"results", "next"}). See ``_roadmap_items_page`` for the filters.
+    """
     if request.method == 'GET':
         # If user is authenticated, return their items from database
         if request.user.is_authenticated:
-            items = RoadmapItem.objects.filter(user=request.user)
-            data = [{
-                'id': str(item.id),
-                'title': item.title,
-                'description': item.description,
-                'status': item.status,
-                'priority': item.priority,
-                'estimatedTime': item.estimated_time,
-                'skills': item.skills,
-                'resources': item.resources,
-                'source': item.source,
-                'stepNumber': item.step_number,
-                'createdAt': item.created_at.isoformat(),
-            } for item in items]
-            return Response(data)
+            return _roadmap_items_page(request)
         else:
             # Return empty list for unauthenticated users (they'll use localStorage)
             return Response([])
@@ -213,31 +414,132 @@ def roadmap_items(request):
             source=data.get('source', 'user-added'),
             step_number=step_number,
         )
-        return Response({
-            'id': str(item.id),
-            'title': item.title,
-            'description': item.description,
-            'status': item.status,
-            'priority': item.priority,
-            'estimatedTime': item.estimated_time,
-            'skills': item.skills,
-            'resources': item.resources,
-            'source': item.source,
-            'stepNumber': item.step_number,
-            'createdAt': item.created_at.isoformat(),
-        }, status=201)
+        return Response(_roadmap_item_dict(item), status=201)
+
+
+@api_view(['POST', 'PATCH'])
+@permission_classes([IsAuthenticated])
+def roadmap_items_bulk(request):
+    """Create (POST) or update (PATCH) many roadmap items at once.
+
+    POST {"items": [{title, description, ...}, ...]} inserts all items with a
+    single bulk_create; items without a stepNumber are numbered after the
+    existing ones. PATCH {"items": [{"id": ..., <fields to change>}, ...]}
+    applies all changes with a single bulk_update. Both return the user's
+    full item list.
+    """
+    items, error = _bulk_items(request.data, 'items')
+    if error:
+        return Response({'error': error}, status=400)
+    if not all(isinstance(entry, dict) for entry in items):
+        return Response({'error': 'Each item must be an object'}, status=400)
+
+    if request.method == 'POST':
+        _create_roadmap_items(request.user, items)
+        return Response(_roadmap_items_payload(request.user), status=201)
+
+    # PATCH
+    ids = [entry.get('id') for entry in items]
+    try:
+        ids = [int(item_id) for item_id in ids]
+    except (TypeError, ValueError):
+        return Response({'error': 'Each item needs a numeric id'}, status=400)
+    with transaction.atomic():
+        existing = RoadmapItem.objects.select_for_update().filter(user=request.user).in_bulk(ids)
+        missing = [str(item_id) for item_id in ids if item_id not in existing]
+        if missing:
+            return Response({'error': 'Roadmap items not found', 'ids': missing}, status=404)
+        now = timezone.now()
+        fields = {'updated_at'}
+        for item_id, entry in zip(ids, items):
+            item = existing[item_id]
+            for key, field in ROADMAP_ITEM_FIELDS.items():
+                if key in entry and key != 'source':
+                    setattr(item, field, entry[key])
+                    fields.add(field)
+            item.updated_at = now  # bulk_update() bypasses auto_now
+        RoadmapItem.objects.bulk_update(existing.values(), sorted(fields))
+    return Response(_roadmap_items_payload(request.user))
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def roadmap_items_reorder(request):
+    """Renumber the user's roadmap steps in one transaction.
+
+    Body: {"order": [id, id, ...]}. Listed items get step numbers 1..n in
+    that order; any items not listed keep their relative order after them.
+    Returns the user's full item list.
+    """
+    order, error = _bulk_items(request.data, 'order')
+    if error:
+        return Response({'error': error}, status=400)
+    try:
+        order = [int(item_id) for item_id in order]
+    except (TypeError, ValueError):
+        return Response({'error': "'order' must contain item ids"}, status=400)
+    if len(set(order)) != len(order):
+        return Response({'error': "'order' contains duplicate ids"}, status=400)
+
+    with transaction.atomic():
+        items = {item.id: item for item in RoadmapItem.objects.select_for_update().filter(user=request.user)}
+        missing = [str(item_id) for item_id in order if item_id not in items]
+        if missing:
+            return Response({'error': 'Roadmap items not found', 'ids': missing}, status=404)
+        listed = set(order)
+        rest = sorted((item for item in items.values() if item.id not in listed),
+                      key=lambda item: (item.step_number, item.created_at))
+        now = timezone.now()
+        changed = []
+        for position, item in enumerate([items[item_id] for item_id in order] + rest, start=1):
+            if item.step_number != position:
+                item.step_number = position
+                item.updated_at = now
+                changed.append(item)
+        if changed:
+            RoadmapItem.objects.bulk_update(changed, ['step_number', 'updated_at'])
+    return Response(_roadmap_items_payload(request.user))
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@shed_llm_overload
+def roadmap_generate(request):
+    """Generate a step-by-step roadmap for a career in one round-trip.
+
+    Body: {"career": "...", "goal": "...", "stage": "10th|12th|UG|PG",
+    "save": false}. Returns {"title", "items", "cached", "source"} where
+    items are ready for /api/roadmap/items/bulk/. With "save": true an
+    authenticated user's items are stored right away and returned with ids.
+    """
+    data = request.data if isinstance(request.data, dict) else {}
+    career = str(data.get('career') or data.get('message') or '').strip()
+    goal = str(data.get('goal') or '').strip()
+    stage = str(data.get('stage') or '').strip()
+    if not career:
+        return Response({'error': 'career is required'}, status=400)
+    if len(career) > ROADMAP_GENERATE_MAX_CAREER or len(goal) > ROADMAP_GENERATE_MAX_GOAL:
+        return Response({'error': f'career is limited to {ROADMAP_GENERATE_MAX_CAREER} and goal to '
+                                  f'{ROADMAP_GENERATE_MAX_GOAL} characters'}, status=400)
+    if stage and stage not in ROADMAP_STAGES:
+        return Response({'error': f"stage must be one of {', '.join(ROADMAP_STAGES)}"}, status=400)
+
+    roadmap = generate_roadmap(career, goal, stage)
+    if data.get('save') and request.user.is_authenticated:
+        with transaction.atomic():
+            last_id = RoadmapItem.objects.filter(user=request.user).aggregate(last=Max('id'))['last'] or 0
+            _create_roadmap_items(request.user, [dict(item, stepNumber=None) for item in roadmap['items']])
+            # Re-read: bulk_create leaves pk unset on backends that cannot return it (MySQL)
+            saved = RoadmapItem.objects.filter(user=request.user, id__gt=last_id).order_by('step_number', 'id')
+            items = [_roadmap_item_dict(row) for row in saved.values(*ROADMAP_ITEM_COLUMNS)]
+        roadmap = dict(roadmap, items=items, saved=True)
+    return Response(roadmap)
 
 
 @api_view(['GET', 'PATCH', 'DELETE'])
 @permission_classes([AllowAny])  # Allow unauthenticated access for GET, but require auth for modifications
 def roadmap_item_detail(request, item_id):
     """Get, update, or delete a specific roadmap item."""
-    # #region agent log
-    log_path = r'c:\Users\kamis\OneDrive\Desktop\career-ai\.cursor\debug.log'
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-    log_entry = json.dumps({'location': 'core/views.py:243', 'message': 'roadmap_item_detail entry', 'data': {'item_id': item_id, 'method': request.method, 'has_auth_header': bool(auth_header), 'auth_header_prefix': auth_header[:30] if auth_header else 'none', 'user_id': request.user.id if hasattr(request.user, 'id') else None, 'is_authenticated': request.user.is_authenticated, 'user_type': str(type(request.user))}, 'timestamp': int(__import__('time').time() * 1000), 'sessionId': 'debug-session', 'runId': 'run1', 'hypothesisId': 'B'}) + '\n'
-    with open(log_path, 'a', encoding='utf-8') as f: f.write(log_entry)
-    # #endregion
     try:
         # For authenticated users, filter by user. For unauthenticated, allow any (they shouldn't access this anyway)
         if request.user.is_authenticated:
@@ -251,31 +553,12 @@ def roadmap_item_detail(request, item_id):
         return Response({'error': 'Roadmap item not found'}, status=404)
     
     if request.method == 'GET':
-        return Response({
-            'id': str(item.id),
-            'title': item.title,
-            'description': item.description,
-            'status': item.status,
-            'priority': item.priority,
-            'estimatedTime': item.estimated_time,
-            'skills': item.skills,
-            'resources': item.resources,
-            'source': item.source,
-            'createdAt': item.created_at.isoformat(),
-        })
+        return Response(_roadmap_item_dict(item))
     
     elif request.method == 'PATCH':
-        # #region agent log
-        log_path = r'c:\Users\kamis\OneDrive\Desktop\career-ai\.cursor\debug.log'
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        log_entry = json.dumps({'location': 'core/views.py:271', 'message': 'PATCH method - auth check', 'data': {'item_id': item_id, 'is_authenticated': request.user.is_authenticated, 'user_id': request.user.id if hasattr(request.user, 'id') else None, 'has_auth_header': bool(auth_header), 'auth_header_prefix': auth_header[:30] if auth_header else 'none'}, 'timestamp': int(__import__('time').time() * 1000), 'sessionId': 'debug-session', 'runId': 'run1', 'hypothesisId': 'B'}) + '\n'
-        with open(log_path, 'a', encoding='utf-8') as f: f.write(log_entry)
-        # #endregion
         if not request.user.is_authenticated:
-            # #region agent log
-            log_entry = json.dumps({'location': 'core/views.py:272', 'message': 'Returning 401 - not authenticated', 'data': {'item_id': item_id, 'auth_header': auth_header[:50] if auth_header else 'none'}, 'timestamp': int(__import__('time').time() * 1000), 'sessionId': 'debug-session', 'runId': 'run1', 'hypothesisId': 'B'}) + '\n'
-            with open(log_path, 'a', encoding='utf-8') as f: f.write(log_entry)
-            # #endregion
+            logger.debug("Roadmap item %s PATCH rejected: not authenticated (auth header: %s)",
+                         item_id, bool(request.META.get('HTTP_AUTHORIZATION')))
             return Response({'error': 'Authentication required'}, status=401)
         
         data = request.data
@@ -296,19 +579,7 @@ def roadmap_item_detail(request, item_id):
         if 'stepNumber' in data:
             item.step_number = data['stepNumber']
         item.save()
-        return Response({
-            'id': str(item.id),
-            'title': item.title,
-            'description': item.description,
-            'status': item.status,
-            'priority': item.priority,
-            'estimatedTime': item.estimated_time,
-            'skills': item.skills,
-            'resources': item.resources,
-            'source': item.source,
-            'stepNumber': item.step_number,
-            'createdAt': item.created_at.isoformat(),
-        })
+        return Response(_roadmap_item_dict(item))
     
     elif request.method == 'DELETE':
         if not request.user.is_authenticated:
@@ -322,6 +593,10 @@ def roadmap_item_detail(request, item_id):
 @permission_classes([AllowAny])
 def scrape_roadmap_sh(request):
     """Scrape roadmap from roadmap.sh and return structured roadmap items."""
+    # Imported here: only this endpoint needs an HTML parser and an HTTP client
+    import requests
+    from bs4 import BeautifulSoup
+
     try:
         data = request.data
         roadmap_url = data.get('url', '').strip()
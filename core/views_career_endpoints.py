@@ -1,15 +1,18 @@
 # core/views_career_endpoints.py
-from django.http import JsonResponse
+from career_ai.fastjson import FastJsonResponse
 from .models import Career  # or CareerPath depending on your model name
 from django.apps import apps
-from chat.utils.data_loader import load_dataset
+from chat.utils.data_loader import get_career_data, get_career_index
 
 def _find_career_by_name(name: str, dataset=None):
     nm = (name or "").strip().lower()
     if not nm:
         return None
     if dataset is None:
-        dataset = load_dataset()
+        exact = get_career_index().get(nm)
+        if exact is not None:
+            return exact
+        dataset = get_career_data()
     for c in dataset:
         if c.get("name","").strip().lower() == nm:
             return c
@@ -23,26 +26,26 @@ def career_roadmap(request):
     career_name = request.GET.get("career","")
     c = _find_career_by_name(career_name)
     if not c:
-        return JsonResponse({"error": "Career not found"}, status=404)
-    return JsonResponse({"roadmap": c.get("future_paths", [])})
+        return FastJsonResponse({"error": "Career not found"}, status=404)
+    return FastJsonResponse({"roadmap": c.get("future_paths", [])})
 
 def career_skill_builder(request):
     career_name = request.GET.get("career","")
     c = _find_career_by_name(career_name)
     if not c:
-        return JsonResponse({"error": "Career not found"}, status=404)
-    return JsonResponse({"skills": c.get("skills", [])})
+        return FastJsonResponse({"error": "Career not found"}, status=404)
+    return FastJsonResponse({"skills": c.get("skills", [])})
 
 def career_jobs(request):
     career_name = request.GET.get("career","")
     c = _find_career_by_name(career_name)
     if not c:
-        return JsonResponse({"error": "Career not found"}, status=404)
-    return JsonResponse({"jobs": c.get("jobs", [])})
+        return FastJsonResponse({"error": "Career not found"}, status=404)
+    return FastJsonResponse({"jobs": c.get("jobs", [])})
 
 def career_mentors(request):
     career_name = request.GET.get("career","")
     c = _find_career_by_name(career_name)
     if not c:
-        return JsonResponse({"error": "Career not found"}, status=404)
-    return JsonResponse({"mentors": c.get("mentors", [])})
+        return FastJsonResponse({"error": "Career not found"}, status=404)
+    return FastJsonResponse({"mentors": c.get("mentors", [])})
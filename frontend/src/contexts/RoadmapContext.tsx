@@ -25,6 +25,8 @@ interface RoadmapContextType {
   isLoading: boolean;
   error: string | null;
   addRoadmapItem: (item: Omit<RoadmapItem, 'id' | 'createdAt'>) => void;
+  addRoadmapItems: (items: Omit<RoadmapItem, 'id' | 'createdAt'>[]) => Promise<void>;
+  reorderRoadmapItems: (orderedIds: string[]) => Promise<void>;
   updateRoadmapItem: (id: string, updates: Partial<RoadmapItem>) => void;
   deleteRoadmapItem: (id: string) => void;
   generateRoadmapFromChat: (message: string) => void;
@@ -138,6 +140,70 @@ export const RoadmapProvider = ({ children }: { children: ReactNode }) => {
     }
   };
 
+  // Save many items with a single request (roadmap.sh import, AI generation)
+  const addRoadmapItems = async (items: Omit<RoadmapItem, 'id' | 'createdAt'>[]) => {
+    if (items.length === 0) return;
+    setIsLoading(true);
+    setError(null);
+    try {
+      const response = await api.post('/api/roadmap/items/bulk/', {
+        items: items.map(item => ({
+          title: item.title,
+          description: item.description,
+          status: item.status,
+          priority: item.priority,
+          estimatedTime: item.estimatedTime,
+          skills: item.skills,
+          resources: item.resources.map((r: any) =>
+            typeof r === 'string' ? r : (r.url ? { name: r.name, url: r.url } : r.name)
+          ),
+          source: item.source,
+          stepNumber: item.stepNumber,
+        })),
+      });
+      setRoadmapItems(response.data.map((item: any) => ({ ...item, id: item.id.toString() })));
+    } catch (e: any) {
+      const newItems: RoadmapItem[] = items.map(item => ({
+        ...item,
+        id: `${Date.now()}-${Math.random()}`,
+        createdAt: new Date().toISOString(),
+      }));
+      setRoadmapItems(prev => {
+        const updatedItems = [...prev, ...newItems];
+        localStorage.setItem('career-roadmap', JSON.stringify(updatedItems));
+        return updatedItems;
+      });
+      // 401/403 just means the user is not logged in - localStorage is expected then
+      if (e.response?.status !== 401 && e.response?.status !== 403) {
+        setError('Failed to save to server, saved locally');
+        console.error('Error adding roadmap items:', e);
+      }
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  const reorderRoadmapItems = async (orderedIds: string[]) => {
+    const position = new Map(orderedIds.map((id, index) => [id, index + 1]));
+    const applyOrder = (items: RoadmapItem[]) =>
+      items.map(item => position.has(item.id) ? { ...item, stepNumber: position.get(item.id) } : item);
+    setError(null);
+    try {
+      const response = await api.post('/api/roadmap/items/reorder/', { order: orderedIds });
+      setRoadmapItems(response.data.map((item: any) => ({ ...item, id: item.id.toString() })));
+    } catch (e: any) {
+      setRoadmapItems(prev => {
+        const updatedItems = applyOrder(prev);
+        localStorage.setItem('career-roadmap', JSON.stringify(updatedItems));
+        return updatedItems;
+      });
+      if (e.response?.status !== 401 && e.response?.status !== 403) {
+        setError('Failed to reorder on server, reordered locally');
+        console.error('Error reordering roadmap items:', e);
+      }
+    }
+  };
+
   const updateRoadmapItem = async (id: string, updates: Partial<RoadmapItem>) => {
     setIsLoading(true);
     setError(null);
@@ -205,183 +271,17 @@ export const RoadmapProvider = ({ children }: { children: ReactNode }) => {
   const generateRoadmapFromChat = async (message: string) => {
     setIsLoading(true);
     setError(null);
-    console.log('[DEBUG] generateRoadmapFromChat called with message:', message);
     try {
-      // Call the chatbot API to generate roadmap suggestions
-      const response = await api.post('/api/chat/ask/', {
-        session_id: 'roadmap-generation',
-        message: `You are a career advisor. Generate a detailed step-by-step career roadmap for: ${message}.
-
-IMPORTANT: You MUST respond ONLY with the roadmap in this exact format. Do NOT ask questions or provide commentary. Start directly with the roadmap.
-
-Required format:
-TITLE: [Career Path Title]
-
-STEP 1: [Step Title] | [2-3 sentence description] | [Time estimate like "2-3 months"] | [Skills: skill1, skill2, skill3] | [Resources: Resource1, Resource2]
-STEP 2: [Step Title] | [2-3 sentence description] | [Time estimate] | [Skills: skill1, skill2] | [Resources: Resource1, Resource2]
-STEP 3: [Step Title] | [2-3 sentence description] | [Time estimate] | [Skills: skill1, skill2] | [Resources: Resource1, Resource2]
-STEP 4: [Step Title] | [2-3 sentence description] | [Time estimate] | [Skills: skill1, skill2] | [Resources: Resource1, Resource2]
-STEP 5: [Step Title] | [2-3 sentence description] | [Time estimate] | [Skills: skill1, skill2] | [Resources: Resource1, Resource2]
-
-Create 4-6 sequential steps. Each step must build on the previous one. Start immediately with "TITLE:" - do not include any introduction or questions.`
-      });
-      
-      // The chat endpoint returns {type: "bot", text: reply}
-      const aiResponse = response.data.text || response.data.reply || '';
-      console.log('[DEBUG] AI response received:', { 
-        responseData: response.data,
-        hasText: !!response.data.text, 
-        hasReply: !!response.data.reply,
-        responseLength: aiResponse.length,
-        preview: aiResponse.substring(0, 500),
-        fullResponse: aiResponse
-      });
-      
-      
-      // Parse the AI response for step-by-step roadmap
-      const titleMatch = aiResponse.match(/TITLE:\s*(.+?)(?:\n|$)/i);
-      // Look for STEP 1:, STEP 2: format OR STEPS: format - be more flexible
-      let stepsMatch = aiResponse.match(/STEP\s*\d+:.+?(?=\nSTEP\s*\d+:|$)/gis);
-      if (!stepsMatch) {
-        stepsMatch = aiResponse.match(/STEPS?:\s*(.+?)(?:\n\n|\nSUMMARY|$)/is);
-      }
-      
-      let title = `Career Path: ${message}`;
-      if (titleMatch) {
-        title = titleMatch[1].trim();
-      }
-      
-      const roadmapItems: Omit<RoadmapItem, 'id' | 'createdAt'>[] = [];
-      console.log('[DEBUG] Parsing attempt:', { 
-        hasTitleMatch: !!titleMatch,
-        hasStepsMatch: !!stepsMatch,
-        stepsMatchLength: stepsMatch?.length || 0
-      });
-      
-      if (stepsMatch && stepsMatch.length > 0) {
-        // Handle both array of matches and single match
-        const stepsArray = Array.isArray(stepsMatch) ? stepsMatch : [stepsMatch[1] || stepsMatch[0]];
-        console.log('[DEBUG] Steps array:', stepsArray.length, stepsArray.map(s => s.substring(0, 50)));
-        
-        stepsArray.forEach((step: string, index: number) => {
-          // Try to parse structured format: title|description|time|skills|resources
-          if (step.includes('|')) {
-            const parts = step.split('|').map(p => p.trim());
-            if (parts.length >= 3) {
-              // Remove STEP N: prefix if present
-              const titlePart = parts[0].replace(/^STEP\s*\d+:\s*/i, '').trim();
-              const skillsText = parts[3] || '';
-              const skills = skillsText.replace(/^skills?:\s*/i, '').split(',').map(s => s.trim()).filter(Boolean);
-              const resourcesText = parts[4] || '';
-              // Parse resources - can be "name1:url1, name2:url2" or just "name1, name2"
-              const resources = resourcesText.replace(/^resources?:\s*/i, '').split(',').map(r => {
-                const trimmed = r.trim();
-                if (trimmed.includes(':')) {
-                  const [name, url] = trimmed.split(':').map(s => s.trim());
-                  return { name, url: url || '' };
-                }
-                return { name: trimmed, url: '' };
-              }).filter(r => r.name);
-              
-              roadmapItems.push({
-                title: titlePart || `Step ${index + 1}`,
-                description: parts[1] || step.substring(0, 200),
-                status: 'pending',
-                priority: index === 0 ? 'high' : index < 3 ? 'medium' : 'low',
-                estimatedTime: parts[2] || '2-4 weeks',
-                skills: skills,
-                resources: resources.length > 0 ? resources : [],
-                source: 'ai-generated',
-                stepNumber: index + 1
-              });
-            }
-          } else {
-            // Simple format - extract info from text
-            // Handle STEP N: format or numbered list format
-            const stepTitleMatch = step.match(/STEP\s*\d+:\s*(.+?)(?:\n|$)/i) || step.match(/^\d+\.\s*(.+?)(?:\n|$)/);
-            const stepTitle = stepTitleMatch?.[1]?.trim() || step.split('\n')[0].substring(0, 60) || `Step ${index + 1}`;
-            const description = step.replace(/^(STEP\s*\d+:|^\d+\.)\s*/i, '').trim();
-            const skills = description.match(/skills?[:\s]+([^.]+)/i)?.[1]?.split(',').map(s => s.trim()).filter(Boolean) || [];
-            const timeMatch = description.match(/(\d+\s*(?:weeks?|months?|years?))/i);
-            
-            roadmapItems.push({
-              title: stepTitle,
-              description: description.substring(0, 500),
-              status: 'pending',
-              priority: index === 0 ? 'high' : index < 3 ? 'medium' : 'low',
-              estimatedTime: timeMatch ? timeMatch[1] : '2-4 weeks',
-              skills: skills.length > 0 ? skills : [],
-              resources: [],
-              source: 'ai-generated',
-              stepNumber: index + 1
-            });
-          }
-        });
-      }
-      
-      // If parsing failed, create step-by-step items from the response
-      if (roadmapItems.length === 0) {
-        // Try to split by paragraphs or numbered lists
-        const paragraphs = aiResponse.split(/\n\n+/).filter(p => p.trim().length > 20);
-        if (paragraphs.length > 1) {
-          paragraphs.forEach((para: string, index: number) => {
-            const skills = para.match(/skills?[:\s]+([^.]+)/i)?.[1]?.split(',').map(s => s.trim()).filter(Boolean) || [];
-            const timeMatch = para.match(/(\d+\s*(?:weeks?|months?|years?))/i);
-            const titleMatch = para.match(/^(.{0,60})/)?.[1] || `Step ${index + 1}`;
-            
-            roadmapItems.push({
-              title: titleMatch,
-              description: para.substring(0, 500),
-              status: 'pending',
-              priority: index === 0 ? 'high' : index < 3 ? 'medium' : 'low',
-              estimatedTime: timeMatch ? timeMatch[1] : '2-4 weeks',
-              skills: skills.length > 0 ? skills : [],
-              resources: [],
-              source: 'ai-generated',
-              stepNumber: index + 1
-            });
-          });
-        } else {
-          // Single item fallback
-          const skills = aiResponse.match(/skills?[:\s]+([^.]+)/i)?.[1]?.split(',').map(s => s.trim()).filter(Boolean) || [];
-          const timeMatch = aiResponse.match(/(\d+\s*(?:weeks?|months?|years?))/i);
-          
-          roadmapItems.push({
-            title: title,
-            description: aiResponse.substring(0, 500),
-            status: 'pending',
-            priority: 'high',
-            estimatedTime: timeMatch ? timeMatch[1] : '3-6 months',
-            skills: skills.length > 0 ? skills : ['Communication', 'Problem Solving', 'Technical Skills'],
-            resources: [{ name: 'Online Courses', url: '' }, { name: 'Mentorship', url: '' }, { name: 'Practice Projects', url: '' }],
-            source: 'ai-generated',
-            stepNumber: 1
-          });
-        }
-      }
-      
-      // Add all parsed items
-      console.log('[DEBUG] Parsed roadmap items:', roadmapItems.length, roadmapItems.map(i => i.title));
-      if (roadmapItems.length === 0) {
-        console.warn('[DEBUG] No items parsed from AI response');
-        setError('Could not parse roadmap steps from AI response. Please try again or add items manually.');
+      // The server returns validated, ready-to-save items (cached per career/goal)
+      const response = await api.post('/api/roadmap/generate/', { career: message });
+      const items: Omit<RoadmapItem, 'id' | 'createdAt'>[] = response.data.items || [];
+      if (items.length === 0) {
+        setError('Could not generate roadmap steps. Please try again or add items manually.');
         return;
       }
-      
-      for (const item of roadmapItems) {
-        console.log('[DEBUG] Adding roadmap item:', item.title);
-        await addRoadmapItem(item);
-      }
-      console.log('[DEBUG] All items added successfully');
-      
-      // Check if user is authenticated - if not, show info message
-      const token = localStorage.getItem('authToken');
-      if (!token) {
-        setError(null); // Clear any previous errors
-        // Items are saved to localStorage, which is fine
-      }
+      await addRoadmapItems(items);
     } catch (e: any) {
-      setError('Failed to generate roadmap from chat. ' + (e.response?.data?.error || e.message || 'Please try again.'));
+      setError('Failed to generate roadmap. ' + (e.response?.data?.error || e.message || 'Please try again.'));
       console.error('Error generating roadmap:', e);
     } finally {
       setIsLoading(false);
@@ -400,20 +300,18 @@ Create 4-6 sequential steps. Each step must build on the previous one. Start imm
         return;
       }
       
-      // Add all items from the scraped roadmap
-      for (const item of items) {
-        await addRoadmapItem({
-          title: item.title,
-          description: item.description,
-          status: item.status || 'pending',
-          priority: item.priority || 'medium',
-          estimatedTime: item.estimatedTime || '',
-          skills: item.skills || [],
-          resources: item.resources || [],
-          source: 'roadmap-sh',
-          stepNumber: item.stepNumber
-        });
-      }
+      // Add all items from the scraped roadmap in one request
+      await addRoadmapItems(items.map((item: any) => ({
+        title: item.title,
+        description: item.description,
+        status: item.status || 'pending',
+        priority: item.priority || 'medium',
+        estimatedTime: item.estimatedTime || '',
+        skills: item.skills || [],
+        resources: item.resources || [],
+        source: 'roadmap-sh',
+        stepNumber: item.stepNumber
+      })));
     } catch (e: any) {
       setError(e.response?.data?.error || 'Failed to import roadmap from roadmap.sh');
       console.error('Error importing roadmap:', e);
@@ -428,6 +326,8 @@ Create 4-6 sequential steps. Each step must build on the previous one. Start imm
       isLoading,
       error,
       addRoadmapItem,
+      addRoadmapItems,
+      reorderRoadmapItems,
       updateRoadmapItem,
       deleteRoadmapItem,
       generateRoadmapFromChat,
@@ -31,6 +31,7 @@ const ChatbotPage = () => {
   const [chatHistory, setChatHistory] = useState<ChatHistoryItem[]>([]);
   const [activeChatId, setActiveChatId] = useState('current');
   const [isLoadingHistory, setIsLoadingHistory] = useState(false);
+  const [historyCursor, setHistoryCursor] = useState<string | null>(null);
   const messagesEndRef = useRef<null | HTMLDivElement>(null);
 
   const scrollToBottom = () => {
@@ -44,15 +45,11 @@ const ChatbotPage = () => {
     const loadChatHistory = async () => {
       try {
         setIsLoadingHistory(true);
-        const { data } = await api.get('/api/chat/history/');
-        if (data && Array.isArray(data)) {
-          const historyItems: ChatHistoryItem[] = data.map((convo: any) => ({
-            id: convo.conversation_id || convo.id,
-            title: convo.last_user_message ? generateChatTitle(convo.last_user_message) : 'New Chat',
-            lastMessage: convo.last_user_message || (convo.messages && convo.messages.length > 0 ? convo.messages[convo.messages.length - 1].text : '') || '',
-            timestamp: new Date(convo.messages && convo.messages.length > 0 ? convo.messages[convo.messages.length - 1]?.created_at : Date.now())
-          }));
-          setChatHistory(historyItems);
+        // One page of conversation summaries; messages are fetched when a chat is opened
+        const { data } = await api.get('/api/chat/conversations/', { params: { limit: 30 } });
+        if (data && Array.isArray(data.results)) {
+          setChatHistory(data.results.map(toHistoryItem));
+          setHistoryCursor(data.next);
         }
         
         // Load localStorage as fallback
@@ -89,6 +86,25 @@ const ChatbotPage = () => {
     loadChatHistory();
   }, []);
 
+  const toHistoryItem = (convo: any): ChatHistoryItem => ({
+    id: convo.conversation_id,
+    title: convo.title ? generateChatTitle(convo.title) : 'New Chat',
+    lastMessage: convo.last_message || '',
+    timestamp: new Date(convo.last_message_at || Date.now())
+  });
+
+  const loadMoreHistory = async () => {
+    if (!historyCursor) return;
+    try {
+      const { data } = await api.get('/api/chat/conversations/', { params: { limit: 30, cursor: historyCursor } });
+      const older: ChatHistoryItem[] = data.results.map(toHistoryItem);
+      setChatHistory(prev => [...prev, ...older.filter(item => !prev.find(p => p.id === item.id))]);
+      setHistoryCursor(data.next);
+    } catch (err) {
+      console.error('Error loading older chats:', err);
+    }
+  };
+
   const generateChatTitle = (firstMessage: string) => {
     const words = firstMessage.toLowerCase().split(' ').slice(0, 3);
     return words.map(word => word.charAt(0).toUpperCase() + word.slice(1)).join(' ') + '...';
@@ -113,22 +129,18 @@ const ChatbotPage = () => {
         timestamp: new Date()
       }]);
     } else {
-      // Load messages for this chat from API
+      // Load the latest page of this chat's messages from the API
       try {
-        const { data } = await api.get('/api/chat/history/');
-        if (data && Array.isArray(data)) {
-          const convo = data.find((c: any) => (c.conversation_id || c.id) === chatId);
-          if (convo && convo.messages && Array.isArray(convo.messages)) {
-            const loadedMessages: Message[] = convo.messages.map((msg: any) => ({
-              type: msg.role === 'user' ? 'user' : 'bot',
-              content: msg.text || msg.content || '',
-              timestamp: new Date(msg.created_at || Date.now())
-            }));
-            if (loadedMessages.length > 0) {
-              setMessages(loadedMessages);
-              return;
-            }
-          }
+        const { data } = await api.get(`/api/chat/conversations/${encodeURIComponent(chatId)}/messages/`, {
+          params: { limit: 50 },
+        });
+        if (data && Array.isArray(data.results) && data.results.length > 0) {
+          setMessages(data.results.map((msg: any) => ({
+            type: msg.role === 'user' ? 'user' : 'bot',
+            content: msg.text || '',
+            timestamp: new Date(msg.created_at || Date.now())
+          })));
+          return;
         }
       } catch (err) {
         // Continue to localStorage fallback
@@ -173,9 +185,12 @@ const ChatbotPage = () => {
     const currentInput = inputValue;
     setInputValue('');
 
-    // Create new chat if this is the first user message
+    // Create new chat if this is the first user message. activeChatId is still the
+    // old value inside this handler, so the request below uses chatId instead.
+    let chatId = activeChatId;
     if (messages.length === 1) {
       const newChatId = `chat_${Date.now()}`;
+      chatId = newChatId;
       setActiveChatId(newChatId);
       const newChat: ChatHistoryItem = {
         id: newChatId,
@@ -187,7 +202,7 @@ const ChatbotPage = () => {
     } else {
       // Update existing chat
       setChatHistory(prev => prev.map(chat => 
-        chat.id === activeChatId 
+        chat.id === chatId 
           ? { ...chat, lastMessage: currentInput, timestamp: new Date() }
           : chat
       ));
@@ -195,28 +210,33 @@ const ChatbotPage = () => {
 
     try {
       const { data } = await api.post('/api/chat/ask/', {
-        session_id: activeChatId,
+        session_id: chatId,
         message: currentInput,
+        anon_token: localStorage.getItem('chat-anon-token') || undefined,
       });
+      if (data.anon_token) {
+        // Server-issued anonymous identity; keeps this browser's chats separate from other guests
+        localStorage.setItem('chat-anon-token', data.anon_token);
+      }
       const botMessage: Message = { type: 'bot', content: data.text || data.reply || '...', timestamp: new Date() };
       setMessages(prev => {
         const updated = [...prev, botMessage];
         // Save to localStorage as backup
-        localStorage.setItem(`chat-${activeChatId}`, JSON.stringify(updated));
+        localStorage.setItem(`chat-${chatId}`, JSON.stringify(updated));
         return updated;
       });
     } catch (err) {
       const botMessage: Message = { type: 'bot', content: 'Sorry, something went wrong contacting the assistant.', timestamp: new Date() };
       setMessages(prev => {
         const updated = [...prev, botMessage];
-        localStorage.setItem(`chat-${activeChatId}`, JSON.stringify(updated));
+        localStorage.setItem(`chat-${chatId}`, JSON.stringify(updated));
         return updated;
       });
     }
     
     // Update chat history in localStorage
     const updatedHistory = chatHistory.map(chat => 
-      chat.id === activeChatId 
+      chat.id === chatId 
         ? { ...chat, lastMessage: currentInput, timestamp: new Date() }
         : chat
     );
@@ -283,6 +303,11 @@ const ChatbotPage = () => {
                   </div>
                 ))
               )}
+              {historyCursor && (
+                <Button variant="ghost" className="w-full text-xs text-muted-foreground" onClick={loadMoreHistory}>
+                  Load older chats
+                </Button>
+              )}
             </div>
           </div>
         </aside>
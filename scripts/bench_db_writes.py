@@ -0,0 +1,106 @@
+# scripts/bench_db_writes.py
+"""Concurrent MessageLog write throughput for the active DB profile.
+
+Runs N writer threads (each with its own DB connection, like gunicorn
+threads) inserting user/bot message pairs into a throwaway test database,
+then reports rows/second, latency percentiles and lock errors.
+
+Usage (from the project root):
+    python scripts/bench_db_writes.py                      # sqlite + WAL pragmas
+    python scripts/bench_db_writes.py --no-pragmas         # sqlite default journaling
+    DB_PROFILE=mysql DB_USER=... python scripts/bench_db_writes.py
+    DB_PROFILE=postgres DB_USER=... python scripts/bench_db_writes.py --threads 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "career_ai.settings")
+
+import django  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--no-pragmas", action="store_true", help="sqlite only: skip SQLITE_PRAGMAS")
+    args = parser.parse_args()
+
+    from django.conf import settings
+    if args.no_pragmas:
+        settings.SQLITE_PRAGMAS = {}
+    tmpdir = None
+    if settings.DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+        # A real file: an in-memory test DB would hide journaling and locking behaviour
+        tmpdir = tempfile.mkdtemp(prefix="bench_db_")
+        settings.DATABASES["default"].setdefault("TEST", {})["NAME"] = os.path.join(tmpdir, "bench.sqlite3")
+    django.setup()
+
+    from django.db import connection, connections, OperationalError
+    from django.utils import timezone
+    from chat.models import ConversationSession, MessageLog
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                journal = cursor.fetchone()[0]
+            print(f"profile=sqlite journal_mode={journal} pragmas={'off' if args.no_pragmas else 'on'}")
+        else:
+            print(f"profile={settings.DB_PROFILE} vendor={connection.vendor} "
+                  f"CONN_MAX_AGE={settings.DATABASES['default'].get('CONN_MAX_AGE')}")
+
+        sessions = [ConversationSession.objects.create(session_id=f"bench-{i}") for i in range(args.threads)]
+        stop_at = time.monotonic() + args.seconds
+        lock = threading.Lock()
+        latencies, errors = [], [0]
+
+        def writer(sess):
+            local = []
+            try:
+                while time.monotonic() < stop_at:
+                    started = time.perf_counter()
+                    try:
+                        MessageLog.objects.create(session=sess, role="user", text="I am in 12th and like coding",
+                                                  created_at=timezone.now())
+                        MessageLog.objects.create(session=sess, role="bot", text="x" * 1200,
+                                                  created_at=timezone.now())
+                        local.append(time.perf_counter() - started)
+                    except OperationalError:
+                        with lock:
+                            errors[0] += 1
+            finally:
+                connections.close_all()
+                with lock:
+                    latencies.extend(local)
+
+        threads = [threading.Thread(target=writer, args=(s,)) for s in sessions]
+        started = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - started
+
+        latencies.sort()
+        rows = 2 * len(latencies)
+        pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+        print(f"threads={args.threads} seconds={elapsed:.1f} rows={rows} rows/s={rows / elapsed:.0f} "
+              f"p50={pct(0.5):.1f}ms p99={pct(0.99):.1f}ms lock_errors={errors[0]}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        if tmpdir:
+            for f in Path(tmpdir).iterdir():
+                f.unlink()
+            os.rmdir(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# scripts/bench_json.py
+"""Serialization time of stdlib JSON vs career_ai.fastjson on API-shaped payloads.
+
+Builds a chat_history-like payload (conversations with timestamped messages)
+and a roadmap listing, then times:
+  - DRF's JSONRenderer vs ORJSONRenderer
+  - django.http.JsonResponse vs FastJsonResponse
+  - json.loads vs fastjson.loads on the rendered bytes
+
+Usage (from the project root):
+    python scripts/bench_json.py
+    python scripts/bench_json.py --conversations 500 --messages 80 --repeat 20
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "career_ai.settings")
+
+import django  # noqa: E402
+
+
+def history_payload(conversations, messages):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [{
+        "conversation_id": str(uuid.uuid4()),
+        "stage": "12th",
+        "last_user_message": "I like coding and maths, what should I do after 12th?",
+        "selected_career": "Software Engineer",
+        "messages": [{
+            "role": "user" if m % 2 == 0 else "bot",
+            "text": ("I am in 12th and like coding. " * 3) if m % 2 == 0 else ("Here is a roadmap step. " * 40),
+            "created_at": now - datetime.timedelta(minutes=m),
+        } for m in range(messages)],
+    } for _ in range(conversations)]
+
+
+def roadmap_payload(items):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [{
+        "id": str(i), "title": f"Step {i}", "description": "Learn the fundamentals " * 10,
+        "status": "pending", "priority": "medium", "estimatedTime": "2-4 weeks",
+        "skills": ["Python", "SQL", "Git"], "resources": [{"name": "Docs", "url": "https://example.com"}],
+        "source": "ai-generated", "stepNumber": i, "createdAt": now, "uuid": uuid.uuid4(),
+    } for i in range(items)]
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=60)
+    parser.add_argument("--roadmap-items", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    django.setup()
+
+    import json
+    from django.http import JsonResponse
+    from rest_framework.renderers import JSONRenderer
+    from career_ai import fastjson
+
+    print(f"orjson={'yes' if fastjson.HAS_ORJSON else 'no (stdlib fallback)'}")
+    payloads = {
+        "chat_history": history_payload(args.conversations, args.messages),
+        "roadmap_items": roadmap_payload(args.roadmap_items),
+    }
+    for name, payload in payloads.items():
+        body = fastjson.dumps(payload)
+        rows = [
+            ("DRF render", lambda: JSONRenderer().render(payload), lambda: fastjson.ORJSONRenderer().render(payload)),
+            ("JsonResponse", lambda: JsonResponse(payload, safe=False),
+             lambda: fastjson.FastJsonResponse(payload, safe=False)),
+            ("parse", lambda: json.loads(body), lambda: fastjson.loads(body)),
+        ]
+        print(f"\n{name}: {len(body) / 1024 / 1024:.2f} MB")
+        for label, stdlib, fast in rows:
+            slow_t, fast_t = timed(stdlib, args.repeat), timed(fast, args.repeat)
+            print(f"  {label:<13} stdlib={slow_t * 1000:8.1f}ms  fast={fast_t * 1000:8.1f}ms  "
+                  f"speedup={slow_t / fast_t:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# scripts/bench_startup.py
+"""Process startup cost: wall time, import time and RSS per boot scenario.
+
+Each scenario runs in a fresh interpreter with ``-X importtime``:
+  setup   django.setup()                       (every manage.py command)
+  worker  django.setup() + URLconf/views       (what a gunicorn worker loads)
+  chat    worker + one local chat turn         (first request; dataset, lazy SDKs)
+
+Reports the median over --repeat runs plus the slowest imports, and can save
+results to JSON and compare against a previous run to track regressions.
+
+Usage (from the project root):
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --repeat 5 --top 15 --save startup.json
+    python scripts/bench_startup.py --compare startup.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_PRELUDE = """
+import os, resource, sys, time
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "career_ai.settings")
+import django
+django.setup()
+"""
+_EPILOGUE = """
+elapsed = time.perf_counter() - started
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print("BENCH", elapsed, rss_kb)
+"""
+SCENARIOS = {
+    "setup": "",
+    "worker": "import career_ai.urls\n",
+    "chat": (
+        "import career_ai.urls\n"
+        "from django.test.utils import override_settings\n"
+        "from chat.career_bot import chat_with_bot\n"
+        "with override_settings(LLM_ENDPOINT_PROVIDERS={'default': 'local'}, LLM_CLUSTER_MAX_CONCURRENCY=0):\n"
+        "    chat_with_bot('I am in 12th and like coding')\n"
+    ),
+}
+_IMPORT_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_once(code):
+    env = dict(os.environ, PYTHONPATH=str(ROOT), LOG_LEVEL="WARNING")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _PRELUDE + code + _EPILOGUE],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    line = next((l for l in proc.stdout.splitlines() if l.startswith("BENCH ")), None)
+    if proc.returncode != 0 or line is None:
+        raise RuntimeError(proc.stderr[-2000:])
+    _, elapsed, rss_kb = line.split()
+    imports = []
+    for m in _IMPORT_RE.finditer(proc.stderr):
+        self_us, cumulative_us, indent, module = m.groups()
+        imports.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return float(elapsed), int(rss_kb), imports
+
+
+def measure(name, repeat, top):
+    runs = [run_once(SCENARIOS[name]) for _ in range(repeat)]
+    imports = runs[len(runs) // 2][2]
+    # Top-level packages (depth 0) by cumulative time, i.e. what each first import dragged in
+    slowest = sorted((i for i in imports if i[3] == 0), key=lambda i: i[2], reverse=True)[:top]
+    return {
+        "wall_ms": statistics.median(r[0] for r in runs) * 1000,
+        "import_ms": statistics.median(sum(i[1] for i in r[2]) for r in runs) / 1000,
+        "modules": statistics.median(len(r[2]) for r in runs),
+        "rss_mb": statistics.median(r[1] for r in runs) / 1024,
+        "slowest": [(module, cumulative / 1000) for module, _, cumulative, _ in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=list(SCENARIOS), action="append")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare against results saved with --save")
+    args = parser.parse_args()
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else {}
+    results = {}
+    for name in args.scenario or list(SCENARIOS):
+        r = results[name] = measure(name, args.repeat, args.top)
+        print(f"\n{name}: wall={r['wall_ms']:.0f}ms imports={r['import_ms']:.0f}ms "
+              f"modules={r['modules']:.0f} rss={r['rss_mb']:.1f}MB")
+        if name in baseline:
+            b = baseline[name]
+            print(f"  vs baseline: wall {r['wall_ms'] - b['wall_ms']:+.0f}ms, "
+                  f"imports {r['import_ms'] - b['import_ms']:+.0f}ms, rss {r['rss_mb'] - b['rss_mb']:+.1f}MB")
+        for module, ms in r["slowest"]:
+            print(f"    {ms:8.1f}ms  {module}")
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
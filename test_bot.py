@@ -1,13 +1,25 @@
 # test_bot.py
+# Interactive console chat with the bot: python test_bot.py
+# Guarded so that test discovery (manage.py test) can import it without prompting.
+import os
 
-from chat.career_bot import chat_with_bot
 
-print("Career Mentor Bot 🤖 (type 'exit' to quit)\n")
+def main():
+    import django
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "career_ai.settings")
+    django.setup()
+    from chat.career_bot import chat_with_bot
 
-while True:
-    user_input = input("You: ")
-    if user_input.lower() in ["exit", "quit"]:
-        print("Bot: Goodbye! Wishing you success. 🚀")
-        break
-    response = chat_with_bot(user_input)
-    print(f"Bot: {response}\n")
+    print("Career Mentor Bot 🤖 (type 'exit' to quit)\n")
+
+    while True:
+        user_input = input("You: ")
+        if user_input.lower() in ["exit", "quit"]:
+            print("Bot: Goodbye! Wishing you success. 🚀")
+            break
+        response = chat_with_bot(user_input)
+        print(f"Bot: {response['reply']}\n")
+
+
+if __name__ == "__main__":
+    main()